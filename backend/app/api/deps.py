@@ -1,28 +1,49 @@
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import decode_token
 from app.crud.user import get_user_by_id
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, get_db, get_read_db, is_replica_session
 from app.models.user import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Session dependencies are declared with scope="function" everywhere (routes and get_current_user
+# must agree, or FastAPI builds a second session): the session closes when the handler returns,
+# so its connection is not held while the response is serialized and written to the client.
+
+
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Request session: safe methods read from a replica, everything else uses the primary."""
+    source = get_read_db if request.method in READ_ONLY_METHODS else get_db
+    async for session in source():
+        yield session
+
+
+async def get_primary_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Always the primary; use for read-your-writes flows even on GET routes."""
     async for session in get_db():
         yield session
 
 
+async def get_read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Explicitly read-only session, routed to a replica regardless of the HTTP method."""
+    async for session in get_read_db():
+        yield session
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(get_db_session)],
+    session: Annotated[AsyncSession, Depends(get_db_session, scope="function")],
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,7 +61,12 @@ async def get_current_user(
     if user_id is None or token_type != "access":
         raise credentials_exception
 
+    # On GET the session may be a replica (at most DB_REPLICA_MAX_LAG_SECONDS behind), so a role
+    # change or deactivation can take that long to apply. A user created since is retried on the primary.
     user = await get_user_by_id(session, user_id)
+    if user is None and is_replica_session(session):
+        async with AsyncSessionLocal() as primary:
+            user = await get_user_by_id(primary, user_id)
     if user is None:
         raise credentials_exception
     return user
@@ -0,0 +1,87 @@
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.http_cache import PUBLIC_MEDIA, etag_matches, not_modified
+from app.services.media_cache import derived_image_cache, render_thumbnail
+
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+MEDIA_ROOT = Path(settings.MEDIA_ROOT).resolve()
+
+
+def _resolve(path: str) -> tuple[Path, os.stat_result]:
+    target = (MEDIA_ROOT / path).resolve()
+    if not target.is_relative_to(MEDIA_ROOT):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    try:
+        stat_result = target.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not target.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return target, stat_result
+
+
+def _file_etag(stat_result: os.stat_result, *extra: object) -> str:
+    # Strong validator: inode, size and nanosecond mtime change whenever the file is replaced.
+    base = "|".join(str(part) for part in (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns, *extra))
+    return f'"{hashlib.blake2b(base.encode(), digest_size=12).hexdigest()}"'
+
+
+def _file_response(path: Path, etag: str, media_type: Optional[str] = None) -> FileResponse:
+    # FileResponse serves Range/If-Range (206/416) and hands the path to the server via the
+    # ASGI pathsend extension for zero-copy sends where the server supports it.
+    return FileResponse(
+        path,
+        media_type=media_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        headers={"ETag": etag, "Cache-Control": PUBLIC_MEDIA, "Accept-Ranges": "bytes"},
+    )
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media(
+    path: str,
+    request: Request,
+    w: Optional[int] = None,
+    h: Optional[int] = None,
+) -> Response:
+    """Serve an uploaded file, or a resized copy when ``w``/``h`` (bounding box) are given."""
+    source, stat_result = _resolve(path)
+
+    if w is None and h is None:
+        etag = _file_etag(stat_result)
+        if etag_matches(request, etag):
+            return not_modified(etag, PUBLIC_MEDIA)
+        return _file_response(source, etag)
+
+    allowed = settings.MEDIA_THUMBNAIL_SIZES
+    width, height = w or h, h or w
+    if width not in allowed or height not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"w and h must be one of {allowed}",
+        )
+    media_type = mimetypes.guess_type(source.name)[0] or ""
+    if not media_type.startswith("image/"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only images can be resized")
+
+    etag = _file_etag(stat_result, width, height)
+    if etag_matches(request, etag):
+        return not_modified(etag, PUBLIC_MEDIA)
+
+    key = derived_image_cache.key(source, etag)
+    try:
+        derived = await derived_image_cache.get_or_create(key, lambda: render_thumbnail(source, width, height))
+    except ImportError:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Image resizing is not available")
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail="File is not a readable image")
+    return _file_response(derived, etag, media_type=f"image/{derived.suffix.lstrip('.')}")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api import deps
+from app.core.config import settings
+from app.core.response import APIResponse, success_response
+from app.models.user import User
+from app.schemas.activity import ActivityAcceptedResult, ActivityBatchCreate
+from app.services.activity_log import activity_writer
+
+
+router = APIRouter(prefix="/activity", tags=["activity"])
+
+
+@router.post("", response_model=APIResponse[ActivityAcceptedResult], status_code=status.HTTP_202_ACCEPTED)
+async def record_activity(
+    body: ActivityBatchCreate,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+) -> APIResponse[ActivityAcceptedResult]:
+    """Queue the current user's call actions (dials, hang-ups, status changes, remarks).
+
+    Events are written to the activity log within about ACTIVITY_FLUSH_INTERVAL_MS; the request
+    itself never waits for the database. 503 means the buffer is full and the client should retry.
+    """
+    if not settings.ACTIVITY_LOG_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity log is disabled")
+    if not activity_writer.has_room(len(body.events)):
+        activity_writer.rejected += len(body.events)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Activity log is backed up",
+            headers={"Retry-After": "1"},
+        )
+    for event in body.events:
+        activity_writer.record(
+            event.kind,
+            current_user.id,
+            customer_id=event.customer_id,
+            assignment_item_id=event.assignment_item_id,
+            details=event.details,
+            occurred_at=event.occurred_at,
+        )
+    return success_response(ActivityAcceptedResult(accepted=len(body.events)))
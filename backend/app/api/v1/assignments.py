@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.config import settings
+from app.core.http_cache import NO_STORE
+from app.crud.assignment import get_assignment
+from app.models.user import User, UserRole
+from app.services.assignment_events import RESYNC, Subscription, assignment_event_broker
+
+
+router = APIRouter(prefix="/assignments", tags=["assignments"])
+
+
+async def _event_stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.ASSIGNMENT_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            yield event.encode()
+            if event is RESYNC:
+                return  # "resync" sent; the client refetches and reconnects
+    finally:
+        assignment_event_broker.unsubscribe(subscription)
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_assignment_events(
+    request: Request,
+    assignment_id: Optional[UUID] = None,
+    caller_id: Optional[UUID] = None,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> StreamingResponse:
+    """Server-sent events for item status changes and new remarks.
+
+    Callers only receive events for their own assignments; supervisors may scope the stream
+    to one assignment or caller, or omit both to follow the whole floor.
+    """
+    if not settings.ASSIGNMENT_EVENTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event streams are disabled")
+    if current_user.role == UserRole.caller.value:
+        caller_id = current_user.id
+    if assignment_id is not None:
+        assignment = await get_assignment(session, assignment_id)
+        if assignment is None or (caller_id is not None and assignment.caller_id != caller_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
+
+    subscription = assignment_event_broker.subscribe(assignment_id=assignment_id, caller_id=caller_id)
+    if subscription is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many event streams")
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": NO_STORE, "X-Accel-Buffering": "no"},
+    )
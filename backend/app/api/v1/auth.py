@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.core.config import settings
+from app.core.http_cache import PRIVATE_REVALIDATE, compute_etag, etag_matches, not_modified, set_cache_headers
 from app.core.response import APIResponse, success_response
 from app.core.security import create_access_token, create_refresh_token, decode_token
-from app.crud.user import authenticate_user, create_user, get_user_by_email, get_user_by_id
+from app.core.throttling import login_throttle
+from app.crud.user import create_user, get_user_by_email, get_user_by_id
 from app.models.user import User
 from app.schemas.auth import LoginRequest, TokenData, RefreshRequest
 from app.schemas.user import UserCreate, UserRead
@@ -16,11 +18,27 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login", response_model=APIResponse[TokenData])
 async def login(
+    request: Request,
     body: LoginRequest,
-    session: AsyncSession = Depends(deps.get_db_session),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
 ) -> APIResponse[TokenData]:
-    user = await authenticate_user(session, body.email, body.password)
-    if not user:
+    retry_after = await login_throttle.check(request.client.host if request.client else None, body.email)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
+    user = await get_user_by_email(session, body.email)
+    # Only the argon2 verification counts against the cap, not the user lookup.
+    verified = await login_throttle.verify_password(body.password, user.hashed_password if user else None)
+    if verified is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Login temporarily unavailable, please retry",
+            headers={"Retry-After": "1"},
+        )
+    if not verified or user is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect email or password")
 
     access_token_expires = settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -40,7 +58,7 @@ async def login(
 async def register_user(
     user_in: UserCreate,
     current_user: User = Depends(deps.require_role(["admin"])),
-    session: AsyncSession = Depends(deps.get_db_session),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
 ) -> APIResponse[UserRead]:
     existing = await get_user_by_email(session, user_in.email)
     if existing:
@@ -51,8 +69,14 @@ async def register_user(
 
 @router.get("/me", response_model=APIResponse[UserRead])
 async def read_users_me(
+    request: Request,
+    response: Response,
     current_user: User = Depends(deps.get_current_active_user),
-) -> APIResponse[UserRead]:
+) -> APIResponse[UserRead] | Response:
+    etag = compute_etag("user", current_user.id, current_user.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_REVALIDATE)
+    set_cache_headers(response, etag, PRIVATE_REVALIDATE)
     return success_response(UserRead.model_validate(current_user))
 
 
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.http_cache import PRIVATE_SHORT, compute_etag, etag_matches, not_modified, set_cache_headers
+from app.core.response import APIResponse, success_response
+from app.crud.customer_type import customer_types_version, list_customer_types
+from app.models.user import User
+from app.schemas.customer_type import CustomerTypeRead
+
+
+router = APIRouter(prefix="/customer-types", tags=["customer-types"])
+
+
+@router.get("", response_model=APIResponse[list[CustomerTypeRead]])
+async def read_customer_types(
+    request: Request,
+    response: Response,
+    include_inactive: bool = False,
+    current_user: User = Depends(deps.get_current_active_user),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[list[CustomerTypeRead]] | Response:
+    # The version query is a single aggregate; the catalog itself is only loaded on a miss.
+    count, latest = await customer_types_version(session)
+    etag = compute_etag("customer-types", include_inactive, count, latest)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_SHORT)
+    set_cache_headers(response, etag, PRIVATE_SHORT)
+    customer_types = await list_customer_types(session, include_inactive=include_inactive)
+    return success_response([CustomerTypeRead.model_validate(t) for t in customer_types])
@@ -0,0 +1,137 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.response import APIResponse, success_response
+from app.crud.customer import list_customer_timeline, upsert_customer
+from app.crud.customer_type import missing_customer_type_ids
+from app.crud.job import enqueue_job
+from app.db.cache_bus import cache_bus
+from app.models.customer import CustomerMergeProposal, MergeProposalStatus
+from app.models.user import User
+from app.schemas.customer import (
+    CallerIdSummaryRead,
+    CustomerCreate,
+    CustomerMergeApplyRequest,
+    CustomerMergeProposalRead,
+    CustomerSegmentQuery,
+    CustomerSegmentResult,
+    CustomerTimelineEventRead,
+    CustomerTimelinePage,
+    CustomerUpsertResult,
+)
+from app.schemas.job import JobRead
+from app.services.caller_id import CALLER_ID_NAMESPACE, caller_id_cache
+from app.services.customer_dedupe import DEDUPE_SCAN_JOB, MERGE_APPLY_JOB, approve_proposals
+from app.services.segment_index import SEGMENT_INDEX_NAMESPACE, segment_index
+
+
+router = APIRouter(prefix="/customers", tags=["customers"])
+
+
+@router.post("", response_model=APIResponse[CustomerUpsertResult])
+async def create_or_merge_customer(
+    customer_in: CustomerCreate,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[CustomerUpsertResult]:
+    missing = await missing_customer_type_ids(session, customer_in.customer_type_ids)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Unknown customer_type_ids: {', '.join(str(type_id) for type_id in missing)}",
+        )
+    # Published with the upsert's commit; the customer id is only known afterwards.
+    cache_bus.publish(session, CALLER_ID_NAMESPACE, [customer_in.primary_mobile])
+    customer_id, created = await upsert_customer(session, customer_in, added_by=current_user.id)
+    cache_bus.publish(session, SEGMENT_INDEX_NAMESPACE, [customer_id])
+    await session.commit()
+    return success_response(CustomerUpsertResult(id=customer_id, created=created, merged=not created))
+
+
+@router.get("/lookup", response_model=APIResponse[CallerIdSummaryRead])
+async def lookup_caller(
+    mobile: str,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+) -> APIResponse[CallerIdSummaryRead]:
+    """Customer summary for an inbound call, served from the in-process caller-ID cache."""
+    summary = await caller_id_cache.lookup(mobile)
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No customer with this mobile")
+    return success_response(CallerIdSummaryRead.model_validate(summary))
+
+
+@router.get("/{customer_id}/timeline", response_model=APIResponse[CustomerTimelinePage])
+async def customer_timeline(
+    customer_id: UUID,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[CustomerTimelinePage]:
+    """Remarks, status changes, type changes and merges for one customer, newest first."""
+    try:
+        events, next_cursor = await list_customer_timeline(session, customer_id, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return success_response(
+        CustomerTimelinePage(
+            events=[CustomerTimelineEventRead.model_validate(event) for event in events],
+            next_cursor=next_cursor,
+        )
+    )
+
+
+@router.post("/segments/query", response_model=APIResponse[CustomerSegmentResult])
+async def query_customer_segment(
+    body: CustomerSegmentQuery,
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+) -> APIResponse[CustomerSegmentResult]:
+    if not segment_index.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Segment index is still building")
+    if body.include_ids:
+        count, customer_ids = segment_index.customer_ids(
+            body.all_of, body.any_of, body.none_of, offset=body.offset, limit=body.limit
+        )
+        return success_response(CustomerSegmentResult(count=count, customer_ids=customer_ids))
+    return success_response(CustomerSegmentResult(count=segment_index.count(body.all_of, body.any_of, body.none_of)))
+
+
+@router.post("/dedupe/scan", response_model=APIResponse[JobRead])
+async def start_dedupe_scan(
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[JobRead]:
+    job = await enqueue_job(session, DEDUPE_SCAN_JOB, created_by=current_user.id, max_attempts=1)
+    return success_response(JobRead.model_validate(job))
+
+
+@router.get("/dedupe/proposals", response_model=APIResponse[list[CustomerMergeProposalRead]])
+async def list_merge_proposals(
+    status: MergeProposalStatus = MergeProposalStatus.pending,
+    limit: int = 100,
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[list[CustomerMergeProposalRead]]:
+    result = await session.execute(
+        select(CustomerMergeProposal)
+        .where(CustomerMergeProposal.status == status.value)
+        .order_by(CustomerMergeProposal.score.desc())
+        .limit(min(limit, 1000))
+    )
+    return success_response([CustomerMergeProposalRead.model_validate(p) for p in result.scalars().all()])
+
+
+@router.post("/dedupe/apply", response_model=APIResponse[JobRead])
+async def apply_merge_proposals(
+    body: CustomerMergeApplyRequest,
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[JobRead]:
+    await approve_proposals(session, body.proposal_ids)
+    job = await enqueue_job(session, MERGE_APPLY_JOB, created_by=current_user.id)
+    return success_response(JobRead.model_validate(job))
@@ -0,0 +1,68 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.config import settings
+from app.core.response import APIResponse, success_response
+from app.models.customer import ActivityKind
+from app.models.user import User
+from app.schemas.dispatch import DispatchedCallRead, DispatchRefreshResult, DispatchReleaseResult
+from app.services.activity_log import activity_writer
+from app.services.dispatch import DispatchClosed, call_dispatcher, refresh_dispatch_pool
+
+
+router = APIRouter(prefix="/dispatch", tags=["dispatch"])
+
+
+def _ensure_enabled() -> None:
+    if not settings.DISPATCH_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Call dispatch is disabled")
+
+
+@router.post("/next", response_model=APIResponse[Optional[DispatchedCallRead]])
+async def next_call(
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[Optional[DispatchedCallRead]]:
+    """Claim the current user's next due customer and add it to their assignment for today.
+
+    ``data`` is null when nothing is due right now.
+    """
+    _ensure_enabled()
+    try:
+        dispatched = await call_dispatcher.next_call(session, current_user.id)
+    except DispatchClosed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Today's assignment is locked")
+    if dispatched is None:
+        return success_response(None)
+    if settings.ACTIVITY_LOG_ENABLED:
+        activity_writer.record(
+            ActivityKind.dispatched,
+            current_user.id,
+            customer_id=dispatched.customer_id,
+            assignment_item_id=dispatched.item_id,
+            details={"reason": dispatched.reason, "priority": dispatched.priority},
+        )
+    return success_response(DispatchedCallRead.model_validate(dispatched))
+
+
+@router.post("/release", response_model=APIResponse[DispatchReleaseResult])
+async def release_calls(
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[DispatchReleaseResult]:
+    """Hand the current user's claimed, not yet served customers back to the pool."""
+    _ensure_enabled()
+    released = await call_dispatcher.release(session, current_user.id)
+    return success_response(DispatchReleaseResult(released=released))
+
+
+@router.post("/refresh", response_model=APIResponse[DispatchRefreshResult])
+async def refresh_pool(
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[DispatchRefreshResult]:
+    _ensure_enabled()
+    return success_response(DispatchRefreshResult(candidates=await refresh_dispatch_pool(session)))
@@ -0,0 +1,110 @@
+import os
+import tempfile
+from pathlib import Path
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from app.api import deps
+from app.core.response import APIResponse, success_response
+from app.models.customer import UploadBatch, UploadStatus
+from app.models.user import User
+from app.schemas.upload_batch import ImportUploadResult, UploadBatchRead
+from app.services.import_errors import csv_error_report, is_xlsx, load_error_blobs, xlsx_error_report
+from app.services.lead_import import create_or_reuse_batch, resume_batch, store_upload
+
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+@router.post("", response_model=APIResponse[ImportUploadResult], status_code=status.HTTP_202_ACCEPTED)
+async def upload_import(
+    file: UploadFile = File(...),
+    customer_type_ids: list[UUID] = Form(default=[]),
+    source: str = Form(default="upload"),
+    force: bool = Form(default=False),
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[ImportUploadResult]:
+    """Queue a CSV or XLSX import; re-uploading a file returns its earlier batch unless ``force`` is set."""
+    path, content_sha256 = await store_upload(file)
+    batch, duplicate = await create_or_reuse_batch(
+        session,
+        path=path,
+        content_sha256=content_sha256,
+        file_name=file.filename or path.name,
+        options={"customer_type_ids": [str(type_id) for type_id in customer_type_ids], "source": source},
+        uploaded_by=current_user.id,
+        force=force,
+    )
+    return success_response(ImportUploadResult(batch=UploadBatchRead.model_validate(batch), duplicate=duplicate))
+
+
+@router.get("/{batch_id}", response_model=APIResponse[UploadBatchRead])
+async def read_import(
+    batch_id: UUID,
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[UploadBatchRead]:
+    batch = await session.get(UploadBatch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return success_response(UploadBatchRead.model_validate(batch))
+
+
+@router.post("/{batch_id}/resume", response_model=APIResponse[UploadBatchRead])
+async def resume_import(
+    batch_id: UUID,
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[UploadBatchRead]:
+    batch = await session.get(UploadBatch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    if batch.status != UploadStatus.failed.value:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Only failed imports can be resumed")
+    await resume_batch(session, batch, current_user.id)
+    return success_response(UploadBatchRead.model_validate(batch))
+
+
+@router.get("/{batch_id}/errors", response_class=StreamingResponse)
+async def download_import_errors(
+    batch_id: UUID,
+    current_user: User = Depends(deps.require_role(["admin", "manager"])),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> Response:
+    """Failed rows in the upload's own format (CSV or XLSX) with their errors, ready to fix and re-import."""
+    batch = await session.get(UploadBatch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    path = Path(batch.file_path) if batch.file_path else None
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="The uploaded file is no longer stored")
+    blobs = await load_error_blobs(session, batch_id)
+    stem = Path(batch.file_name).stem.replace('"', "") or "import"
+
+    if not is_xlsx(path):
+        return StreamingResponse(
+            csv_error_report(path, blobs),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{stem}-errors.csv"'},
+        )
+
+    # openpyxl writes the zip at the end, so build the workbook in a temp file and stream that.
+    handle, report_path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(handle, "wb") as out:
+            await run_in_threadpool(xlsx_error_report, path, blobs, out)
+    except BaseException:
+        os.unlink(report_path)
+        raise
+    return FileResponse(
+        report_path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=f"{stem}-errors.xlsx",
+        background=BackgroundTask(os.unlink, report_path),
+    )
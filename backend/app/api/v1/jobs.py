@@ -0,0 +1,35 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.response import APIResponse, success_response
+from app.crud.job import get_job, list_jobs_for_batch
+from app.models.user import User
+from app.schemas.job import JobRead
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=APIResponse[JobRead])
+async def read_job(
+    job_id: UUID,
+    current_user: User = Depends(deps.get_current_active_user),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[JobRead]:
+    job = await get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return success_response(JobRead.model_validate(job))
+
+
+@router.get("", response_model=APIResponse[list[JobRead]])
+async def list_batch_jobs(
+    upload_batch_id: UUID,
+    current_user: User = Depends(deps.get_current_active_user),
+    session: AsyncSession = Depends(deps.get_primary_db_session, scope="function"),
+) -> APIResponse[list[JobRead]]:
+    jobs = await list_jobs_for_batch(session, upload_batch_id)
+    return success_response([JobRead.model_validate(job) for job in jobs])
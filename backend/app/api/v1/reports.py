@@ -0,0 +1,83 @@
+import enum
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.api import deps
+from app.core.response import APIResponse, success_response
+from app.crud.assignment import list_customer_remarks
+from app.crud.call_rollup import call_outcome_series
+from app.models.user import User, UserRole
+from app.schemas.report import CallHistoryEntry, CallOutcomePoint
+from app.services.history_archive import read_archived_remarks
+
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+MAX_REPORT_DAYS = 366
+
+
+class CallOutcomeGrouping(str, enum.Enum):
+    day = "day"
+    caller = "caller"
+
+
+@router.get("/call-outcomes", response_model=APIResponse[list[CallOutcomePoint]])
+async def call_outcomes_report(
+    start: date,
+    end: date,
+    group_by: CallOutcomeGrouping = CallOutcomeGrouping.day,
+    caller_id: Optional[UUID] = None,
+    customer_type_id: Optional[UUID] = None,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[list[CallOutcomePoint]]:
+    """Calls per day and outcome from the daily rollups, optionally split by caller."""
+    if end < start or (end - start).days >= MAX_REPORT_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"end must be on or after start and within {MAX_REPORT_DAYS} days",
+        )
+    if current_user.role == UserRole.caller.value:
+        caller_id = current_user.id
+
+    series = await call_outcome_series(
+        session,
+        start,
+        end,
+        by_caller=group_by is CallOutcomeGrouping.caller,
+        caller_id=caller_id,
+        customer_type_id=customer_type_id,
+    )
+    return success_response(
+        [CallOutcomePoint(day=day, caller_id=caller, outcome=outcome, count=count) for day, caller, outcome, count in series]
+    )
+
+
+@router.get("/customer-history/{customer_id}", response_model=APIResponse[list[CallHistoryEntry]])
+async def customer_call_history(
+    customer_id: UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    include_archived: bool = True,
+    current_user: User = Depends(deps.require_role(["admin", "manager", "caller"])),
+    session: AsyncSession = Depends(deps.get_db_session, scope="function"),
+) -> APIResponse[list[CallHistoryEntry]]:
+    """Remarks on a customer, newest first, reading archived months from Parquet as well."""
+    entries = [CallHistoryEntry(**row) for row in await list_customer_remarks(session, customer_id, limit)]
+    if include_archived:
+        # Scanning Parquet can take a while; return the connection first.
+        await session.close()
+        try:
+            archived = await run_in_threadpool(read_archived_remarks, customer_id=customer_id, limit=limit)
+        except ImportError:
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Archive reading is not available")
+        entries.extend(
+            CallHistoryEntry(remark_id=row["id"], archived=True, **{k: row[k] for k in CallHistoryEntry.model_fields if k in row})
+            for row in archived
+        )
+        entries.sort(key=lambda entry: entry.created_at, reverse=True)
+    return success_response(entries[:limit])
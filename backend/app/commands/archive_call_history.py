@@ -0,0 +1,73 @@
+"""Archive old months of call history to Parquet and detach their partitions.
+
+Every month (by assignment date) older than HISTORY_ARCHIVE_AFTER_MONTHS, or before --before,
+is exported under HISTORY_ARCHIVE_ROOT and its partitions of caller_assignments,
+caller_assignment_items and call_remarks are detached and dropped. Months are processed
+oldest first, one transaction each.
+
+Usage:
+  python -m app.commands.archive_call_history --dry-run
+  python -m app.commands.archive_call_history --before 2025-01
+  python -m app.commands.archive_call_history --ensure-partitions
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, dispose_engines, init_engines
+from app.services.history_archive import archive_month, ensure_partitions, live_months
+
+
+def _month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def _default_cutoff() -> date:
+    today = date.today()
+    months = today.year * 12 + today.month - 1 - settings.HISTORY_ARCHIVE_AFTER_MONTHS
+    return date(months // 12, months % 12 + 1, 1)
+
+
+async def run(before: date, dry_run: bool, ensure: bool) -> int:
+    await init_engines()
+    try:
+        if ensure:
+            async with AsyncSessionLocal() as session:
+                created = await ensure_partitions(session, settings.HISTORY_PARTITION_MONTHS_AHEAD)
+            print(f"Created {created} partitions")
+            return 0
+
+        async with AsyncSessionLocal() as session:
+            months = [month for month in await live_months(session) if month < before]
+        if not months:
+            print(f"Nothing to archive before {before:%Y-%m}")
+        for month in months:
+            if dry_run:
+                print(f"would archive {month:%Y-%m}")
+                continue
+            archive = await archive_month(month)
+            print(f"{month:%Y-%m}: {archive.assignments} assignments, {archive.items} items, {archive.remarks} remarks")
+    finally:
+        await dispose_engines()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", type=_month, default=None, help="archive months before YYYY-MM")
+    parser.add_argument("--dry-run", action="store_true", help="list the months that would be archived")
+    parser.add_argument("--ensure-partitions", action="store_true", help="only create upcoming partitions")
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(run(args.before or _default_cutoff(), args.dry_run, args.ensure_partitions))
+    except (ImportError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
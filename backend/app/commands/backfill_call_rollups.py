@@ -0,0 +1,54 @@
+"""Rebuild call_outcome_daily from raw call remarks for a range of report days.
+
+Usage:
+  python -m app.commands.backfill_call_rollups --start 2026-01-01 --end 2026-10-19
+  python -m app.commands.backfill_call_rollups --start 2026-10-01 --chunk-days 1
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date, timedelta
+
+from app.crud.call_rollup import backfill_call_rollups
+from app.db.session import AsyncSessionLocal, dispose_engines, init_engines
+
+
+async def backfill(start: date, end: date, chunk_days: int) -> int:
+    await init_engines()
+    total = 0
+    try:
+        chunk_start = start
+        while chunk_start <= end:
+            # One transaction per chunk keeps the rollup table lock short.
+            chunk_end = min(end, chunk_start + timedelta(days=chunk_days - 1))
+            async with AsyncSessionLocal() as session:
+                rows = await backfill_call_rollups(session, chunk_start, chunk_end)
+            print(f"{chunk_start}..{chunk_end}: {rows} rollup rows")
+            total += rows
+            chunk_start = chunk_end + timedelta(days=1)
+    finally:
+        await dispose_engines()
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first report day (inclusive)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="last report day (inclusive)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="report days per transaction")
+    args = parser.parse_args()
+
+    if args.end < args.start or args.chunk_days < 1:
+        parser.error("--end must not precede --start and --chunk-days must be positive")
+    try:
+        total = asyncio.run(backfill(args.start, args.end, args.chunk_days))
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"Backfilled {total} rollup rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
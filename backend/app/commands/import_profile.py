@@ -0,0 +1,97 @@
+"""Report per-module import cost of the application and enforce a cold-start budget.
+
+Usage:
+  python -m app.commands.import_profile --top 25
+  python -m app.commands.import_profile --budget-ms 1500 --forbid boto3,argon2,jose
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Dependencies that must stay out of the boot path; they are imported on first use.
+LAZY_MODULES = ("boto3", "argon2", "jose", "PIL", "pyarrow", "openpyxl")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def profile_imports(target: str = "app.main") -> list[ImportTiming]:
+    """Import ``target`` in a fresh interpreter with ``-X importtime`` and parse its report."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    timings: list[ImportTiming] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def total_ms(timings: list[ImportTiming], target: str = "app.main") -> float:
+    for timing in timings:
+        if timing.module == target:
+            return timing.cumulative_us / 1000
+    return sum(timing.self_us for timing in timings) / 1000
+
+
+def top_level_costs(timings: list[ImportTiming]) -> dict[str, float]:
+    """Self time aggregated by top-level package, in milliseconds."""
+    costs: dict[str, float] = {}
+    for timing in timings:
+        package = timing.module.split(".", 1)[0]
+        costs[package] = costs.get(package, 0.0) + timing.self_us / 1000
+    return costs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if total import time exceeds this")
+    parser.add_argument("--forbid", default=",".join(LAZY_MODULES), help="comma-separated modules that must not load")
+    args = parser.parse_args()
+
+    timings = profile_imports(args.target)
+    total = total_ms(timings, args.target)
+
+    print(f"{args.target}: {total:.1f} ms total import time\n")
+    print(f"{'package':40} {'self ms':>10}")
+    ranked = sorted(top_level_costs(timings).items(), key=lambda item: item[1], reverse=True)
+    for package, cost in ranked[: args.top]:
+        print(f"{package:40} {cost:10.1f}")
+
+    failed = False
+    loaded = {timing.module.split(".", 1)[0] for timing in timings}
+    forbidden = [name for name in args.forbid.split(",") if name and name in loaded]
+    if forbidden:
+        print(f"\nFAIL: imported at boot but should be lazy: {', '.join(forbidden)}")
+        failed = True
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"\nFAIL: import time {total:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
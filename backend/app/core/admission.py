@@ -0,0 +1,182 @@
+import asyncio
+import contextvars
+import enum
+import math
+from collections import deque
+from collections.abc import Callable
+from typing import Any, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.response import error_response
+
+
+class RouteClass(str, enum.Enum):
+    interactive = "interactive"
+    low_priority = "low_priority"
+
+
+def classify_path(path: str) -> Optional[RouteClass]:
+    """Route class for ``path``; ``None`` for routes that bypass admission control."""
+    if any(path.startswith(prefix) for prefix in settings.ADMISSION_EXEMPT_PREFIXES):
+        return None
+    if any(path.startswith(prefix) for prefix in settings.ADMISSION_LOW_PRIORITY_PREFIXES):
+        return RouteClass.low_priority
+    return RouteClass.interactive
+
+
+class AdmissionTicket:
+    """One admitted request; counts against the pool until its first connection checkout."""
+
+    __slots__ = ("route_class", "awaiting_connection")
+
+    def __init__(self, route_class: RouteClass) -> None:
+        self.route_class = route_class
+        self.awaiting_connection = True
+
+
+# Set by the middleware for the duration of the request; read by the pool checkout listener,
+# which runs in the request's context.
+_current_ticket: contextvars.ContextVar[Optional[AdmissionTicket]] = contextvars.ContextVar(
+    "admission_ticket", default=None
+)
+
+
+class AdmissionController:
+    """Admits requests while the primary pool has room, queueing briefly and then shedding.
+
+    Room is the pool's free connections minus requests already admitted that have not checked
+    one out yet, so a burst cannot be admitted against the same free connections.
+    Interactive (caller-facing) requests may use the whole pool and are woken first;
+    low-priority requests must leave ``ADMISSION_LOW_PRIORITY_RESERVE`` connections free.
+    """
+
+    def __init__(self, pool_usage: Callable[[], tuple[int, int]]) -> None:
+        self.pool_usage = pool_usage
+        self.in_flight = {route_class: 0 for route_class in RouteClass}
+        self.awaiting_connection = 0
+        self.shed = {route_class: 0 for route_class in RouteClass}
+        self._waiters: dict[RouteClass, deque[asyncio.Future]] = {route_class: deque() for route_class in RouteClass}
+        self._max_queue = {
+            RouteClass.interactive: settings.ADMISSION_MAX_QUEUE,
+            RouteClass.low_priority: settings.ADMISSION_LOW_PRIORITY_MAX_QUEUE,
+        }
+
+    def _can_admit(self, route_class: RouteClass) -> bool:
+        try:
+            max_connections, checked_out = self.pool_usage()
+        except RuntimeError:
+            return True  # engine not initialised yet (startup); nothing to protect
+        free = max_connections - checked_out - self.awaiting_connection
+        request_limit = max(1, math.floor(max_connections * settings.ADMISSION_REQUESTS_PER_CONNECTION))
+        if sum(self.in_flight.values()) >= request_limit:
+            return False
+        if route_class is RouteClass.low_priority:
+            return free > settings.ADMISSION_LOW_PRIORITY_RESERVE
+        return free > 0
+
+    def _grant(self, route_class: RouteClass) -> None:
+        self.in_flight[route_class] += 1
+        self.awaiting_connection += 1
+
+    async def admit(self, route_class: RouteClass) -> Optional[AdmissionTicket]:
+        """A ticket to pass to ``release``, or ``None`` when the request is shed."""
+        if not self._waiters[route_class] and self._can_admit(route_class):
+            self._grant(route_class)
+            return AdmissionTicket(route_class)
+
+        waiters = self._waiters[route_class]
+        if len(waiters) >= self._max_queue[route_class]:
+            self.shed[route_class] += 1
+            return None
+
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=settings.ADMISSION_MAX_WAIT_MS / 1000)
+            return AdmissionTicket(route_class)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return AdmissionTicket(route_class)  # woken as the timeout fired
+            self.shed[route_class] += 1
+            return None
+        finally:
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+    def release(self, ticket: AdmissionTicket) -> None:
+        self.in_flight[ticket.route_class] -= 1
+        if ticket.awaiting_connection:
+            ticket.awaiting_connection = False
+            self.awaiting_connection -= 1
+        self.wake()
+
+    def wake(self) -> None:
+        """Hand freed capacity to queued requests, interactive ones first."""
+        for route_class in (RouteClass.interactive, RouteClass.low_priority):
+            waiters = self._waiters[route_class]
+            while waiters and self._can_admit(route_class):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._grant(route_class)
+                    waiter.set_result(True)
+
+    def connection_checked_out(self) -> None:
+        """The current request took its first connection; it now shows up in ``checked_out``."""
+        ticket = _current_ticket.get()
+        if ticket is not None and ticket.awaiting_connection:
+            ticket.awaiting_connection = False
+            self.awaiting_connection -= 1
+
+    def watch_pool(self, engine: AsyncEngine) -> None:
+        """Track first checkouts of admitted requests and wake queued ones on every checkin."""
+        event.listen(engine.sync_engine.pool, "checkout", lambda *_: self.connection_checked_out())
+        event.listen(engine.sync_engine.pool, "checkin", lambda *_: self.wake())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **{
+                route_class.value: {
+                    "in_flight": self.in_flight[route_class],
+                    "queued": len(self._waiters[route_class]),
+                    "shed": self.shed[route_class],
+                }
+                for route_class in RouteClass
+            },
+            "awaiting_connection": self.awaiting_connection,
+        }
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = classify_path(scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        ticket = await self.controller.admit(route_class)
+        if ticket is None:
+            retry_after = max(1, math.ceil(settings.ADMISSION_MAX_WAIT_MS / 1000))
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content=error_response("overloaded", "Server is busy, please retry shortly").model_dump(),
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        token = _current_ticket.set(ticket)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_ticket.reset(token)
+            self.controller.release(ticket)
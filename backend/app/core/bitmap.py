@@ -0,0 +1,211 @@
+"""Compressed integer bitmap in the style of Roaring.
+
+Values are split into a 16-bit high key and a 16-bit low part. Each key owns a
+container: a sorted ``array('H')`` while it holds at most ``ARRAY_LIMIT`` values,
+or a Python ``int`` used as a 65536-bit bitmap once it is denser. Set algebra runs
+container by container, so sparse and dense regions both stay cheap.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Union
+
+ARRAY_LIMIT = 4096
+CONTAINER_BYTES = 1 << 13
+
+Container = Union[array, int]
+
+
+def _cardinality(container: Container) -> int:
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+
+def _to_bits(container: Container) -> int:
+    if isinstance(container, int):
+        return container
+    # Set bits in a byte buffer; shifting a growing big int per value is quadratic.
+    buffer = bytearray(CONTAINER_BYTES)
+    for low in container:
+        buffer[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    for index, byte in enumerate(bits.to_bytes(CONTAINER_BYTES, "little")):
+        if byte:
+            base = index << 3
+            for offset in range(8):
+                if byte >> offset & 1:
+                    yield base | offset
+
+
+def _normalize(container: Container) -> Container | None:
+    """Drop empty containers and switch representation around ``ARRAY_LIMIT``."""
+    cardinality = _cardinality(container)
+    if cardinality == 0:
+        return None
+    if isinstance(container, int) and cardinality <= ARRAY_LIMIT:
+        return array("H", _iter_bits(container))
+    if not isinstance(container, int) and cardinality > ARRAY_LIMIT:
+        return _to_bits(container)
+    return container
+
+
+def _and(a: Container, b: Container) -> Container:
+    if isinstance(a, int) and isinstance(b, int):
+        return a & b
+    if isinstance(a, int):
+        return _and(b, a)
+    if isinstance(b, int):
+        buffer = b.to_bytes(CONTAINER_BYTES, "little")
+        return array("H", (low for low in a if buffer[low >> 3] >> (low & 7) & 1))
+    return array("H", sorted(set(a).intersection(b)))
+
+
+def _or(a: Container, b: Container) -> Container:
+    if isinstance(a, int) or isinstance(b, int):
+        return _to_bits(a) | _to_bits(b)
+    return array("H", sorted(set(a).union(b)))
+
+
+def _andnot(a: Container, b: Container) -> Container:
+    if isinstance(a, int):
+        return a & ~_to_bits(b)
+    if isinstance(b, int):
+        buffer = b.to_bytes(CONTAINER_BYTES, "little")
+        return array("H", (low for low in a if not buffer[low >> 3] >> (low & 7) & 1))
+    return array("H", sorted(set(a).difference(b)))
+
+
+class RoaringBitmap:
+    __slots__ = ("_containers",)
+
+    def __init__(self) -> None:
+        self._containers: dict[int, Container] = {}
+
+    @classmethod
+    def from_sorted(cls, values: Iterable[int]) -> RoaringBitmap:
+        """Bulk-build from ascending values, one container at a time."""
+        bitmap = cls()
+        key = -1
+        lows = array("H")
+        for value in values:
+            high = value >> 16
+            if high != key:
+                if lows:
+                    bitmap._containers[key] = _to_bits(lows) if len(lows) > ARRAY_LIMIT else lows
+                key, lows = high, array("H")
+            if not lows or lows[-1] != value & 0xFFFF:
+                lows.append(value & 0xFFFF)
+        if lows:
+            bitmap._containers[key] = _to_bits(lows) if len(lows) > ARRAY_LIMIT else lows
+        return bitmap
+
+    def add(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array("H", [low])
+        elif isinstance(container, int):
+            self._containers[high] = container | (1 << low)
+        else:
+            index = _bisect(container, low)
+            if index == len(container) or container[index] != low:
+                container.insert(index, low)
+                if len(container) > ARRAY_LIMIT:
+                    self._containers[high] = _to_bits(container)
+
+    def discard(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container &= ~(1 << low)
+        else:
+            index = _bisect(container, low)
+            if index < len(container) and container[index] == low:
+                del container[index]
+        normalized = _normalize(container)
+        if normalized is None:
+            del self._containers[high]
+        else:
+            self._containers[high] = normalized
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        index = _bisect(container, low)
+        return index < len(container) and container[index] == low
+
+    def __len__(self) -> int:
+        return sum(_cardinality(container) for container in self._containers.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            lows = _iter_bits(container) if isinstance(container, int) else container
+            base = high << 16
+            for low in lows:
+                yield base | low
+
+    def _combine(self, other: RoaringBitmap, keys: Iterable[int], op) -> RoaringBitmap:
+        result = RoaringBitmap()
+        for high in keys:
+            container = _normalize(op(high))
+            if container is not None:
+                result._containers[high] = container
+        return result
+
+    def __and__(self, other: RoaringBitmap) -> RoaringBitmap:
+        keys = self._containers.keys() & other._containers.keys()
+        return self._combine(other, keys, lambda high: _and(self._containers[high], other._containers[high]))
+
+    def __or__(self, other: RoaringBitmap) -> RoaringBitmap:
+        def merge(high: int) -> Container:
+            mine, theirs = self._containers.get(high), other._containers.get(high)
+            if mine is None:
+                return other._containers[high]
+            if theirs is None:
+                return mine
+            return _or(mine, theirs)
+
+        return self._combine(other, self._containers.keys() | other._containers.keys(), merge)
+
+    def __sub__(self, other: RoaringBitmap) -> RoaringBitmap:
+        def subtract(high: int) -> Container:
+            theirs = other._containers.get(high)
+            return self._containers[high] if theirs is None else _andnot(self._containers[high], theirs)
+
+        return self._combine(other, list(self._containers), subtract)
+
+    def copy(self) -> RoaringBitmap:
+        clone = RoaringBitmap()
+        clone._containers = {
+            high: container if isinstance(container, int) else array("H", container)
+            for high, container in self._containers.items()
+        }
+        return clone
+
+    def size_in_bytes(self) -> int:
+        return sum(
+            (container.bit_length() + 7) // 8 if isinstance(container, int) else container.itemsize * len(container)
+            for container in self._containers.values()
+        )
+
+
+def _bisect(container: array, low: int) -> int:
+    lo, hi = 0, len(container)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if container[mid] < low:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
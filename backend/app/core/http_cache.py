@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+# Cache-Control policies. Authenticated data is always private; "no-cache" still lets the
+# client keep a copy but makes it revalidate with If-None-Match on every use.
+PRIVATE_REVALIDATE = "private, no-cache"
+PRIVATE_SHORT = "private, max-age=60, stale-while-revalidate=300"
+NO_STORE = "no-store"
+# Uploaded media is public (it was served by StaticFiles before) and only changes by replacement.
+PUBLIC_MEDIA = "public, max-age=3600"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Strong ETag from row versions (ids, ``updated_at``, counts) rather than the response body."""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` against the request's If-None-Match header (RFC 9110 13.1.2)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def _cache_headers(etag: str, cache_control: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Bodyless 304; returning it from a route skips response-model serialization entirely."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag, cache_control))
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers.update(_cache_headers(etag, cache_control))
@@ -1,28 +1,50 @@
+import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
 
-from argon2 import PasswordHasher
-from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from argon2 import PasswordHasher
 
-password_hasher = PasswordHasher()
+
+# argon2 and jose are imported on first use rather than at boot; see app.core.startup.
+@lru_cache
+def get_password_hasher() -> "PasswordHasher":
+    from argon2 import PasswordHasher
+
+    return PasswordHasher()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
-        password_hasher.verify(hashed_password, plain_password)
+        get_password_hasher().verify(hashed_password, plain_password)
         return True
     except Exception:
         return False
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    # argon2 releases the GIL, so verifying in the threadpool keeps the event loop responsive.
+    return await run_in_threadpool(verify_password, plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    return password_hasher.hash(password)
+    return get_password_hasher().hash(password)
+
+
+@lru_cache
+def dummy_password_hash() -> str:
+    """Hash of a random password: unknown accounts are checked against it so they cost the same."""
+    return get_password_hash(secrets.token_urlsafe(16))
 
 
 def _create_token(subject: str | Any, expires_delta: timedelta, token_type: str) -> str:
+    from jose import jwt
+
     now = datetime.now(timezone.utc)
     expire = now + expires_delta
     to_encode = {"sub": str(subject), "exp": expire, "type": token_type}
@@ -43,6 +65,8 @@ def create_refresh_token(subject: str | Any, expires_minutes: Optional[int] = No
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
     except JWTError as exc:
@@ -0,0 +1,108 @@
+"""Production serving: the gunicorn worker class and the connection plan logged at boot.
+
+``gunicorn -c gunicorn.conf.py app.main:app`` runs WEB_CONCURRENCY uvicorn workers with the
+event loop and HTTP parser from SERVER_LOOP / SERVER_HTTP (uvloop and httptools by default).
+"""
+
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+
+try:
+    from uvicorn_worker import UvicornWorker  # type: ignore[import-not-found]
+except ImportError:  # uvicorn still ships the worker, deprecated in favour of uvicorn-worker
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        from uvicorn.workers import UvicornWorker
+
+
+logger = logging.getLogger(__name__)
+
+
+def worker_config_kwargs() -> dict[str, Any]:
+    """uvicorn ``Config`` options layered over what gunicorn passes (bind, backlog, keep-alive)."""
+    return {
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "lifespan": "on",
+        # After this, connections still open (event streams) are cancelled so shutdown hooks
+        # run within gunicorn's graceful_timeout instead of being killed with the worker.
+        "timeout_graceful_shutdown": settings.SERVER_DRAIN_SECONDS,
+        "server_header": False,
+    }
+
+
+class ProductionWorker(UvicornWorker):
+    CONFIG_KWARGS = worker_config_kwargs()
+
+
+@dataclass(frozen=True)
+class ConnectionPlan:
+    workers: int
+    pool_size: int
+    max_overflow: int
+    replicas: int
+    replica_pool_size: int
+    replica_max_overflow: int
+    # Opened to the primary outside the pool.
+    listen_connections: int
+
+    @property
+    def primary_connections(self) -> int:
+        return self.workers * (self.pool_size + self.max_overflow + self.listen_connections)
+
+    @property
+    def replica_connections(self) -> int:
+        return self.workers * (self.replica_pool_size + self.replica_max_overflow)
+
+
+def connection_plan(workers: int) -> ConnectionPlan:
+    """The per-worker pools each of ``workers`` processes will open, derived as they will be."""
+    from app.db.notify import LISTEN_CONNECTIONS_PER_WORKER
+    from app.db.session import derive_pool_limits
+
+    pool_size, max_overflow = derive_pool_limits(
+        settings.DB_CONNECTION_BUDGET, workers, reserved_per_worker=LISTEN_CONNECTIONS_PER_WORKER
+    )
+    replica_pool_size, replica_max_overflow = derive_pool_limits(
+        settings.DB_CONNECTION_BUDGET,
+        workers,
+        pool_size=settings.DB_REPLICA_POOL_SIZE,
+        max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+    )
+    return ConnectionPlan(
+        workers=workers,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        replicas=len(settings.DB_REPLICA_URLS),
+        replica_pool_size=replica_pool_size,
+        replica_max_overflow=replica_max_overflow,
+        listen_connections=LISTEN_CONNECTIONS_PER_WORKER,
+    )
+
+
+def log_connection_plan(workers: int, log: Any = logger) -> ConnectionPlan:
+    """Log the plan through ``log`` (the gunicorn master passes its own logger)."""
+    plan = connection_plan(workers)
+    log.info(
+        "Serving with %s workers (loop=%s http=%s): pool %s+%s per worker, up to %s primary connections",
+        workers,
+        settings.SERVER_LOOP,
+        settings.SERVER_HTTP,
+        plan.pool_size,
+        plan.max_overflow,
+        plan.primary_connections,
+    )
+    if plan.replicas:
+        log.info("Up to %s connections per replica", plan.replica_connections)
+    if settings.DB_CONNECTION_BUDGET and plan.primary_connections > settings.DB_CONNECTION_BUDGET:
+        log.warning(
+            "DB_CONNECTION_BUDGET=%s leaves less than one pooled connection per worker after its LISTEN "
+            "connection; pools were rounded up to %s primary connections",
+            settings.DB_CONNECTION_BUDGET,
+            plan.primary_connections,
+        )
+    return plan
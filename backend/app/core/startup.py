@@ -0,0 +1,43 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+# Imported first by app.main, so this approximates the moment the worker began loading the app.
+BOOT_STARTED = time.perf_counter()
+
+boot_marks: dict[str, float] = {}
+
+
+def mark_boot(stage: str) -> float:
+    """Record milliseconds since boot for ``stage`` (imports done, startup done, first request)."""
+    elapsed_ms = (time.perf_counter() - BOOT_STARTED) * 1000
+    boot_marks.setdefault(stage, elapsed_ms)
+    return boot_marks[stage]
+
+
+def boot_report() -> dict[str, float]:
+    return {stage: round(ms, 1) for stage, ms in boot_marks.items()}
+
+
+class BootTimingMiddleware:
+    """Logs the time from boot to the first request served by this worker."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._first_request_done = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._first_request_done:
+            await self.app(scope, receive, send)
+            return
+
+        self._first_request_done = True
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            mark_boot("first_request")
+            logger.info("Boot timings (ms since worker start): %s", boot_report())
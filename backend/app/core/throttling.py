@@ -0,0 +1,124 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import dummy_password_hash, verify_password_async
+from app.db.session import AsyncSessionLocal
+from app.models.rate_limit import RateLimitBucket
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """Take one token from ``key``; returns 0 when allowed, else seconds until a token is available."""
+        ...
+
+
+class InMemoryBucketStore:
+    """Per-worker token buckets, bounded to ``max_keys`` with least-recently-used eviction."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            retry_after = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = (1 - tokens) / refill_per_second
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class PostgresBucketStore:
+    """Buckets shared by every worker, updated atomically with a single upsert."""
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        table = RateLimitBucket.__table__
+        refilled = func.least(
+            capacity,
+            table.c.tokens + func.extract("epoch", func.now() - table.c.updated_at) * refill_per_second,
+        )
+        stmt = insert(RateLimitBucket).values(key=key, tokens=capacity - 1, updated_at=func.now())
+        upsert = stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={"tokens": refilled - 1, "updated_at": func.now()},
+            where=refilled >= literal(1),
+        ).returning(table.c.tokens)
+
+        async with AsyncSessionLocal() as session:
+            allowed = (await session.execute(upsert)).first()
+            await session.commit()
+        return 0.0 if allowed is not None else 1 / refill_per_second
+
+
+class ConcurrencyGate:
+    """Non-blocking cap on concurrent work: callers that find it full are rejected, not queued."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.limit:
+            self.rejected += 1
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+
+
+class LoginThrottle:
+    def __init__(self, store: BucketStore) -> None:
+        self.store = store
+        self.verifications = ConcurrencyGate(settings.LOGIN_MAX_CONCURRENT_VERIFICATIONS)
+
+    async def check(self, client_ip: Optional[str], email: str) -> int:
+        """Return 0 when the attempt may proceed, else the Retry-After value in whole seconds."""
+        checks = [(f"login:account:{email.strip().lower()}", settings.LOGIN_ACCOUNT_BURST, settings.LOGIN_ACCOUNT_PER_MINUTE)]
+        if client_ip:
+            checks.insert(0, (f"login:ip:{client_ip}", settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE))
+        for key, burst, per_minute in checks:
+            retry_after = await self.store.take(key, burst, per_minute / 60)
+            if retry_after:
+                return max(1, math.ceil(retry_after))
+        return 0
+
+    async def verify_password(self, plain_password: str, hashed_password: Optional[str]) -> Optional[bool]:
+        """Verify under the concurrency cap; None (nothing verified) when the cap is reached.
+
+        ``hashed_password`` is None for an unknown account: a dummy hash is checked instead and
+        the result is always False, so unknown emails take as long and count against the cap.
+        """
+        if not self.verifications.try_acquire():
+            return None
+        try:
+            if hashed_password is None:
+                await verify_password_async(plain_password, await run_in_threadpool(dummy_password_hash))
+                return False
+            return await verify_password_async(plain_password, hashed_password)
+        finally:
+            self.verifications.release()
+
+
+def _build_store() -> BucketStore:
+    if settings.LOGIN_RATE_LIMIT_BACKEND == "postgres":
+        return PostgresBucketStore()
+    return InMemoryBucketStore()
+
+
+login_throttle = LoginThrottle(_build_store())
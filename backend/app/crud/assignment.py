@@ -0,0 +1,48 @@
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.statements import assignment_by_id
+from app.models.customer import CallRemark, CallerAssignment, CallerAssignmentItem
+
+
+async def get_assignment(session: AsyncSession, assignment_id: UUID) -> Optional[CallerAssignment]:
+    result = await session.execute(assignment_by_id(assignment_id))
+    return result.scalar_one_or_none()
+
+
+async def list_customer_remarks(session: AsyncSession, customer_id: UUID, limit: int) -> list[dict[str, Any]]:
+    """Newest remarks on ``customer_id`` across live partitions, with their item and assignment."""
+    stmt = (
+        select(
+            CallRemark.id.label("remark_id"),
+            CallerAssignment.id.label("assignment_id"),
+            CallerAssignment.assignment_date,
+            CallerAssignment.caller_id,
+            CallerAssignmentItem.call_status,
+            CallRemark.outcome,
+            CallRemark.remark_text,
+            CallRemark.follow_up_date,
+            CallRemark.created_at,
+        )
+        .join(
+            CallerAssignmentItem,
+            and_(
+                CallerAssignmentItem.id == CallRemark.assignment_item_id,
+                CallerAssignmentItem.assignment_date == CallRemark.assignment_date,
+            ),
+        )
+        .join(
+            CallerAssignment,
+            and_(
+                CallerAssignment.id == CallerAssignmentItem.assignment_id,
+                CallerAssignment.assignment_date == CallerAssignmentItem.assignment_date,
+            ),
+        )
+        .where(CallerAssignmentItem.customer_id == customer_id)
+        .order_by(CallRemark.created_at.desc())
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in await session.execute(stmt)]
@@ -0,0 +1,105 @@
+import re
+from collections.abc import Sequence
+from datetime import date
+from typing import Any, Optional, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.report import ALL_CUSTOMER_TYPES, CallOutcomeDaily, HistoryArchive
+
+
+_TIMEZONE_NAME = re.compile(r"[A-Za-z0-9_+\-/]+")
+
+
+def rollup_day_function_sql(timezone: str) -> str:
+    """DDL for ``call_rollup_day()``, the report day of a timestamp in ``timezone``."""
+    # The name is inlined into the DDL; Postgres itself rejects names it does not know.
+    if not _TIMEZONE_NAME.fullmatch(timezone):
+        raise ValueError(f"Invalid REPORT_TIMEZONE: {timezone!r}")
+    return f"""
+    CREATE OR REPLACE FUNCTION call_rollup_day(ts timestamptz) RETURNS date
+    LANGUAGE sql STABLE PARALLEL SAFE
+    AS $$ SELECT (ts AT TIME ZONE '{timezone}')::date $$
+    """
+
+
+# Same aggregation as the call_outcome_daily_apply() trigger, over a range of report days;
+# both count each call under call_rollup_types() of the remark's captured customer types.
+# The created_at window is widened by a day on each side so the index can be used whatever
+# the report timezone; call_rollup_day() then selects the exact days.
+_BACKFILL_SQL = [
+    "LOCK TABLE call_outcome_daily IN SHARE ROW EXCLUSIVE MODE",
+    "DELETE FROM call_outcome_daily WHERE day BETWEEN :start AND :end",
+    """
+    INSERT INTO call_outcome_daily (day, caller_id, outcome, customer_type_id, call_count)
+    SELECT call_rollup_day(r.created_at), a.caller_id, r.outcome, t.customer_type_id, count(*)
+    FROM call_remarks r
+    JOIN caller_assignment_items i ON i.id = r.assignment_item_id AND i.assignment_date = r.assignment_date
+    JOIN caller_assignments a ON a.id = i.assignment_id AND a.assignment_date = i.assignment_date
+    CROSS JOIN LATERAL call_rollup_types(r.customer_type_ids, i.customer_id) AS t(customer_type_id)
+    WHERE r.created_at >= CAST(CAST(:start AS date) AS timestamptz) - interval '1 day'
+      AND r.created_at < CAST(CAST(:end AS date) AS timestamptz) + interval '2 days'
+      AND call_rollup_day(r.created_at) BETWEEN :start AND :end
+    GROUP BY 1, 2, 3, 4
+    """,
+]
+
+
+async def backfill_call_rollups(session: AsyncSession, start: date, end: date) -> int:
+    """Recompute rollup rows for report days ``start``..``end`` (inclusive) from raw remarks.
+
+    The table lock makes concurrent remark inserts wait for this transaction, so rows are
+    neither lost nor double counted; keep the range small on a busy system. Days up to the end
+    of the newest archived month are refused: their remarks are no longer in the database.
+    ``call_rollup_day()`` is first redefined for ``REPORT_TIMEZONE``, so live rollups switch
+    to a changed timezone in the same transaction.
+    """
+    archived = await session.scalar(select(func.max(HistoryArchive.month)))
+    if archived is not None and start < date(archived.year + archived.month // 12, archived.month % 12 + 1, 1):
+        raise ValueError(f"Call history up to {archived:%Y-%m} is archived; start the backfill after it")
+    params = {"start": start, "end": end}
+    await session.execute(text(rollup_day_function_sql(settings.REPORT_TIMEZONE)))
+    *prepare, insert_rollups = _BACKFILL_SQL
+    for statement in prepare:
+        await session.execute(text(statement), params)
+    result = cast(CursorResult, await session.execute(text(insert_rollups), params))
+    await session.commit()
+    return result.rowcount
+
+
+async def call_outcome_series(
+    session: AsyncSession,
+    start: date,
+    end: date,
+    *,
+    by_caller: bool = False,
+    caller_id: Optional[UUID] = None,
+    customer_type_id: Optional[UUID] = None,
+) -> list[tuple[date, Optional[UUID], str, int]]:
+    """Daily call counts per outcome as ``(day, caller_id, outcome, count)``.
+
+    ``caller_id`` in the result is None unless ``by_caller`` is set.
+    """
+    if by_caller:
+        columns = [CallOutcomeDaily.day, CallOutcomeDaily.caller_id, CallOutcomeDaily.outcome]
+    else:
+        columns = [CallOutcomeDaily.day, CallOutcomeDaily.outcome]
+    stmt = (
+        select(*columns, func.sum(CallOutcomeDaily.call_count))
+        .where(
+            CallOutcomeDaily.day.between(start, end),
+            CallOutcomeDaily.customer_type_id == (customer_type_id or ALL_CUSTOMER_TYPES),
+        )
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    if caller_id is not None:
+        stmt = stmt.where(CallOutcomeDaily.caller_id == caller_id)
+
+    rows: Sequence[Any] = (await session.execute(stmt)).all()
+    if by_caller:
+        return [(row[0], row[1], row[2], int(row[3])) for row in rows]
+    return [(row[0], None, row[1], int(row[2])) for row in rows]
@@ -0,0 +1,284 @@
+import base64
+import binascii
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import JSON, String, func, literal, literal_column, select, true, tuple_, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import column
+
+from app.crud.statements import customer_by_identity_key
+from app.models.base import GUID
+from app.models.customer import Customer, CustomerTimelineEvent, CustomerTypeMap, TimelineEventKind
+from app.schemas.customer import CustomerCreate, normalize_mobile
+
+
+def build_identity_key(primary_mobile: Optional[str], email: Optional[str]) -> Optional[str]:
+    """Normalized identity used to merge customers: mobile first, then email."""
+    mobile = normalize_mobile(primary_mobile)
+    if mobile:
+        return f"m:{mobile}"
+    if email:
+        return f"e:{email.strip().lower()}"
+    return None
+
+
+def _merge_details(customer_in: CustomerCreate) -> dict[str, Any]:
+    return {
+        "source": customer_in.source,
+        "name": customer_in.name,
+        "customer_type_ids": [str(type_id) for type_id in dict.fromkeys(customer_in.customer_type_ids)],
+    }
+
+
+def build_upsert_customer_stmt(customer_in: CustomerCreate, added_by: Optional[UUID] = None):
+    """Single statement that upserts the customer and attaches its types.
+
+    The customer row is inserted with ``ON CONFLICT (identity_key) DO UPDATE`` so
+    concurrent creates for the same person converge on one row; type mappings are
+    inserted from a data-modifying CTE with ``ON CONFLICT DO NOTHING`` on
+    ``uq_customer_type_map``. The statement returns ``(id, created)``.
+    """
+    customers = Customer.__table__
+
+    email = str(customer_in.email).lower() if customer_in.email else None
+    stmt = insert(Customer).values(
+        id=uuid.uuid4(),
+        name=customer_in.name,
+        primary_mobile=customer_in.primary_mobile,
+        email=email,
+        identity_key=build_identity_key(customer_in.primary_mobile, email),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[customers.c.identity_key],
+        set_={
+            "primary_mobile": func.coalesce(customers.c.primary_mobile, stmt.excluded.primary_mobile),
+            "email": func.coalesce(customers.c.email, stmt.excluded.email),
+            "updated_at": func.now(),
+        },
+    )
+    # xmax is 0 only for freshly inserted tuples, which tells a create from a merge.
+    upserted = stmt.returning(
+        customers.c.id,
+        literal_column("xmax = 0").label("created"),
+    ).cte("upserted")
+
+    query = select(upserted.c.id, upserted.c.created)
+
+    # A merge into an existing customer goes on its timeline; a create needs no event.
+    merge_event = select(
+        func.gen_random_uuid(),
+        upserted.c.id,
+        literal(TimelineEventKind.import_merge.value, String(50)),
+        literal(added_by, GUID()),
+        literal(_merge_details(customer_in), JSON()),
+    ).where(upserted.c.created.is_(False))
+    query = query.add_cte(
+        insert(CustomerTimelineEvent)
+        .from_select(["id", "customer_id", "kind", "actor_id", "details"], merge_event)
+        .cte("merge_event")
+    )
+
+    type_ids = list(dict.fromkeys(customer_in.customer_type_ids))
+    if type_ids:
+        incoming = values(
+            column("id", GUID()),
+            column("customer_type_id", GUID()),
+            name="incoming_types",
+        ).data([(uuid.uuid4(), type_id) for type_id in type_ids])
+        type_rows = select(
+            incoming.c.id,
+            upserted.c.id,
+            incoming.c.customer_type_id,
+            literal(customer_in.source, String(50)),
+            literal(added_by, GUID()),
+        ).select_from(upserted.join(incoming, true()))
+        insert_types = (
+            insert(CustomerTypeMap)
+            .from_select(["id", "customer_id", "customer_type_id", "source", "added_by_user"], type_rows)
+            .on_conflict_do_nothing(constraint="uq_customer_type_map")
+            .cte("inserted_types")
+        )
+        query = query.add_cte(insert_types)
+
+    return query
+
+
+async def upsert_customer(
+    session: AsyncSession, customer_in: CustomerCreate, added_by: Optional[UUID] = None
+) -> tuple[UUID, bool]:
+    """Create or merge a customer in one round-trip; returns ``(customer_id, created)``. Does not commit."""
+    result = await session.execute(build_upsert_customer_stmt(customer_in, added_by))
+    row = result.one()
+    return row.id, bool(row.created)
+
+
+# asyncpg sends at most 32767 bind parameters per statement; multi-row inserts are split below it.
+MAX_BIND_PARAMS = 32767
+
+
+def _param_batches(rows: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    if not rows:
+        return []
+    per_batch = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    return [rows[start:start + per_batch] for start in range(0, len(rows), per_batch)]
+
+
+@dataclass
+class BulkUpsertResult:
+    created: int = 0
+    merged: int = 0
+    # (customer_id, customer_type_ids) per distinct customer touched, for in-memory indexes.
+    customers: list[tuple[UUID, list[UUID]]] = field(default_factory=list)
+
+
+def _merge_by_identity(rows: list[CustomerCreate]) -> list[tuple[Optional[str], CustomerCreate]]:
+    """Collapse rows sharing an identity key; one statement may not upsert the same row twice."""
+    merged: dict[str, CustomerCreate] = {}
+    anonymous: list[tuple[Optional[str], CustomerCreate]] = []
+    for row in rows:
+        email = str(row.email).lower() if row.email else None
+        key = build_identity_key(row.primary_mobile, email)
+        if key is None:
+            anonymous.append((None, row))
+            continue
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = row.model_copy(update={"email": email})
+        else:
+            merged[key] = existing.model_copy(
+                update={
+                    "primary_mobile": existing.primary_mobile or row.primary_mobile,
+                    "email": existing.email or email,
+                    "customer_type_ids": list(dict.fromkeys([*existing.customer_type_ids, *row.customer_type_ids])),
+                }
+            )
+    return [*merged.items(), *anonymous]
+
+
+async def bulk_upsert_customers(
+    session: AsyncSession, rows: list[CustomerCreate], added_by: Optional[UUID] = None
+) -> BulkUpsertResult:
+    """Upsert many customers with batched multi-row statements; does not commit.
+
+    Same merge rules as ``upsert_customer``; rows without mobile or email are always inserted.
+    """
+    result = BulkUpsertResult()
+    entries = _merge_by_identity(rows)
+    if not entries:
+        return result
+
+    customers = Customer.__table__
+    new_ids = [uuid.uuid4() for _ in entries]
+    customer_rows = [
+        {
+            "id": new_id,
+            "name": row.name,
+            "primary_mobile": row.primary_mobile,
+            "email": str(row.email).lower() if row.email else None,
+            "identity_key": key,
+        }
+        for new_id, (key, row) in zip(new_ids, entries)
+    ]
+    by_key: dict[Optional[str], UUID] = {}
+    created_ids: set[UUID] = set()
+    # Entries are unique per identity key, so splitting cannot upsert one row twice.
+    for batch in _param_batches(customer_rows):
+        stmt = insert(Customer).values(batch)
+        upsert = stmt.on_conflict_do_update(
+            index_elements=[customers.c.identity_key],
+            set_={
+                "primary_mobile": func.coalesce(customers.c.primary_mobile, stmt.excluded.primary_mobile),
+                "email": func.coalesce(customers.c.email, stmt.excluded.email),
+                "updated_at": func.now(),
+            },
+        )
+        returned = await session.execute(
+            upsert.returning(customers.c.id, customers.c.identity_key, literal_column("xmax = 0").label("created"))
+        )
+        for upserted in returned:
+            by_key[upserted.identity_key] = upserted.id
+            if upserted.created:
+                created_ids.add(upserted.id)
+
+    type_rows: list[dict[str, Any]] = []
+    merge_events = []
+    for new_id, (key, row) in zip(new_ids, entries):
+        customer_id = new_id if key is None else by_key[key]
+        type_ids = list(dict.fromkeys(row.customer_type_ids))
+        result.customers.append((customer_id, type_ids))
+        if customer_id not in created_ids:
+            merge_events.append(
+                {
+                    "id": uuid.uuid4(),
+                    "customer_id": customer_id,
+                    "kind": TimelineEventKind.import_merge.value,
+                    "actor_id": added_by,
+                    "details": _merge_details(row),
+                }
+            )
+        type_rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "customer_id": customer_id,
+                "customer_type_id": type_id,
+                "source": row.source,
+                "added_by_user": added_by,
+            }
+            for type_id in type_ids
+        )
+    for batch in _param_batches(type_rows):
+        await session.execute(
+            insert(CustomerTypeMap).values(batch).on_conflict_do_nothing(constraint="uq_customer_type_map")
+        )
+
+    for batch in _param_batches(merge_events):
+        await session.execute(insert(CustomerTimelineEvent).values(batch))
+
+    result.created = len(created_ids)
+    result.merged = len(entries) - result.created
+    return result
+
+
+async def get_customer_by_mobile(session: AsyncSession, mobile: str) -> Optional[Customer]:
+    identity_key = build_identity_key(mobile, None)
+    if identity_key is None:
+        return None
+    result = await session.execute(customer_by_identity_key(identity_key))
+    return result.scalar_one_or_none()
+
+
+def encode_timeline_cursor(event: CustomerTimelineEvent) -> str:
+    return base64.urlsafe_b64encode(f"{event.created_at.isoformat()}|{event.id}".encode()).decode()
+
+
+def decode_timeline_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """``(created_at, id)`` of the last event on the previous page; ValueError if malformed."""
+    try:
+        created_at, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(event_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid timeline cursor")
+
+
+def timeline_page_stmt(customer_id: UUID, limit: int, before: Optional[tuple[datetime, UUID]] = None):
+    stmt = select(CustomerTimelineEvent).where(CustomerTimelineEvent.customer_id == customer_id)
+    if before is not None:
+        stmt = stmt.where(tuple_(CustomerTimelineEvent.created_at, CustomerTimelineEvent.id) < tuple_(*before))
+    return stmt.order_by(CustomerTimelineEvent.created_at.desc(), CustomerTimelineEvent.id.desc()).limit(limit)
+
+
+async def list_customer_timeline(
+    session: AsyncSession, customer_id: UUID, limit: int, cursor: Optional[str] = None
+) -> tuple[list[CustomerTimelineEvent], Optional[str]]:
+    """One page of the customer's timeline, newest first, and the cursor for the next page."""
+    before = decode_timeline_cursor(cursor) if cursor else None
+    events = list((await session.execute(timeline_page_stmt(customer_id, limit + 1, before))).scalars())
+    if len(events) <= limit:
+        return events, None
+    events = events[:limit]
+    return events, encode_timeline_cursor(events[-1])
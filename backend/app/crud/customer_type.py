@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.customer import CustomerType
+
+
+async def customer_types_version(session: AsyncSession) -> tuple[int, Optional[datetime]]:
+    """``(row count, latest updated_at)`` of the catalog; changes whenever a type is added, edited or removed."""
+    result = await session.execute(select(func.count(), func.max(CustomerType.updated_at)))
+    count, latest = result.one()
+    return count, latest
+
+
+async def list_customer_types(session: AsyncSession, include_inactive: bool = False) -> list[CustomerType]:
+    stmt = select(CustomerType).order_by(CustomerType.name)
+    if not include_inactive:
+        stmt = stmt.where(CustomerType.is_active.is_(True))
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def missing_customer_type_ids(session: AsyncSession, type_ids: list[UUID]) -> list[UUID]:
+    """The ids in ``type_ids`` that name no customer type, in the order given."""
+    if not type_ids:
+        return []
+    result = await session.execute(select(CustomerType.id).where(CustomerType.id.in_(set(type_ids))))
+    known = set(result.scalars())
+    return [type_id for type_id in dict.fromkeys(type_ids) if type_id not in known]
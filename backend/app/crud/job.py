@@ -0,0 +1,45 @@
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+
+
+async def get_job(session: AsyncSession, job_id: UUID) -> Optional[Job]:
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def list_jobs_for_batch(session: AsyncSession, upload_batch_id: UUID) -> list[Job]:
+    result = await session.execute(
+        select(Job).where(Job.upload_batch_id == upload_batch_id).order_by(Job.created_at.desc())
+    )
+    return list(result.scalars().all())
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    job_type: str,
+    payload: Optional[dict[str, Any]] = None,
+    *,
+    upload_batch_id: Optional[UUID] = None,
+    created_by: Optional[UUID] = None,
+    max_attempts: int = 3,
+    commit: bool = True,
+) -> Job:
+    job = Job(
+        job_type=job_type,
+        payload=payload or {},
+        upload_batch_id=upload_batch_id,
+        created_by=created_by,
+        max_attempts=max_attempts,
+    )
+    session.add(job)
+    if commit:
+        await session.commit()
+        await session.refresh(job)
+    else:
+        await session.flush()
+    return job
@@ -0,0 +1,63 @@
+"""Precompiled statements for the hottest lookups.
+
+Each is a ``lambda_stmt``: SQLAlchemy builds the ``select()`` and its cache key once per lambda
+and afterwards only pulls the closure values out as bound parameters. A call therefore skips
+statement construction and cache-key generation and goes straight to the engine's compiled
+cache; the SQL text is the same every time, so asyncpg also reuses its per-connection prepared
+statement. ``check_cache_sizes`` warns when the caches are too small to keep these resident.
+"""
+
+import logging
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.core.config import settings
+from app.models.customer import CallerAssignment, Customer
+from app.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+HOT_STATEMENTS: dict[str, Callable[..., StatementLambdaElement]] = {}
+
+
+def hot_statement(builder: Callable[..., StatementLambdaElement]) -> Callable[..., StatementLambdaElement]:
+    HOT_STATEMENTS[builder.__name__] = builder
+    return builder
+
+
+@hot_statement
+def user_by_id(user_id: UUID) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.id == user_id))
+
+
+@hot_statement
+def user_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+@hot_statement
+def customer_by_identity_key(identity_key: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(Customer).where(Customer.identity_key == identity_key))
+
+
+@hot_statement
+def assignment_by_id(assignment_id: UUID) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(CallerAssignment).where(CallerAssignment.id == assignment_id))
+
+
+def check_cache_sizes() -> None:
+    """Warn when the compiled or prepared-statement cache cannot hold the hot statements."""
+    # Leave at least as much room again for the rest of the application's statements.
+    needed = 2 * len(HOT_STATEMENTS)
+    if settings.DB_QUERY_CACHE_SIZE < needed:
+        logger.warning("DB_QUERY_CACHE_SIZE=%s is below %s; hot statements may be recompiled", settings.DB_QUERY_CACHE_SIZE, needed)
+    if not settings.DB_PGBOUNCER_MODE and settings.DB_PREPARED_STATEMENT_CACHE_SIZE < needed:
+        logger.warning(
+            "DB_PREPARED_STATEMENT_CACHE_SIZE=%s is below %s; hot statements may be re-prepared",
+            settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            needed,
+        )
@@ -1,21 +1,21 @@
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash
+from app.crud.statements import user_by_email, user_by_id
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
 async def get_user_by_id(session: AsyncSession, user_id: UUID) -> Optional[User]:
-    result = await session.execute(select(User).where(User.id == user_id))
+    result = await session.execute(user_by_id(user_id))
     return result.scalar_one_or_none()
 
 
 async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]:
-    result = await session.execute(select(User).where(User.email == email))
+    result = await session.execute(user_by_email(email))
     return result.scalar_one_or_none()
 
 
@@ -32,11 +32,3 @@ async def create_user(session: AsyncSession, user_in: UserCreate) -> User:
     await session.refresh(db_user)
     return db_user
 
-
-async def authenticate_user(session: AsyncSession, email: str, password: str) -> Optional[User]:
-    user = await get_user_by_email(session, email)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
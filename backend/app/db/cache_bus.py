@@ -0,0 +1,132 @@
+"""Cross-worker invalidation of in-process caches over Postgres NOTIFY.
+
+Writers call ``cache_bus.publish(session, namespace, keys)`` inside their transaction. The keys
+are sent with ``pg_notify`` just before the session commits, so Postgres delivers them only if
+the commit succeeds, and applied to this worker's caches right after it. Every other worker
+receives them on its ``pg_listener`` connection and evicts the same keys. Notifications are
+lost while a listener reconnects, so each registered cache is fully flushed on reconnect.
+
+Caches plug in by implementing ``InvalidatableCache`` and registering under a namespace.
+"""
+
+import json
+import logging
+import os
+import socket
+from collections import defaultdict
+from typing import Iterable, Protocol
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.notify import pg_listener
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUS_CHANNEL = "cache_invalidation"
+# Publishing this key flushes the whole namespace.
+FLUSH_ALL = "*"
+# NOTIFY payloads must stay under 8000 bytes; keys are split across several notifications.
+_MAX_PAYLOAD_BYTES = 7000
+_PENDING_KEY = "cache_bus_pending"
+
+_NOTIFY_SQL = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+
+class InvalidatableCache(Protocol):
+    def evict(self, keys: list[str]) -> None:
+        """Drop ``keys``; must not block (schedule any reload as a task)."""
+
+    def flush(self) -> None:
+        """Drop everything."""
+
+
+def _payloads(origin: str, namespace: str, keys: list[str]) -> list[str]:
+    payloads = []
+    batch: list[str] = []
+    size = 0
+    for key in keys:
+        if batch and size + len(key) + 4 > _MAX_PAYLOAD_BYTES:
+            payloads.append(json.dumps({"origin": origin, "ns": namespace, "keys": batch}))
+            batch, size = [], 0
+        batch.append(key)
+        size += len(key) + 4
+    if batch:
+        payloads.append(json.dumps({"origin": origin, "ns": namespace, "keys": batch}))
+    return payloads
+
+
+class CacheBus:
+    def __init__(self) -> None:
+        self._caches: dict[str, list[InvalidatableCache]] = defaultdict(list)
+        self.origin = f"{socket.gethostname()}:{os.getpid()}"
+        self._started = False
+
+    def register(self, namespace: str, cache: InvalidatableCache) -> None:
+        self._caches[namespace].append(cache)
+
+    def publish(self, session: AsyncSession, namespace: str, keys: Iterable[str | UUID | None]) -> None:
+        """Invalidate ``keys`` in ``namespace`` on every worker once ``session`` commits."""
+        pending: dict[str, set[str]] = session.sync_session.info.setdefault(_PENDING_KEY, defaultdict(set))
+        pending[namespace].update(str(key) for key in keys if key is not None)
+
+    def apply(self, namespace: str, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        for cache in self._caches.get(namespace, ()):
+            try:
+                if FLUSH_ALL in keys:
+                    cache.flush()
+                else:
+                    cache.evict(keys)
+            except Exception:
+                logger.exception("Cache invalidation for %s failed", namespace)
+
+    def flush_all(self) -> None:
+        for namespace in list(self._caches):
+            self.apply(namespace, [FLUSH_ALL])
+
+    def _receive(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation: %.200s", payload)
+            return
+        if data.get("origin") == self.origin:
+            return  # applied locally after our own commit
+        self.apply(data.get("ns", ""), data.get("keys", []))
+
+    def _before_commit(self, session: Session) -> None:
+        pending = session.info.get(_PENDING_KEY)
+        if not pending:
+            return
+        payloads = [
+            payload for namespace, keys in pending.items() for payload in _payloads(self.origin, namespace, sorted(keys))
+        ]
+        # Queued by Postgres and delivered only when this transaction commits.
+        session.execute(_NOTIFY_SQL, {"channel": CACHE_BUS_CHANNEL, "payloads": payloads})
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info.pop(_PENDING_KEY, None)
+        for namespace, keys in (pending or {}).items():
+            self.apply(namespace, keys)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        await pg_listener.listen(CACHE_BUS_CHANNEL, self._receive)
+        pg_listener.on_reconnect(self.flush_all)
+        pg_listener.start()
+
+
+cache_bus = CacheBus()
+
+event.listen(Session, "before_commit", cache_bus._before_commit)
+event.listen(Session, "after_commit", cache_bus._after_commit)
+event.listen(Session, "after_rollback", cache_bus._after_rollback)
@@ -0,0 +1,38 @@
+"""import error chunks
+
+Revision ID: 0a5d8e3c7f21
+Revises: f3c6a9d2e815
+Create Date: 2026-10-19 20:48:16.309275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a5d8e3c7f21'
+down_revision: Union[str, Sequence[str], None] = 'f3c6a9d2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('import_error_chunks',
+    sa.Column('batch_id', app.models.base.GUID(), nullable=False),
+    sa.Column('first_row', sa.Integer(), nullable=False),
+    sa.Column('last_row', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['batch_id'], ['upload_batches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('batch_id', 'first_row')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('import_error_chunks')
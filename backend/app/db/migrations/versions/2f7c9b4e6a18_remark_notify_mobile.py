@@ -0,0 +1,80 @@
+"""remark notify carries the customer's mobile
+
+Revision ID: 2f7c9b4e6a18
+Revises: 7d2f4b8e1c63
+Create Date: 2026-10-20 11:02:37.518640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7c9b4e6a18'
+down_revision: Union[str, Sequence[str], None] = '7d2f4b8e1c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The caller-ID cache evicts the customer's number when a remark is added.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION call_remark_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'remark',
+                'op', 'insert',
+                'assignment_id', i.assignment_id,
+                'caller_id', a.caller_id,
+                'item_id', NEW.assignment_item_id,
+                'customer_id', i.customer_id,
+                'mobile', c.primary_mobile,
+                'remark_id', NEW.id,
+                'outcome', NEW.outcome,
+                'follow_up_date', NEW.follow_up_date,
+                'at', NEW.created_at
+            )::text)
+            FROM caller_assignment_items i
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            LEFT JOIN customers c ON c.id = i.customer_id
+            WHERE i.id = NEW.assignment_item_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION call_remark_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'remark',
+                'op', 'insert',
+                'assignment_id', i.assignment_id,
+                'caller_id', a.caller_id,
+                'item_id', NEW.assignment_item_id,
+                'customer_id', i.customer_id,
+                'remark_id', NEW.id,
+                'outcome', NEW.outcome,
+                'follow_up_date', NEW.follow_up_date,
+                'at', NEW.created_at
+            )::text)
+            FROM caller_assignment_items i
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            WHERE i.id = NEW.assignment_item_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
@@ -0,0 +1,135 @@
+"""customer tables and identity key
+
+Revision ID: 36c217edd1d5
+Revises: c5f422cdeabd
+Create Date: 2026-10-19 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '36c217edd1d5'
+down_revision: Union[str, Sequence[str], None] = 'c5f422cdeabd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_types',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('customers',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('primary_mobile', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('identity_key', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_customers_primary_mobile', 'customers', ['primary_mobile'], unique=False)
+    op.create_index('ix_customers_email', 'customers', ['email'], unique=False)
+    op.create_index('uq_customers_identity_key', 'customers', ['identity_key'], unique=True)
+    op.create_table('caller_assignments',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('caller_id', app.models.base.GUID(), nullable=False),
+    sa.Column('assignment_date', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['caller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('caller_id', 'assignment_date', name='uq_caller_assignment_date')
+    )
+    op.create_index(op.f('ix_caller_assignments_assignment_date'), 'caller_assignments', ['assignment_date'], unique=False)
+    op.create_index(op.f('ix_caller_assignments_caller_id'), 'caller_assignments', ['caller_id'], unique=False)
+    op.create_table('customer_type_maps',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('customer_id', app.models.base.GUID(), nullable=False),
+    sa.Column('customer_type_id', app.models.base.GUID(), nullable=False),
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('added_by_user', app.models.base.GUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['added_by_user'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['customer_type_id'], ['customer_types.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_id', 'customer_type_id', name='uq_customer_type_map')
+    )
+    op.create_index(op.f('ix_customer_type_maps_customer_id'), 'customer_type_maps', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_customer_type_maps_customer_type_id'), 'customer_type_maps', ['customer_type_id'], unique=False)
+    op.create_table('upload_batches',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('uploaded_by', app.models.base.GUID(), nullable=True),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=False),
+    sa.Column('new_customers', sa.Integer(), nullable=False),
+    sa.Column('merged_customers', sa.Integer(), nullable=False),
+    sa.Column('failed_rows', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('caller_assignment_items',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('assignment_id', app.models.base.GUID(), nullable=False),
+    sa.Column('customer_id', app.models.base.GUID(), nullable=False),
+    sa.Column('call_status', sa.String(length=50), nullable=False),
+    sa.Column('last_updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['assignment_id'], ['caller_assignments.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('assignment_id', 'customer_id', name='uq_assignment_customer')
+    )
+    op.create_index(op.f('ix_caller_assignment_items_assignment_id'), 'caller_assignment_items', ['assignment_id'], unique=False)
+    op.create_index(op.f('ix_caller_assignment_items_customer_id'), 'caller_assignment_items', ['customer_id'], unique=False)
+    op.create_table('call_remarks',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('assignment_item_id', app.models.base.GUID(), nullable=False),
+    sa.Column('remark_text', sa.Text(), nullable=False),
+    sa.Column('outcome', sa.String(length=50), nullable=False),
+    sa.Column('follow_up_date', sa.Date(), nullable=True),
+    sa.Column('created_by', app.models.base.GUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['assignment_item_id'], ['caller_assignment_items.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_call_remarks_assignment_item_id'), 'call_remarks', ['assignment_item_id'], unique=False)
+    op.create_index('ix_call_remarks_follow_up_date', 'call_remarks', ['follow_up_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_call_remarks_follow_up_date', table_name='call_remarks')
+    op.drop_index(op.f('ix_call_remarks_assignment_item_id'), table_name='call_remarks')
+    op.drop_table('call_remarks')
+    op.drop_index(op.f('ix_caller_assignment_items_customer_id'), table_name='caller_assignment_items')
+    op.drop_index(op.f('ix_caller_assignment_items_assignment_id'), table_name='caller_assignment_items')
+    op.drop_table('caller_assignment_items')
+    op.drop_table('upload_batches')
+    op.drop_index(op.f('ix_customer_type_maps_customer_type_id'), table_name='customer_type_maps')
+    op.drop_index(op.f('ix_customer_type_maps_customer_id'), table_name='customer_type_maps')
+    op.drop_table('customer_type_maps')
+    op.drop_index(op.f('ix_caller_assignments_caller_id'), table_name='caller_assignments')
+    op.drop_index(op.f('ix_caller_assignments_assignment_date'), table_name='caller_assignments')
+    op.drop_table('caller_assignments')
+    op.drop_index('uq_customers_identity_key', table_name='customers')
+    op.drop_index('ix_customers_email', table_name='customers')
+    op.drop_index('ix_customers_primary_mobile', table_name='customers')
+    op.drop_table('customers')
+    op.drop_table('customer_types')
@@ -0,0 +1,85 @@
+"""call outcome rollups
+
+Revision ID: 3c8e1f2a7b5d
+Revises: a27f64b9d3e1
+Create Date: 2026-10-19 16:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e1f2a7b5d'
+down_revision: Union[str, Sequence[str], None] = 'a27f64b9d3e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('call_outcome_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('caller_id', app.models.base.GUID(), nullable=False),
+    sa.Column('outcome', sa.String(length=50), nullable=False),
+    sa.Column('customer_type_id', app.models.base.GUID(), nullable=False),
+    sa.Column('call_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['caller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('day', 'caller_id', 'outcome', 'customer_type_id', name='pk_call_outcome_daily')
+    )
+    op.create_index('ix_call_remarks_created_at', 'call_remarks', ['created_at'], unique=False)
+
+    # The report day; redefine this function (and backfill) to change the reporting timezone.
+    op.execute(
+        """
+        CREATE FUNCTION call_rollup_day(ts timestamptz) RETURNS date
+        LANGUAGE sql STABLE PARALLEL SAFE
+        AS $$ SELECT (ts AT TIME ZONE 'Asia/Kolkata')::date $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION call_outcome_daily_apply() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO call_outcome_daily (day, caller_id, outcome, customer_type_id, call_count)
+            SELECT call_rollup_day(r.created_at), a.caller_id, r.outcome, t.customer_type_id, count(*)
+            FROM new_remarks r
+            JOIN caller_assignment_items i ON i.id = r.assignment_item_id
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            CROSS JOIN LATERAL (
+                SELECT '00000000-0000-0000-0000-000000000000'::uuid AS customer_type_id
+                UNION ALL
+                SELECT m.customer_type_id FROM customer_type_maps m WHERE m.customer_id = i.customer_id
+            ) t
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 2, 3, 4
+            ON CONFLICT (day, caller_id, outcome, customer_type_id)
+            DO UPDATE SET call_count = call_outcome_daily.call_count + EXCLUDED.call_count;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_rollup
+        AFTER INSERT ON call_remarks
+        REFERENCING NEW TABLE AS new_remarks
+        FOR EACH STATEMENT EXECUTE FUNCTION call_outcome_daily_apply()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER call_remarks_rollup ON call_remarks")
+    op.execute("DROP FUNCTION call_outcome_daily_apply()")
+    op.execute("DROP FUNCTION call_rollup_day(timestamptz)")
+    op.drop_index('ix_call_remarks_created_at', table_name='call_remarks')
+    op.drop_table('call_outcome_daily')
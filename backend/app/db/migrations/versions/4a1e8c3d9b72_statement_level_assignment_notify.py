@@ -0,0 +1,210 @@
+"""statement-level assignment event notify
+
+Revision ID: 4a1e8c3d9b72
+Revises: 2f7c9b4e6a18
+Create Date: 2026-10-20 14:26:51.093314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a1e8c3d9b72'
+down_revision: Union[str, Sequence[str], None] = '2f7c9b4e6a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows listed per notification. Past this only the count is sent (clients refetch), which keeps
+# payloads well under NOTIFY's 8000-byte limit.
+MAX_LISTED = 20
+
+
+def _item_notify_function(name: str, changed: str) -> str:
+    return f"""
+        CREATE FUNCTION {name}() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'item',
+                'op', lower(TG_OP),
+                'assignment_id', c.assignment_id,
+                'caller_id', a.caller_id,
+                'count', c.n,
+                'items', CASE WHEN c.n <= {MAX_LISTED} THEN c.items END
+            )::text)
+            FROM (
+                SELECT n.assignment_id, n.assignment_date, count(*) AS n,
+                       json_agg(json_build_object(
+                           'item_id', n.id,
+                           'customer_id', n.customer_id,
+                           'call_status', n.call_status,
+                           'at', n.last_updated_at
+                       )) AS items
+                FROM {changed}
+                GROUP BY n.assignment_id, n.assignment_date
+            ) c
+            JOIN caller_assignments a ON a.id = c.assignment_id AND a.assignment_date = c.assignment_date;
+            RETURN NULL;
+        END
+        $$
+        """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER call_remarks_notify ON call_remarks")
+    op.execute("DROP FUNCTION call_remark_notify()")
+    op.execute("DROP TRIGGER caller_assignment_items_notify ON caller_assignment_items")
+    op.execute("DROP FUNCTION assignment_item_notify()")
+
+    # One notification per assignment touched by a statement instead of one per row.
+    op.execute(_item_notify_function('assignment_item_notify', 'new_items n'))
+    op.execute(
+        """
+        CREATE TRIGGER caller_assignment_items_notify
+        AFTER INSERT ON caller_assignment_items
+        REFERENCING NEW TABLE AS new_items
+        FOR EACH STATEMENT EXECUTE FUNCTION assignment_item_notify()
+        """
+    )
+    # Transition tables rule out UPDATE OF call_status, so unchanged statuses are filtered here.
+    op.execute(
+        _item_notify_function(
+            'assignment_item_status_notify',
+            'new_items n JOIN old_items o ON o.id = n.id AND o.assignment_date = n.assignment_date '
+            'WHERE o.call_status IS DISTINCT FROM n.call_status',
+        )
+    )
+    op.execute(
+        """
+        CREATE TRIGGER caller_assignment_items_status_notify
+        AFTER UPDATE ON caller_assignment_items
+        REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+        FOR EACH STATEMENT EXECUTE FUNCTION assignment_item_status_notify()
+        """
+    )
+    op.execute(
+        f"""
+        CREATE FUNCTION call_remark_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'remark',
+                'op', 'insert',
+                'assignment_id', r.assignment_id,
+                'caller_id', a.caller_id,
+                'count', r.n,
+                'remarks', CASE WHEN r.n <= {MAX_LISTED} THEN r.remarks END
+            )::text)
+            FROM (
+                SELECT i.assignment_id, i.assignment_date, count(*) AS n,
+                       json_agg(json_build_object(
+                           'item_id', nr.assignment_item_id,
+                           'customer_id', i.customer_id,
+                           'mobile', c.primary_mobile,
+                           'remark_id', nr.id,
+                           'outcome', nr.outcome,
+                           'follow_up_date', nr.follow_up_date,
+                           'at', nr.created_at
+                       )) AS remarks
+                FROM new_remarks nr
+                JOIN caller_assignment_items i ON i.id = nr.assignment_item_id AND i.assignment_date = nr.assignment_date
+                LEFT JOIN customers c ON c.id = i.customer_id
+                GROUP BY i.assignment_id, i.assignment_date
+            ) r
+            JOIN caller_assignments a ON a.id = r.assignment_id AND a.assignment_date = r.assignment_date;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_notify
+        AFTER INSERT ON call_remarks
+        REFERENCING NEW TABLE AS new_remarks
+        FOR EACH STATEMENT EXECUTE FUNCTION call_remark_notify()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER call_remarks_notify ON call_remarks")
+    op.execute("DROP FUNCTION call_remark_notify()")
+    op.execute("DROP TRIGGER caller_assignment_items_status_notify ON caller_assignment_items")
+    op.execute("DROP FUNCTION assignment_item_status_notify()")
+    op.execute("DROP TRIGGER caller_assignment_items_notify ON caller_assignment_items")
+    op.execute("DROP FUNCTION assignment_item_notify()")
+
+    op.execute(
+        """
+        CREATE FUNCTION assignment_item_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.call_status IS NOT DISTINCT FROM NEW.call_status THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'item',
+                'op', lower(TG_OP),
+                'assignment_id', NEW.assignment_id,
+                'caller_id', (SELECT a.caller_id FROM caller_assignments a WHERE a.id = NEW.assignment_id),
+                'item_id', NEW.id,
+                'customer_id', NEW.customer_id,
+                'call_status', NEW.call_status,
+                'at', NEW.last_updated_at
+            )::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER caller_assignment_items_notify
+        AFTER INSERT OR UPDATE OF call_status ON caller_assignment_items
+        FOR EACH ROW EXECUTE FUNCTION assignment_item_notify()
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION call_remark_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'remark',
+                'op', 'insert',
+                'assignment_id', i.assignment_id,
+                'caller_id', a.caller_id,
+                'item_id', NEW.assignment_item_id,
+                'customer_id', i.customer_id,
+                'mobile', c.primary_mobile,
+                'remark_id', NEW.id,
+                'outcome', NEW.outcome,
+                'follow_up_date', NEW.follow_up_date,
+                'at', NEW.created_at
+            )::text)
+            FROM caller_assignment_items i
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            LEFT JOIN customers c ON c.id = i.customer_id
+            WHERE i.id = NEW.assignment_item_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_notify
+        AFTER INSERT ON call_remarks
+        FOR EACH ROW EXECUTE FUNCTION call_remark_notify()
+        """
+    )
@@ -0,0 +1,43 @@
+"""call activity events
+
+Revision ID: 5b9d2e6f1a04
+Revises: c8e1f4a7b2d9
+Create Date: 2026-10-19 22:03:11.742915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9d2e6f1a04'
+down_revision: Union[str, Sequence[str], None] = 'c8e1f4a7b2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('call_activity_events',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('caller_id', app.models.base.GUID(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('customer_id', app.models.base.GUID(), nullable=True),
+    sa.Column('assignment_item_id', app.models.base.GUID(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_call_activity_events_caller_occurred', 'call_activity_events', ['caller_id', 'occurred_at'], unique=False)
+    op.create_index('ix_call_activity_events_customer_occurred', 'call_activity_events', ['customer_id', 'occurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_call_activity_events_customer_occurred', table_name='call_activity_events')
+    op.drop_index('ix_call_activity_events_caller_occurred', table_name='call_activity_events')
+    op.drop_table('call_activity_events')
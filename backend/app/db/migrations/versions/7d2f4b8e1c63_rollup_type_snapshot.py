@@ -0,0 +1,127 @@
+"""rollup customer type snapshot and configurable report timezone
+
+Revision ID: 7d2f4b8e1c63
+Revises: 5b9d2e6f1a04
+Create Date: 2026-10-20 09:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.crud.call_rollup import rollup_day_function_sql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f4b8e1c63'
+down_revision: Union[str, Sequence[str], None] = '5b9d2e6f1a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('call_remarks', sa.Column('customer_type_ids', postgresql.ARRAY(postgresql.UUID(as_uuid=True)), nullable=True))
+
+    # The customer's types as of the insert, so the live trigger and a later backfill count the
+    # call under the same types. Rows copied in with a snapshot keep it.
+    op.execute(
+        """
+        CREATE FUNCTION call_remark_capture_types() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF NEW.customer_type_ids IS NULL THEN
+                NEW.customer_type_ids := ARRAY(
+                    SELECT m.customer_type_id
+                    FROM caller_assignment_items i
+                    JOIN customer_type_maps m ON m.customer_id = i.customer_id
+                    WHERE i.id = NEW.assignment_item_id AND i.assignment_date = NEW.assignment_date
+                );
+            END IF;
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_capture_types
+        BEFORE INSERT ON call_remarks
+        FOR EACH ROW EXECUTE FUNCTION call_remark_capture_types()
+        """
+    )
+    # The total row plus one per type. Remarks from before the snapshot fall back to the
+    # customer's current types, the best that can be known for them.
+    op.execute(
+        """
+        CREATE FUNCTION call_rollup_types(snapshot uuid[], customer uuid) RETURNS SETOF uuid
+        LANGUAGE sql STABLE
+        AS $$
+            SELECT '00000000-0000-0000-0000-000000000000'::uuid
+            UNION ALL
+            SELECT unnest(COALESCE(
+                snapshot,
+                ARRAY(SELECT m.customer_type_id FROM customer_type_maps m WHERE m.customer_id = customer)
+            ))
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION call_outcome_daily_apply() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO call_outcome_daily (day, caller_id, outcome, customer_type_id, call_count)
+            SELECT call_rollup_day(r.created_at), a.caller_id, r.outcome, t.customer_type_id, count(*)
+            FROM new_remarks r
+            JOIN caller_assignment_items i ON i.id = r.assignment_item_id
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            CROSS JOIN LATERAL call_rollup_types(r.customer_type_ids, i.customer_id) AS t(customer_type_id)
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 2, 3, 4
+            ON CONFLICT (day, caller_id, outcome, customer_type_id)
+            DO UPDATE SET call_count = call_outcome_daily.call_count + EXCLUDED.call_count;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(rollup_day_function_sql(settings.REPORT_TIMEZONE))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION call_outcome_daily_apply() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO call_outcome_daily (day, caller_id, outcome, customer_type_id, call_count)
+            SELECT call_rollup_day(r.created_at), a.caller_id, r.outcome, t.customer_type_id, count(*)
+            FROM new_remarks r
+            JOIN caller_assignment_items i ON i.id = r.assignment_item_id
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            CROSS JOIN LATERAL (
+                SELECT '00000000-0000-0000-0000-000000000000'::uuid AS customer_type_id
+                UNION ALL
+                SELECT m.customer_type_id FROM customer_type_maps m WHERE m.customer_id = i.customer_id
+            ) t
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 2, 3, 4
+            ON CONFLICT (day, caller_id, outcome, customer_type_id)
+            DO UPDATE SET call_count = call_outcome_daily.call_count + EXCLUDED.call_count;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute("DROP FUNCTION call_rollup_types(uuid[], uuid)")
+    op.execute("DROP TRIGGER call_remarks_capture_types ON call_remarks")
+    op.execute("DROP FUNCTION call_remark_capture_types()")
+    op.drop_column('call_remarks', 'customer_type_ids')
@@ -0,0 +1,72 @@
+"""remark notify carries the assignment date
+
+Revision ID: 9c3e5a7b1d24
+Revises: 4a1e8c3d9b72
+Create Date: 2026-10-21 10:12:44.607218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5a7b1d24'
+down_revision: Union[str, Sequence[str], None] = '4a1e8c3d9b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same limit as 4a1e8c3d9b72.
+MAX_LISTED = 20
+
+
+def _remark_notify_function(with_date: bool) -> str:
+    assignment_date = "'assignment_date', r.assignment_date," if with_date else ""
+    return f"""
+        CREATE OR REPLACE FUNCTION call_remark_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'remark',
+                'op', 'insert',
+                'assignment_id', r.assignment_id,
+                {assignment_date}
+                'caller_id', a.caller_id,
+                'count', r.n,
+                'remarks', CASE WHEN r.n <= {MAX_LISTED} THEN r.remarks END
+            )::text)
+            FROM (
+                SELECT i.assignment_id, i.assignment_date, count(*) AS n,
+                       json_agg(json_build_object(
+                           'item_id', nr.assignment_item_id,
+                           'customer_id', i.customer_id,
+                           'mobile', c.primary_mobile,
+                           'remark_id', nr.id,
+                           'outcome', nr.outcome,
+                           'follow_up_date', nr.follow_up_date,
+                           'at', nr.created_at
+                       )) AS remarks
+                FROM new_remarks nr
+                JOIN caller_assignment_items i ON i.id = nr.assignment_item_id AND i.assignment_date = nr.assignment_date
+                LEFT JOIN customers c ON c.id = i.customer_id
+                GROUP BY i.assignment_id, i.assignment_date
+            ) r
+            JOIN caller_assignments a ON a.id = r.assignment_id AND a.assignment_date = r.assignment_date;
+            RETURN NULL;
+        END
+        $$
+        """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # When the remarks are not listed, the caller-ID cache reads the assignment's mobiles back;
+    # the date lets that query hit a single caller_assignment_items partition.
+    op.execute(_remark_notify_function(with_date=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(_remark_notify_function(with_date=False))
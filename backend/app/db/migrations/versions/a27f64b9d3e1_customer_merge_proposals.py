@@ -0,0 +1,46 @@
+"""customer merge proposals
+
+Revision ID: a27f64b9d3e1
+Revises: 5e9a3c61f0b4
+Create Date: 2026-10-19 15:21:48.904163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a27f64b9d3e1'
+down_revision: Union[str, Sequence[str], None] = '5e9a3c61f0b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_merge_proposals',
+    sa.Column('id', app.models.base.GUID(), nullable=False),
+    sa.Column('survivor_id', app.models.base.GUID(), nullable=False),
+    sa.Column('duplicate_id', app.models.base.GUID(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('reasons', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('applied_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['survivor_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('survivor_id', 'duplicate_id', name='uq_customer_merge_pair')
+    )
+    op.create_index(op.f('ix_customer_merge_proposals_duplicate_id'), 'customer_merge_proposals', ['duplicate_id'], unique=False)
+    op.create_index(op.f('ix_customer_merge_proposals_survivor_id'), 'customer_merge_proposals', ['survivor_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_customer_merge_proposals_survivor_id'), table_name='customer_merge_proposals')
+    op.drop_index(op.f('ix_customer_merge_proposals_duplicate_id'), table_name='customer_merge_proposals')
+    op.drop_table('customer_merge_proposals')
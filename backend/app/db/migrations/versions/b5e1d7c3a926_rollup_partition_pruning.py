@@ -0,0 +1,52 @@
+"""rollup trigger joins on assignment_date for partition pruning
+
+Revision ID: b5e1d7c3a926
+Revises: 9c3e5a7b1d24
+Create Date: 2026-10-21 11:38:05.219764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1d7c3a926'
+down_revision: Union[str, Sequence[str], None] = '9c3e5a7b1d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rollup_apply_function(pruned: bool) -> str:
+    item_date = " AND i.assignment_date = r.assignment_date" if pruned else ""
+    assignment_date = " AND a.assignment_date = i.assignment_date" if pruned else ""
+    return f"""
+        CREATE OR REPLACE FUNCTION call_outcome_daily_apply() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO call_outcome_daily (day, caller_id, outcome, customer_type_id, call_count)
+            SELECT call_rollup_day(r.created_at), a.caller_id, r.outcome, t.customer_type_id, count(*)
+            FROM new_remarks r
+            JOIN caller_assignment_items i ON i.id = r.assignment_item_id{item_date}
+            JOIN caller_assignments a ON a.id = i.assignment_id{assignment_date}
+            CROSS JOIN LATERAL call_rollup_types(r.customer_type_ids, i.customer_id) AS t(customer_type_id)
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 2, 3, 4
+            ON CONFLICT (day, caller_id, outcome, customer_type_id)
+            DO UPDATE SET call_count = call_outcome_daily.call_count + EXCLUDED.call_count;
+            RETURN NULL;
+        END
+        $$
+        """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both tables are partitioned by assignment_date; joining on the id alone probes every month.
+    op.execute(_rollup_apply_function(pruned=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(_rollup_apply_function(pruned=False))
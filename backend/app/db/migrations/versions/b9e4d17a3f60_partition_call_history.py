@@ -0,0 +1,290 @@
+"""partition call history
+
+Revision ID: b9e4d17a3f60
+Revises: e7b3f9a1c2d6
+Create Date: 2026-10-19 19:25:44.870412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4d17a3f60'
+down_revision: Union[str, Sequence[str], None] = 'e7b3f9a1c2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HISTORY_TABLES = ('caller_assignments', 'caller_assignment_items', 'call_remarks')
+
+
+def _create_indexes_and_triggers() -> None:
+    op.create_index(op.f('ix_caller_assignments_assignment_date'), 'caller_assignments', ['assignment_date'], unique=False)
+    op.create_index(op.f('ix_caller_assignments_caller_id'), 'caller_assignments', ['caller_id'], unique=False)
+    op.create_index(op.f('ix_caller_assignment_items_assignment_id'), 'caller_assignment_items', ['assignment_id'], unique=False)
+    op.create_index(op.f('ix_caller_assignment_items_customer_id'), 'caller_assignment_items', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_call_remarks_assignment_item_id'), 'call_remarks', ['assignment_item_id'], unique=False)
+    op.create_index('ix_call_remarks_follow_up_date', 'call_remarks', ['follow_up_date'], unique=False)
+    op.create_index('ix_call_remarks_created_at', 'call_remarks', ['created_at'], unique=False)
+    # Triggers were dropped with the old tables; the functions are unchanged.
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_rollup
+        AFTER INSERT ON call_remarks
+        REFERENCING NEW TABLE AS new_remarks
+        FOR EACH STATEMENT EXECUTE FUNCTION call_outcome_daily_apply()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_notify
+        AFTER INSERT ON call_remarks
+        FOR EACH ROW EXECUTE FUNCTION call_remark_notify()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER caller_assignment_items_notify
+        AFTER INSERT OR UPDATE OF call_status ON caller_assignment_items
+        FOR EACH ROW EXECUTE FUNCTION assignment_item_notify()
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('history_archives',
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=False),
+    sa.Column('assignments', sa.Integer(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.Column('remarks', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('month')
+    )
+
+    for table in HISTORY_TABLES:
+        op.rename_table(table, f'{table}_unpartitioned')
+
+    # Constraints and indexes are added after the copy (and after the old tables, whose index
+    # names they reuse, are dropped).
+    op.execute(
+        """
+        CREATE TABLE caller_assignments (
+            id uuid NOT NULL,
+            caller_id uuid NOT NULL,
+            assignment_date date NOT NULL,
+            status varchar(50) NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (assignment_date)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE caller_assignment_items (
+            id uuid NOT NULL,
+            assignment_id uuid NOT NULL,
+            assignment_date date NOT NULL,
+            customer_id uuid NOT NULL,
+            call_status varchar(50) NOT NULL,
+            last_updated_at timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (assignment_date)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE call_remarks (
+            id uuid NOT NULL,
+            assignment_item_id uuid NOT NULL,
+            assignment_date date NOT NULL,
+            remark_text text NOT NULL,
+            outcome varchar(50) NOT NULL,
+            follow_up_date date,
+            created_by uuid NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (assignment_date)
+        """
+    )
+    # Rows outside every monthly partition (e.g. far back-dated assignments) land here.
+    for table in HISTORY_TABLES:
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    # One partition per table per month, named <table>_YYYY_MM. A month whose rows already sit
+    # in the default partition is skipped with a warning rather than failing the caller.
+    op.execute(
+        """
+        CREATE FUNCTION create_history_partitions(for_month date) RETURNS integer
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            lo date := date_trunc('month', for_month)::date;
+            hi date := (date_trunc('month', for_month) + interval '1 month')::date;
+            parent text;
+            part text;
+            in_default boolean;
+            created integer := 0;
+        BEGIN
+            FOREACH parent IN ARRAY ARRAY['caller_assignments', 'caller_assignment_items', 'call_remarks'] LOOP
+                part := parent || '_' || to_char(lo, 'YYYY_MM');
+                CONTINUE WHEN to_regclass(part) IS NOT NULL;
+                EXECUTE format(
+                    'SELECT EXISTS (SELECT 1 FROM %I WHERE assignment_date >= %L AND assignment_date < %L)',
+                    parent || '_default', lo, hi
+                ) INTO in_default;
+                IF in_default THEN
+                    RAISE WARNING '%_default has rows for %, partition % not created', parent, lo, part;
+                    CONTINUE;
+                END IF;
+                EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)', part, parent, lo, hi);
+                created := created + 1;
+            END LOOP;
+            RETURN created;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION ensure_history_partitions(months_ahead integer) RETURNS integer
+        LANGUAGE sql
+        AS $$
+            SELECT COALESCE(sum(create_history_partitions(m::date)), 0)::integer
+            FROM generate_series(
+                date_trunc('month', current_date) - interval '1 month',
+                date_trunc('month', current_date) + make_interval(months => months_ahead),
+                interval '1 month'
+            ) AS m
+        $$
+        """
+    )
+    op.execute(
+        """
+        SELECT create_history_partitions(m::date)
+        FROM generate_series(
+            (SELECT date_trunc('month', min(assignment_date)) FROM caller_assignments_unpartitioned),
+            (SELECT date_trunc('month', max(assignment_date)) FROM caller_assignments_unpartitioned),
+            interval '1 month'
+        ) AS m
+        """
+    )
+    op.execute("SELECT ensure_history_partitions(3)")
+
+    op.execute(
+        """
+        INSERT INTO caller_assignments (id, caller_id, assignment_date, status, created_at)
+        SELECT id, caller_id, assignment_date, status, created_at FROM caller_assignments_unpartitioned
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO caller_assignment_items (id, assignment_id, assignment_date, customer_id, call_status, last_updated_at)
+        SELECT i.id, i.assignment_id, a.assignment_date, i.customer_id, i.call_status, i.last_updated_at
+        FROM caller_assignment_items_unpartitioned i
+        JOIN caller_assignments_unpartitioned a ON a.id = i.assignment_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO call_remarks (id, assignment_item_id, assignment_date, remark_text, outcome, follow_up_date, created_by, created_at)
+        SELECT r.id, r.assignment_item_id, a.assignment_date, r.remark_text, r.outcome, r.follow_up_date, r.created_by, r.created_at
+        FROM call_remarks_unpartitioned r
+        JOIN caller_assignment_items_unpartitioned i ON i.id = r.assignment_item_id
+        JOIN caller_assignments_unpartitioned a ON a.id = i.assignment_id
+        """
+    )
+    for table in reversed(HISTORY_TABLES):
+        op.drop_table(f'{table}_unpartitioned')
+
+    op.create_primary_key('caller_assignments_pkey', 'caller_assignments', ['id', 'assignment_date'])
+    op.create_unique_constraint('uq_caller_assignment_date', 'caller_assignments', ['caller_id', 'assignment_date'])
+    op.create_foreign_key(None, 'caller_assignments', 'users', ['caller_id'], ['id'])
+    op.create_primary_key('caller_assignment_items_pkey', 'caller_assignment_items', ['id', 'assignment_date'])
+    op.create_unique_constraint('uq_assignment_customer', 'caller_assignment_items', ['assignment_id', 'customer_id', 'assignment_date'])
+    op.create_foreign_key(None, 'caller_assignment_items', 'caller_assignments', ['assignment_id', 'assignment_date'], ['id', 'assignment_date'])
+    op.create_foreign_key(None, 'caller_assignment_items', 'customers', ['customer_id'], ['id'])
+    op.create_primary_key('call_remarks_pkey', 'call_remarks', ['id', 'assignment_date'])
+    op.create_foreign_key(None, 'call_remarks', 'caller_assignment_items', ['assignment_item_id', 'assignment_date'], ['id', 'assignment_date'])
+    op.create_foreign_key(None, 'call_remarks', 'users', ['created_by'], ['id'])
+    _create_indexes_and_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in HISTORY_TABLES:
+        op.rename_table(table, f'{table}_partitioned')
+
+    op.execute(
+        """
+        CREATE TABLE caller_assignments (
+            id uuid NOT NULL,
+            caller_id uuid NOT NULL,
+            assignment_date date NOT NULL,
+            status varchar(50) NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE caller_assignment_items (
+            id uuid NOT NULL,
+            assignment_id uuid NOT NULL,
+            customer_id uuid NOT NULL,
+            call_status varchar(50) NOT NULL,
+            last_updated_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE call_remarks (
+            id uuid NOT NULL,
+            assignment_item_id uuid NOT NULL,
+            remark_text text NOT NULL,
+            outcome varchar(50) NOT NULL,
+            follow_up_date date,
+            created_by uuid NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO caller_assignments (id, caller_id, assignment_date, status, created_at)
+        SELECT id, caller_id, assignment_date, status, created_at FROM caller_assignments_partitioned
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO caller_assignment_items (id, assignment_id, customer_id, call_status, last_updated_at)
+        SELECT id, assignment_id, customer_id, call_status, last_updated_at FROM caller_assignment_items_partitioned
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO call_remarks (id, assignment_item_id, remark_text, outcome, follow_up_date, created_by, created_at)
+        SELECT id, assignment_item_id, remark_text, outcome, follow_up_date, created_by, created_at
+        FROM call_remarks_partitioned
+        """
+    )
+    for table in reversed(HISTORY_TABLES):
+        op.execute(f'DROP TABLE {table}_partitioned CASCADE')
+    op.execute("DROP FUNCTION ensure_history_partitions(integer)")
+    op.execute("DROP FUNCTION create_history_partitions(date)")
+
+    op.create_primary_key('caller_assignments_pkey', 'caller_assignments', ['id'])
+    op.create_unique_constraint('uq_caller_assignment_date', 'caller_assignments', ['caller_id', 'assignment_date'])
+    op.create_foreign_key(None, 'caller_assignments', 'users', ['caller_id'], ['id'])
+    op.create_primary_key('caller_assignment_items_pkey', 'caller_assignment_items', ['id'])
+    op.create_unique_constraint('uq_assignment_customer', 'caller_assignment_items', ['assignment_id', 'customer_id'])
+    op.create_foreign_key(None, 'caller_assignment_items', 'caller_assignments', ['assignment_id'], ['id'])
+    op.create_foreign_key(None, 'caller_assignment_items', 'customers', ['customer_id'], ['id'])
+    op.create_primary_key('call_remarks_pkey', 'call_remarks', ['id'])
+    op.create_foreign_key(None, 'call_remarks', 'caller_assignment_items', ['assignment_item_id'], ['id'])
+    op.create_foreign_key(None, 'call_remarks', 'users', ['created_by'], ['id'])
+    _create_indexes_and_triggers()
+
+    op.drop_table('history_archives')
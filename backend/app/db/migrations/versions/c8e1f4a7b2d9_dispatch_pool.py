@@ -0,0 +1,46 @@
+"""dispatch pool
+
+Revision ID: c8e1f4a7b2d9
+Revises: 0a5d8e3c7f21
+Create Date: 2026-10-19 21:24:40.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f4a7b2d9'
+down_revision: Union[str, Sequence[str], None] = '0a5d8e3c7f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customer_types', sa.Column('dispatch_priority', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('dispatch_pool',
+    sa.Column('customer_id', app.models.base.GUID(), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=50), nullable=False),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('claimed_by', app.models.base.GUID(), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['claimed_by'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('customer_id')
+    )
+    op.create_index('ix_dispatch_pool_claimed_by', 'dispatch_pool', ['claimed_by'], unique=False, postgresql_where=sa.text('claimed_by IS NOT NULL'))
+    op.create_index('ix_dispatch_pool_next', 'dispatch_pool', [sa.text('priority DESC'), 'due_at'], unique=False, postgresql_where=sa.text('claimed_by IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_dispatch_pool_next', table_name='dispatch_pool', postgresql_where=sa.text('claimed_by IS NULL'))
+    op.drop_index('ix_dispatch_pool_claimed_by', table_name='dispatch_pool', postgresql_where=sa.text('claimed_by IS NOT NULL'))
+    op.drop_table('dispatch_pool')
+    op.drop_column('customer_types', 'dispatch_priority')
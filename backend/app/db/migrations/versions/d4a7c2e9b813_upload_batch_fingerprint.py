@@ -0,0 +1,34 @@
+"""upload batch fingerprint
+
+Revision ID: d4a7c2e9b813
+Revises: 3c8e1f2a7b5d
+Create Date: 2026-10-19 16:48:12.306517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c2e9b813'
+down_revision: Union[str, Sequence[str], None] = '3c8e1f2a7b5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('upload_batches', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.add_column('upload_batches', sa.Column('file_path', sa.String(length=500), nullable=True))
+    op.add_column('upload_batches', sa.Column('options', sa.JSON(), nullable=True))
+    op.create_index(op.f('ix_upload_batches_content_sha256'), 'upload_batches', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_batches_content_sha256'), table_name='upload_batches')
+    op.drop_column('upload_batches', 'options')
+    op.drop_column('upload_batches', 'file_path')
+    op.drop_column('upload_batches', 'content_sha256')
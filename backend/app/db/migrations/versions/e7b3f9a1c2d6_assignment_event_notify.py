@@ -0,0 +1,94 @@
+"""assignment event notify
+
+Revision ID: e7b3f9a1c2d6
+Revises: d4a7c2e9b813
+Create Date: 2026-10-19 18:41:09.226351
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f9a1c2d6'
+down_revision: Union[str, Sequence[str], None] = 'd4a7c2e9b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Payloads stay well under NOTIFY's 8000-byte limit: ids, status/outcome and timestamps only.
+    op.execute(
+        """
+        CREATE FUNCTION assignment_item_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.call_status IS NOT DISTINCT FROM NEW.call_status THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'item',
+                'op', lower(TG_OP),
+                'assignment_id', NEW.assignment_id,
+                'caller_id', (SELECT a.caller_id FROM caller_assignments a WHERE a.id = NEW.assignment_id),
+                'item_id', NEW.id,
+                'customer_id', NEW.customer_id,
+                'call_status', NEW.call_status,
+                'at', NEW.last_updated_at
+            )::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER caller_assignment_items_notify
+        AFTER INSERT OR UPDATE OF call_status ON caller_assignment_items
+        FOR EACH ROW EXECUTE FUNCTION assignment_item_notify()
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION call_remark_notify() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM pg_notify('assignment_events', json_build_object(
+                'kind', 'remark',
+                'op', 'insert',
+                'assignment_id', i.assignment_id,
+                'caller_id', a.caller_id,
+                'item_id', NEW.assignment_item_id,
+                'customer_id', i.customer_id,
+                'remark_id', NEW.id,
+                'outcome', NEW.outcome,
+                'follow_up_date', NEW.follow_up_date,
+                'at', NEW.created_at
+            )::text)
+            FROM caller_assignment_items i
+            JOIN caller_assignments a ON a.id = i.assignment_id
+            WHERE i.id = NEW.assignment_item_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_notify
+        AFTER INSERT ON call_remarks
+        FOR EACH ROW EXECUTE FUNCTION call_remark_notify()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER call_remarks_notify ON call_remarks")
+    op.execute("DROP FUNCTION call_remark_notify()")
+    op.execute("DROP TRIGGER caller_assignment_items_notify ON caller_assignment_items")
+    op.execute("DROP FUNCTION assignment_item_notify()")
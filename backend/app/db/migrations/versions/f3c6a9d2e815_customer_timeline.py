@@ -0,0 +1,184 @@
+"""customer timeline
+
+Revision ID: f3c6a9d2e815
+Revises: b9e4d17a3f60
+Create Date: 2026-10-19 20:12:53.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import app.models.base
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c6a9d2e815'
+down_revision: Union[str, Sequence[str], None] = 'b9e4d17a3f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_timeline',
+    sa.Column('id', app.models.base.GUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('customer_id', app.models.base.GUID(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('actor_id', app.models.base.GUID(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Existing history: current type mappings, remarks, and one status event per called item.
+    op.execute(
+        """
+        INSERT INTO customer_timeline (customer_id, kind, actor_id, details, created_at)
+        SELECT m.customer_id, 'type_added', m.added_by_user,
+               json_build_object('customer_type_id', m.customer_type_id, 'source', m.source), m.created_at
+        FROM customer_type_maps m
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO customer_timeline (customer_id, kind, actor_id, details, created_at)
+        SELECT i.customer_id, 'call_status', a.caller_id,
+               json_build_object('item_id', i.id, 'assignment_id', i.assignment_id,
+                                 'assignment_date', i.assignment_date, 'from', NULL, 'to', i.call_status),
+               i.last_updated_at
+        FROM caller_assignment_items i
+        JOIN caller_assignments a ON a.id = i.assignment_id AND a.assignment_date = i.assignment_date
+        WHERE i.call_status <> 'pending'
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO customer_timeline (customer_id, kind, actor_id, details, created_at)
+        SELECT i.customer_id, 'remark', r.created_by,
+               json_build_object('remark_id', r.id, 'assignment_id', i.assignment_id,
+                                 'assignment_date', r.assignment_date, 'caller_id', a.caller_id,
+                                 'outcome', r.outcome, 'remark_text', r.remark_text,
+                                 'follow_up_date', r.follow_up_date),
+               r.created_at
+        FROM call_remarks r
+        JOIN caller_assignment_items i ON i.id = r.assignment_item_id AND i.assignment_date = r.assignment_date
+        JOIN caller_assignments a ON a.id = i.assignment_id AND a.assignment_date = i.assignment_date
+        """
+    )
+    # Built after the backfill; one index serves every timeline page.
+    op.create_index('ix_customer_timeline_customer_created', 'customer_timeline', ['customer_id', 'created_at', 'id'], unique=False)
+
+    op.execute(
+        """
+        CREATE FUNCTION call_remark_timeline() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO customer_timeline (customer_id, kind, actor_id, details, created_at)
+            SELECT i.customer_id, 'remark', r.created_by,
+                   json_build_object('remark_id', r.id, 'assignment_id', i.assignment_id,
+                                     'assignment_date', r.assignment_date, 'caller_id', a.caller_id,
+                                     'outcome', r.outcome, 'remark_text', r.remark_text,
+                                     'follow_up_date', r.follow_up_date),
+                   r.created_at
+            FROM new_remarks r
+            JOIN caller_assignment_items i ON i.id = r.assignment_item_id AND i.assignment_date = r.assignment_date
+            JOIN caller_assignments a ON a.id = i.assignment_id AND a.assignment_date = i.assignment_date;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER call_remarks_timeline
+        AFTER INSERT ON call_remarks
+        REFERENCING NEW TABLE AS new_remarks
+        FOR EACH STATEMENT EXECUTE FUNCTION call_remark_timeline()
+        """
+    )
+    # Transition tables rule out UPDATE OF call_status, so unchanged statuses are filtered here.
+    op.execute(
+        """
+        CREATE FUNCTION assignment_item_timeline() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO customer_timeline (customer_id, kind, actor_id, details, created_at)
+            SELECT n.customer_id, 'call_status', a.caller_id,
+                   json_build_object('item_id', n.id, 'assignment_id', n.assignment_id,
+                                     'assignment_date', n.assignment_date,
+                                     'from', o.call_status, 'to', n.call_status),
+                   n.last_updated_at
+            FROM new_items n
+            JOIN old_items o ON o.id = n.id AND o.assignment_date = n.assignment_date
+            JOIN caller_assignments a ON a.id = n.assignment_id AND a.assignment_date = n.assignment_date
+            WHERE o.call_status IS DISTINCT FROM n.call_status;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER caller_assignment_items_timeline
+        AFTER UPDATE ON caller_assignment_items
+        REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+        FOR EACH STATEMENT EXECUTE FUNCTION assignment_item_timeline()
+        """
+    )
+    # Merges move mappings between customers and record one customer_merge event instead; they
+    # set app.timeline_suppress for their transaction.
+    op.execute(
+        """
+        CREATE FUNCTION customer_type_map_timeline() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF current_setting('app.timeline_suppress', true) = 'on' THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO customer_timeline (customer_id, kind, actor_id, details, created_at)
+            SELECT m.customer_id,
+                   CASE TG_OP WHEN 'INSERT' THEN 'type_added' ELSE 'type_removed' END,
+                   CASE TG_OP WHEN 'INSERT' THEN m.added_by_user END,
+                   json_build_object('customer_type_id', m.customer_type_id, 'source', m.source),
+                   CASE TG_OP WHEN 'INSERT' THEN m.created_at ELSE now() END
+            FROM changed_maps m;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER customer_type_maps_timeline_insert
+        AFTER INSERT ON customer_type_maps
+        REFERENCING NEW TABLE AS changed_maps
+        FOR EACH STATEMENT EXECUTE FUNCTION customer_type_map_timeline()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER customer_type_maps_timeline_delete
+        AFTER DELETE ON customer_type_maps
+        REFERENCING OLD TABLE AS changed_maps
+        FOR EACH STATEMENT EXECUTE FUNCTION customer_type_map_timeline()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER customer_type_maps_timeline_delete ON customer_type_maps")
+    op.execute("DROP TRIGGER customer_type_maps_timeline_insert ON customer_type_maps")
+    op.execute("DROP FUNCTION customer_type_map_timeline()")
+    op.execute("DROP TRIGGER caller_assignment_items_timeline ON caller_assignment_items")
+    op.execute("DROP FUNCTION assignment_item_timeline()")
+    op.execute("DROP TRIGGER call_remarks_timeline ON call_remarks")
+    op.execute("DROP FUNCTION call_remark_timeline()")
+    op.drop_index('ix_customer_timeline_customer_created', table_name='customer_timeline')
+    op.drop_table('customer_timeline')
@@ -0,0 +1,113 @@
+"""Postgres LISTEN/NOTIFY for cross-worker events.
+
+Each worker keeps one dedicated asyncpg connection (outside the SQLAlchemy pool) that LISTENs
+on every channel registered with ``pg_listener.listen``. The connection is pinged every
+``DB_LISTEN_KEEPALIVE_SECONDS`` and re-opened with backoff when it drops; notifications sent
+while it was down are lost, so consumers register ``on_reconnect`` callbacks to resync.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Optional
+
+import asyncpg  # type: ignore[import-untyped]
+from sqlalchemy import make_url
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+NotifyCallback = Callable[[str], None]
+
+# Connections each worker opens to the primary outside the SQLAlchemy pool.
+LISTEN_CONNECTIONS_PER_WORKER = 1
+
+
+def _listen_dsn(url: str) -> str:
+    """asyncpg DSN from a SQLAlchemy URL (driver suffix and driver-specific query dropped)."""
+    return make_url(url).set(drivername="postgresql", query={}).render_as_string(hide_password=False)
+
+
+class PgListener:
+    def __init__(self) -> None:
+        self._callbacks: dict[str, list[NotifyCallback]] = defaultdict(list)
+        self._reconnect_callbacks: list[Callable[[], None]] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def listen(self, channel: str, callback: NotifyCallback) -> None:
+        """Call ``callback(payload)`` for every NOTIFY on ``channel``; callbacks must not block."""
+        first = channel not in self._callbacks
+        self._callbacks[channel].append(callback)
+        conn = self._conn
+        if first and conn is not None and not conn.is_closed():
+            await conn.add_listener(channel, self._dispatch)
+
+    def on_reconnect(self, callback: Callable[[], None]) -> None:
+        self._reconnect_callbacks.append(callback)
+
+    def _dispatch(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("NOTIFY handler for %s failed", channel)
+
+    async def _connect(self) -> asyncpg.Connection:
+        conn = await asyncpg.connect(_listen_dsn(settings.DB_LISTEN_URL or settings.SQLALCHEMY_DATABASE_URI))
+        for channel in list(self._callbacks):
+            await conn.add_listener(channel, self._dispatch)
+        return conn
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        reconnecting = False
+        while True:
+            try:
+                self._conn = await self._connect()
+            except Exception as exc:
+                logger.warning("LISTEN connection failed (retrying in %.0fs): %s", backoff, exc)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                continue
+
+            backoff = 1.0
+            if reconnecting:
+                logger.info("LISTEN connection restored")
+                for callback in self._reconnect_callbacks:
+                    try:
+                        callback()
+                    except Exception:
+                        logger.exception("LISTEN reconnect handler failed")
+            reconnecting = True
+            try:
+                while True:
+                    await asyncio.sleep(settings.DB_LISTEN_KEEPALIVE_SECONDS)
+                    await asyncio.wait_for(self._conn.execute("SELECT 1"), timeout=10)
+            except (asyncpg.PostgresError, OSError, asyncio.TimeoutError, asyncpg.InterfaceError) as exc:
+                logger.warning("LISTEN connection lost: %s", exc)
+            finally:
+                self._conn.terminate()
+                self._conn = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+pg_listener = PgListener()
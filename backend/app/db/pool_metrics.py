@@ -0,0 +1,129 @@
+"""How long requests keep pooled connections checked out.
+
+Pool ``checkout``/``checkin`` events time every connection hold. Holds made while serving an
+HTTP request are also added to that request's total (via a context variable set by
+``PoolHoldMiddleware``), which is reported in a ``Server-Timing: db-hold`` header and
+aggregated into recent percentiles. Comparing request latency with pool-hold time shows how
+much of each request actually needs a connection, i.e. how far ``DB_POOL_SIZE`` stretches.
+"""
+
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class RequestHold:
+    __slots__ = ("seconds", "checkouts")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.checkouts = 0
+
+
+_current_request: ContextVar[Optional[RequestHold]] = ContextVar("pool_hold_request", default=None)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class PoolHoldMetrics:
+    def __init__(self, sample_size: int) -> None:
+        self.checkouts = 0
+        self.hold_seconds = 0.0
+        self.max_hold_seconds = 0.0
+        self.requests = 0
+        self.requests_with_db = 0
+        self._started = time.monotonic()
+        # Recent per-request (hold, latency) pairs in seconds, for percentiles.
+        self._recent: deque[tuple[float, float]] = deque(maxlen=sample_size)
+
+    def watch(self, pool: Pool) -> None:
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        record.info["pool_checkout_at"] = time.perf_counter()
+        request = _current_request.get()
+        if request is not None:
+            request.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection: Any, record: Any) -> None:
+        started = record.info.pop("pool_checkout_at", None)
+        if started is None:
+            return
+        held = time.perf_counter() - started
+        self.checkouts += 1
+        self.hold_seconds += held
+        self.max_hold_seconds = max(self.max_hold_seconds, held)
+        request = _current_request.get()
+        if request is not None:
+            request.seconds += held
+
+    def record_request(self, request: RequestHold, latency: float) -> None:
+        self.requests += 1
+        if request.checkouts:
+            self.requests_with_db += 1
+            self._recent.append((request.seconds, latency))
+
+    def stats(self) -> dict[str, Any]:
+        holds = sorted(hold for hold, _ in self._recent)
+        latencies = sorted(latency for _, latency in self._recent)
+        uptime = max(time.monotonic() - self._started, 1e-9)
+        return {
+            "checkouts": self.checkouts,
+            "mean_hold_ms": round(self.hold_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_hold_ms": round(self.max_hold_seconds * 1000, 3),
+            # Average number of connections held at once since startup.
+            "busy_connections": round(self.hold_seconds / uptime, 3),
+            "requests": self.requests,
+            "requests_with_db": self.requests_with_db,
+            "request_hold_ms": {
+                "p50": round(_percentile(holds, 0.5) * 1000, 3),
+                "p95": round(_percentile(holds, 0.95) * 1000, 3),
+                "p99": round(_percentile(holds, 0.99) * 1000, 3),
+            },
+            # Share of request latency spent holding a connection (recent DB requests).
+            "hold_ratio": round(sum(holds) / sum(latencies), 3) if latencies and sum(latencies) else 0.0,
+        }
+
+
+pool_hold_metrics = PoolHoldMetrics(settings.DB_POOL_METRICS_SAMPLE_SIZE)
+
+
+class PoolHoldMiddleware:
+    """Attributes connection holds to the current request and reports them in ``Server-Timing``."""
+
+    def __init__(self, app: ASGIApp, metrics: PoolHoldMetrics = pool_hold_metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestHold()
+        token = _current_request.set(request)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and request.checkouts:
+                # Request-scoped sessions may still be open here; this is the hold so far.
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", f"db-hold;dur={request.seconds * 1000:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            self.metrics.record_request(request, time.perf_counter() - started)
@@ -1,23 +1,267 @@
+import asyncio
+import itertools
+import logging
+import os
+import uuid
 from collections.abc import AsyncGenerator
+from typing import Any, Optional, cast
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.db.notify import LISTEN_CONNECTIONS_PER_WORKER
+from app.db.pool_metrics import pool_hold_metrics
 
 
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=settings.SQLALCHEMY_ECHO,
-    future=True,
-    pool_pre_ping=settings.DB_POOL_PRE_PING,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_recycle=settings.DB_POOL_RECYCLE,
+logger = logging.getLogger(__name__)
+
+# Engines are created per worker process by init_engines() (called on startup), never at import
+# time, so a gunicorn master using --preload does not hand inherited pool state to its forks.
+engine: Optional[AsyncEngine] = None
+_engine_pid: Optional[int] = None
+_max_connections = 0
+
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def derive_pool_limits(
+    budget: Optional[int],
+    workers: int,
+    pool_size: int = settings.DB_POOL_SIZE,
+    max_overflow: int = settings.DB_MAX_OVERFLOW,
+    reserved_per_worker: int = 0,
+) -> tuple[int, int]:
+    """Split a per-server connection budget across workers into ``(pool_size, max_overflow)``.
+
+    The budget is what all workers together may open to one database server. The primary and
+    each replica are separate servers, so each gets the full budget; ``pool_size`` and
+    ``max_overflow`` are the defaults used without a budget and cap the overflow share.
+    ``reserved_per_worker`` connections that each worker opens outside the pool (the primary's
+    LISTEN connection) come out of its share first.
+    """
+    if not budget:
+        return pool_size, max_overflow
+    per_worker = max(1, budget // max(1, workers) - reserved_per_worker)
+    overflow = min(max_overflow, per_worker // 4)
+    return max(1, per_worker - overflow), overflow
+
+
+def _engine_kwargs(pool_size: int, max_overflow: int, pool_timeout: int) -> dict[str, Any]:
+    connect_args: dict[str, Any] = {}
+    if settings.DB_PGBOUNCER_MODE:
+        # Transaction pooling may run each statement on a different server connection, so
+        # statements must not be cached and need unique names.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return {
+        "echo": settings.SQLALCHEMY_ECHO,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+        "connect_args": connect_args,
+    }
+
+
+def _engine_url(url: str) -> str:
+    cache_size = 0 if settings.DB_PGBOUNCER_MODE else settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    return make_url(url).update_query_dict(
+        {"prepared_statement_cache_size": str(cache_size)}
+    ).render_as_string(hide_password=False)
+
+
+def build_engine(url: str, pool_size: int, max_overflow: int, pool_timeout: int) -> AsyncEngine:
+    built = create_async_engine(_engine_url(url), **_engine_kwargs(pool_size, max_overflow, pool_timeout))
+    if settings.DB_POOL_METRICS_ENABLED:
+        pool_hold_metrics.watch(built.sync_engine.pool)
+    return built
+
+
+def get_engine() -> AsyncEngine:
+    if engine is None or _engine_pid != os.getpid():
+        raise RuntimeError("Database engine is not initialised in this process; call init_engines() first")
+    return engine
+
+
+def pool_usage() -> tuple[int, int]:
+    """``(max_connections, checked_out)`` for this worker's primary pool."""
+    return _max_connections, cast(QueuePool, get_engine().pool).checkedout()
+
+
+async def warm_pool(target: AsyncEngine, connections: int) -> None:
+    """Open ``connections`` pooled connections concurrently and return them to the pool."""
+    connections = min(connections, cast(QueuePool, target.pool).size())
+    if connections <= 0:
+        return
+
+    async def _touch() -> None:
+        async with target.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(_touch() for _ in range(connections)), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.warning("Pool warmup opened %s/%s connections: %s", connections - len(failures), connections, failures[0])
+
+
+async def init_engines() -> AsyncEngine:
+    global engine, _engine_pid, _max_connections
+    if engine is not None and _engine_pid == os.getpid():
+        return engine
+
+    pool_size, max_overflow = derive_pool_limits(
+        settings.DB_CONNECTION_BUDGET, settings.WEB_CONCURRENCY, reserved_per_worker=LISTEN_CONNECTIONS_PER_WORKER
+    )
+    engine = build_engine(settings.SQLALCHEMY_DATABASE_URI, pool_size, max_overflow, settings.DB_POOL_TIMEOUT)
+    _engine_pid = os.getpid()
+    _max_connections = pool_size + max_overflow
+    AsyncSessionLocal.configure(bind=engine)
+    logger.info("Database engine ready (pid=%s pool_size=%s max_overflow=%s)", _engine_pid, pool_size, max_overflow)
+
+    await warm_pool(engine, settings.DB_POOL_WARMUP)
+    await replica_router.start()
+    return engine
+
+
+async def dispose_engines() -> None:
+    global engine, _engine_pid
+    await replica_router.stop()
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    _engine_pid = None
+
+
+def _forget_engines_after_fork() -> None:
+    # Children must not touch sockets opened by the parent; drop the references without closing them.
+    global engine, _engine_pid
+    if engine is not None:
+        engine.sync_engine.dispose(close=False)
+    engine = None
+    _engine_pid = None
+    replica_router.forget()
+
+
+# Seconds the replica is behind; 0 when fully replayed or when the target is not a standby
+# (e.g. a second local database used in development).
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
 )
-AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+class Replica:
+    def __init__(self, url: str) -> None:
+        pool_size, max_overflow = derive_pool_limits(
+            settings.DB_CONNECTION_BUDGET,
+            settings.WEB_CONCURRENCY,
+            pool_size=settings.DB_REPLICA_POOL_SIZE,
+            max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+        )
+        self.engine: AsyncEngine = build_engine(url, pool_size, max_overflow, settings.DB_REPLICA_POOL_TIMEOUT)
+        self.sessionmaker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        # Replicas only take traffic after their first successful health check.
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+
+    async def check(self) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                lag = await asyncio.wait_for(
+                    conn.scalar(REPLICA_LAG_SQL), timeout=settings.DB_REPLICA_HEALTH_CHECK_INTERVAL
+                )
+        except Exception as exc:
+            if self.healthy:
+                logger.warning("Replica %s marked unhealthy: %s", self.name, exc)
+            self.healthy = False
+            self.lag_seconds = None
+            return
+
+        self.lag_seconds = float(lag or 0)
+        healthy = self.lag_seconds <= settings.DB_REPLICA_MAX_LAG_SECONDS
+        if healthy != self.healthy:
+            logger.info("Replica %s healthy=%s lag=%.2fs", self.name, healthy, self.lag_seconds)
+        self.healthy = healthy
+
+
+class ReplicaRouter:
+    """Hands out read sessions from healthy replicas, falling back to the primary."""
+
+    def __init__(self, urls: list[str]) -> None:
+        self.urls = urls
+        self.replicas: list[Replica] = []
+        self._round_robin = itertools.count()
+        self._monitor: Optional[asyncio.Task] = None
+
+    def read_sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return AsyncSessionLocal
+        return healthy[next(self._round_robin) % len(healthy)].sessionmaker
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def _monitor_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_HEALTH_CHECK_INTERVAL)
+            await self.check_all()
+
+    async def start(self) -> None:
+        if not self.urls or self._monitor is not None:
+            return
+        self.replicas = [Replica(url) for url in self.urls]
+        await self.check_all()
+        for replica in self.replicas:
+            if replica.healthy:
+                await warm_pool(replica.engine, settings.DB_POOL_WARMUP)
+        self._monitor = asyncio.create_task(self._monitor_loop())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+        self.replicas = []
+
+    def forget(self) -> None:
+        for replica in self.replicas:
+            replica.engine.sync_engine.dispose(close=False)
+        self.replicas = []
+        self._monitor = None
+
+
+replica_router = ReplicaRouter(settings.DB_REPLICA_URLS)
+
+os.register_at_fork(after_in_child=_forget_engines_after_fork)
+
+
+# Sessions check out a connection on their first statement, not when created. Request
+# dependencies (app.api.deps) are function-scoped, so the session is closed and the connection
+# returned as soon as the route handler returns, before the response is serialized and sent.
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """True for sessions handed out by ``get_read_db`` from a replica rather than the primary."""
+    return session.bind is not None and session.bind is not engine
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only work; served by a replica when one is healthy and caught up."""
+    async with replica_router.read_sessionmaker()() as session:
+        yield session
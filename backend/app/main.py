@@ -1,16 +1,41 @@
+from app.core.startup import BootTimingMiddleware, mark_boot
+
 import logging
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
+from app.core.admission import AdmissionControlMiddleware, AdmissionController
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.db.session import AsyncSessionLocal
+from app.db.cache_bus import cache_bus
+from app.db.notify import pg_listener
+from app.db.pool_metrics import PoolHoldMiddleware, pool_hold_metrics
+from app.db.session import AsyncSessionLocal, dispose_engines, init_engines, pool_usage
+from app.api import media as media_routes
+from app.api.v1 import activity as activity_routes
+from app.api.v1 import assignments as assignment_routes
 from app.api.v1 import auth as auth_routes
+from app.api.v1 import customers as customer_routes
+from app.api.v1 import customer_types as customer_type_routes
+from app.api.v1 import dispatch as dispatch_routes
+from app.api.v1 import imports as import_routes
+from app.api.v1 import jobs as job_routes
+from app.api.v1 import reports as report_routes
+from app.crud.statements import check_cache_sizes
 from app.crud.user import get_user_by_email, create_user
 from app.models.user import UserRole
 from app.schemas.user import UserCreate
+from app.services.activity_log import activity_writer
+from app.services.assignment_events import assignment_event_broker
+from app.services.caller_id import caller_id_cache
+from app.services.dispatch import call_dispatcher
+from app.services.history_archive import partition_maintainer
+from app.services.import_parsing import shutdown_parse_pool
+from app.services.job_runner import job_runner
+from app.services.segment_index import segment_index
 
 
 setup_logging()
@@ -25,6 +50,19 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+admission_controller = AdmissionController(pool_usage)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+if settings.DB_POOL_METRICS_ENABLED:
+    app.add_middleware(PoolHoldMiddleware)
+app.add_middleware(BootTimingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[str(origin).rstrip("/") for origin in settings.BACKEND_CORS_ORIGINS],
@@ -34,12 +72,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Static files (serve uploaded media)
-app.mount(
-    "/media",
-    StaticFiles(directory=settings.MEDIA_ROOT, check_dir=True),
-    name="media",
-)
+
+@app.on_event("startup")
+async def init_database() -> None:
+    engine = await init_engines()
+    admission_controller.watch_pool(engine)
+    check_cache_sizes()
+
+
+@app.on_event("shutdown")
+async def close_database() -> None:
+    await job_runner.stop()
+    await activity_writer.stop()
+    await segment_index.stop()
+    await caller_id_cache.stop()
+    await call_dispatcher.stop()
+    await pg_listener.stop()
+    await partition_maintainer.stop()
+    shutdown_parse_pool()
+    await dispose_engines()
 
 
 @app.on_event("startup")
@@ -65,9 +116,94 @@ async def init_initial_superuser() -> None:
         await create_user(session, user_in)
 
 # Routers
+app.include_router(media_routes.router)
+app.include_router(activity_routes.router, prefix=settings.API_V1_STR)
 app.include_router(auth_routes.router, prefix=settings.API_V1_STR)
+app.include_router(assignment_routes.router, prefix=settings.API_V1_STR)
+app.include_router(customer_routes.router, prefix=settings.API_V1_STR)
+app.include_router(customer_type_routes.router, prefix=settings.API_V1_STR)
+app.include_router(dispatch_routes.router, prefix=settings.API_V1_STR)
+app.include_router(import_routes.router, prefix=settings.API_V1_STR)
+app.include_router(job_routes.router, prefix=settings.API_V1_STR)
+app.include_router(report_routes.router, prefix=settings.API_V1_STR)
+
+mark_boot("imports")
+
+
+@app.on_event("startup")
+async def start_job_runner() -> None:
+    if settings.JOB_RUNNER_ENABLED:
+        await job_runner.start()
+
+
+@app.on_event("startup")
+async def start_segment_index() -> None:
+    if settings.SEGMENT_INDEX_ENABLED:
+        segment_index.start()
+
+
+@app.on_event("startup")
+async def start_caller_id_cache() -> None:
+    if settings.CALLER_ID_CACHE_ENABLED:
+        await caller_id_cache.start()
+
+
+@app.on_event("startup")
+async def start_activity_log() -> None:
+    if settings.ACTIVITY_LOG_ENABLED:
+        activity_writer.start()
+
+
+@app.on_event("startup")
+async def start_call_dispatch() -> None:
+    if settings.DISPATCH_ENABLED:
+        call_dispatcher.start()
+
+
+@app.on_event("startup")
+async def start_cache_bus() -> None:
+    if settings.CACHE_BUS_ENABLED:
+        await cache_bus.start()
+
+
+@app.on_event("startup")
+async def start_assignment_events() -> None:
+    if settings.ASSIGNMENT_EVENTS_ENABLED:
+        await assignment_event_broker.start()
+
+
+@app.on_event("startup")
+async def start_partition_maintenance() -> None:
+    if settings.HISTORY_PARTITIONS_ENABLED:
+        partition_maintainer.start()
+
+
+@app.on_event("startup")
+async def record_startup_complete() -> None:
+    mark_boot("startup")
 
 
 @app.get("/health", tags=["health"])
 async def root_health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/health/pool", tags=["health"])
+async def pool_health() -> dict[str, Any]:
+    """Connection pool usage and hold times for this worker."""
+    try:
+        max_connections, checked_out = pool_usage()
+    except RuntimeError:
+        max_connections, checked_out = 0, 0
+    return {
+        "max_connections": max_connections,
+        "checked_out": checked_out,
+        "hold": pool_hold_metrics.stats(),
+        "admission": admission_controller.stats(),
+    }
+
+
+@app.get("/health/activity", tags=["health"])
+async def activity_health() -> dict[str, Any]:
+    """Activity log buffer, batch writes and backpressure for this worker."""
+    return activity_writer.stats()
@@ -2,16 +2,27 @@ from app.models.base import Base
 
 from app.models.user import User
 from app.models.customer import (
+    ActivityKind,
     AssignmentStatus,
+    CallActivityEvent,
     CallRemark,
     CallStatus,
     CallerAssignment,
     CallerAssignmentItem,
     Customer,
+    CustomerMergeProposal,
+    CustomerTimelineEvent,
     CustomerType,
     CustomerTypeMap,
     CustomerTypeSource,
+    DispatchCandidate,
+    DispatchReason,
+    ImportErrorChunk,
+    MergeProposalStatus,
+    TimelineEventKind,
     UploadBatch,
     UploadStatus,
 )
-
+from app.models.job import Job, JobStatus
+from app.models.rate_limit import RateLimitBucket
+from app.models.report import ALL_CUSTOMER_TYPES, CallOutcomeDaily, HistoryArchive
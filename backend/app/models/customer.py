@@ -1,8 +1,10 @@
 import enum
 import uuid
 from datetime import date, datetime
+from typing import Any
 
-from sqlalchemy import Date, DateTime, Enum, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import JSON, BigInteger, Date, DateTime, Enum, Float, ForeignKey, ForeignKeyConstraint, Index, Integer, LargeBinary, String, Text, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, GUID, TimestampMixin
@@ -16,6 +18,8 @@ class Customer(TimestampMixin, Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     primary_mobile: Mapped[str] = mapped_column(String(20), nullable=True, index=True)
     email: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
+    # Normalized mobile (or lower-cased email when no mobile) used to merge duplicates.
+    identity_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
     type_mappings: Mapped[list["CustomerTypeMap"]] = relationship(
         "CustomerTypeMap", back_populates="customer", cascade="all, delete-orphan"
@@ -24,6 +28,7 @@ class Customer(TimestampMixin, Base):
     __table_args__ = (
         Index("ix_customers_primary_mobile", "primary_mobile"),
         Index("ix_customers_email", "email"),
+        Index("uq_customers_identity_key", "identity_key", unique=True),
     )
 
 
@@ -33,6 +38,8 @@ class CustomerType(TimestampMixin, Base):
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
+    # Added to the dispatch priority of customers of this type (highest of their active types).
+    dispatch_priority: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     mappings: Mapped[list["CustomerTypeMap"]] = relationship("CustomerTypeMap", back_populates="customer_type")
 
@@ -62,6 +69,33 @@ class CustomerTypeMap(Base):
     )
 
 
+class MergeProposalStatus(str, enum.Enum):
+    pending = "pending"
+    approved = "approved"
+    applied = "applied"
+    rejected = "rejected"
+    # Its duplicate was merged through another proposal.
+    superseded = "superseded"
+
+
+class CustomerMergeProposal(Base):
+    __tablename__ = "customer_merge_proposals"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    survivor_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("customers.id"), nullable=False, index=True)
+    # No foreign key: applying the proposal deletes the duplicate but keeps this row as history.
+    duplicate_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False, index=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    reasons: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(50), default=MergeProposalStatus.pending.value, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    applied_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("survivor_id", "duplicate_id", name="uq_customer_merge_pair"),
+    )
+
+
 class UploadStatus(str, enum.Enum):
     processing = "processing"
     completed = "completed"
@@ -78,24 +112,55 @@ class UploadBatch(Base):
     new_customers: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     merged_customers: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     failed_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    processed_rows: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     status: Mapped[str] = mapped_column(String(50), default=UploadStatus.processing.value, nullable=False)
+    # sha256 of the uploaded file; re-uploads of the same content reuse (or resume) this batch.
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    file_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Import settings applied to every row, e.g. {"customer_type_ids": [...], "source": "upload"}.
+    options: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     uploaded_user: Mapped[User | None] = relationship(User)
 
 
+class ImportErrorChunk(Base):
+    """Failed rows of one committed import chunk, packed and zlib-compressed.
+
+    ``data`` holds ``(row, column, error code)`` triples (see ``app.services.import_errors``):
+    a few bytes per failed row instead of a table row each.
+    """
+
+    __tablename__ = "import_error_chunks"
+
+    batch_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("upload_batches.id", ondelete="CASCADE"), primary_key=True
+    )
+    # 1-based data row numbers, as counted by processed_rows.
+    first_row: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_row: Mapped[int] = mapped_column(Integer, nullable=False)
+    error_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
 class AssignmentStatus(str, enum.Enum):
     open = "open"
     submitted = "submitted"
     locked = "locked"
 
 
+# Call history (assignments, their items and remarks) is range-partitioned by assignment month.
+# Items and remarks carry their assignment's date so every foreign key stays inside one month's
+# partitions, which lets a whole month be archived and detached together (app.services.history_archive).
+HISTORY_PARTITION_BY = {"postgresql_partition_by": "RANGE (assignment_date)"}
+
+
 class CallerAssignment(Base):
     __tablename__ = "caller_assignments"
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     caller_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("users.id"), nullable=False, index=True)
-    assignment_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    assignment_date: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
     status: Mapped[str] = mapped_column(String(50), default=AssignmentStatus.open.value, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -106,6 +171,7 @@ class CallerAssignment(Base):
 
     __table_args__ = (
         UniqueConstraint("caller_id", "assignment_date", name="uq_caller_assignment_date"),
+        HISTORY_PARTITION_BY,
     )
 
 
@@ -120,7 +186,8 @@ class CallerAssignmentItem(Base):
     __tablename__ = "caller_assignment_items"
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
-    assignment_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("caller_assignments.id"), nullable=False, index=True)
+    assignment_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False, index=True)
+    assignment_date: Mapped[date] = mapped_column(Date, primary_key=True)
     customer_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("customers.id"), nullable=False, index=True)
     call_status: Mapped[str] = mapped_column(String(50), default=CallStatus.pending.value, nullable=False)
     last_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -132,7 +199,11 @@ class CallerAssignmentItem(Base):
     )
 
     __table_args__ = (
-        UniqueConstraint("assignment_id", "customer_id", name="uq_assignment_customer"),
+        ForeignKeyConstraint(
+            ["assignment_id", "assignment_date"], ["caller_assignments.id", "caller_assignments.assignment_date"]
+        ),
+        UniqueConstraint("assignment_id", "customer_id", "assignment_date", name="uq_assignment_customer"),
+        HISTORY_PARTITION_BY,
     )
 
 
@@ -140,16 +211,120 @@ class CallRemark(Base):
     __tablename__ = "call_remarks"
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
-    assignment_item_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("caller_assignment_items.id"), nullable=False, index=True)
+    assignment_item_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False, index=True)
+    assignment_date: Mapped[date] = mapped_column(Date, primary_key=True)
     remark_text: Mapped[str] = mapped_column(Text, nullable=False)
     outcome: Mapped[str] = mapped_column(String(50), nullable=False)
     follow_up_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     created_by: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("users.id"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # The customer's types when the remark was inserted (filled by a trigger); rollups and their
+    # backfill count the call under these. NULL for remarks older than the column.
+    customer_type_ids: Mapped[list[uuid.UUID] | None] = mapped_column(ARRAY(PGUUID(as_uuid=True)), nullable=True)
 
     assignment_item: Mapped[CallerAssignmentItem] = relationship("CallerAssignmentItem", back_populates="remarks")
     author: Mapped[User] = relationship(User)
 
     __table_args__ = (
         Index("ix_call_remarks_follow_up_date", "follow_up_date"),
+        Index("ix_call_remarks_created_at", "created_at"),
+        ForeignKeyConstraint(
+            ["assignment_item_id", "assignment_date"],
+            ["caller_assignment_items.id", "caller_assignment_items.assignment_date"],
+        ),
+        HISTORY_PARTITION_BY,
+    )
+
+
+class TimelineEventKind(str, enum.Enum):
+    remark = "remark"
+    call_status = "call_status"
+    type_added = "type_added"
+    type_removed = "type_removed"
+    import_merge = "import_merge"
+    customer_merge = "customer_merge"
+
+
+class CustomerTimelineEvent(Base):
+    """Append-only, denormalized history of one customer, newest read first.
+
+    Remarks, call status changes and type-map changes are written by triggers on their tables;
+    upsert merges by ``app.crud.customer`` and applied duplicate merges by
+    ``app.services.customer_dedupe``. ``details`` carries everything a timeline page shows, so
+    reading a page is one range scan of ``ix_customer_timeline_customer_created``.
+    """
+
+    __tablename__ = "customer_timeline"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
+    customer_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("customers.id", ondelete="CASCADE"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    actor_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    details: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_customer_timeline_customer_created", "customer_id", "created_at", "id"),
+    )
+
+
+class DispatchReason(str, enum.Enum):
+    follow_up_due = "follow_up_due"
+    not_reachable_retry = "not_reachable_retry"
+    missed = "missed"
+
+
+class DispatchCandidate(Base):
+    """A customer waiting in the shared call pool served by ``app.services.dispatch``.
+
+    Rows are recomputed from call history by the pool refresh; a caller's worker claims a few
+    at a time (``claimed_by``), and serving one deletes it and adds it to the caller's assignment
+    for the day. Claims older than ``DISPATCH_LEASE_SECONDS`` return to the pool.
+    """
+
+    __tablename__ = "dispatch_pool"
+
+    customer_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True
+    )
+    priority: Mapped[int] = mapped_column(Integer, nullable=False)
+    reason: Mapped[str] = mapped_column(String(50), nullable=False)
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    claimed_by: Mapped[uuid.UUID | None] = mapped_column(GUID(), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_dispatch_pool_next", text("priority DESC"), "due_at", postgresql_where=text("claimed_by IS NULL")),
+        Index("ix_dispatch_pool_claimed_by", "claimed_by", postgresql_where=text("claimed_by IS NOT NULL")),
+    )
+
+
+class ActivityKind(str, enum.Enum):
+    dial = "dial"
+    hangup = "hangup"
+    status_change = "status_change"
+    remark = "remark"
+    dispatched = "dispatched"
+
+
+class CallActivityEvent(Base):
+    """Append-only log of caller actions, written in batches by ``app.services.activity_log``.
+
+    No foreign keys: rows are bulk-copied and never updated, and the log outlives merged or
+    archived customers and items.
+    """
+
+    __tablename__ = "call_activity_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    caller_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    customer_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    assignment_item_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    details: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+
+    __table_args__ = (
+        Index("ix_call_activity_events_caller_occurred", "caller_id", "occurred_at"),
+        Index("ix_call_activity_events_customer_occurred", "customer_id", "occurred_at"),
     )
@@ -0,0 +1,50 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, PrimaryKeyConstraint, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import GUID, Base
+
+
+# customer_type_id value of the per-(day, caller, outcome) total row. A call on a customer with
+# several types is counted once under each type, so totals cannot be summed from typed rows.
+ALL_CUSTOMER_TYPES = uuid.UUID(int=0)
+
+
+class CallOutcomeDaily(Base):
+    """Calls per report day, caller, outcome and customer type.
+
+    Maintained by a statement-level trigger on ``call_remarks``; ``call_rollup_day()`` in the
+    database defines the report day in ``REPORT_TIMEZONE``. Calls are counted under the customer
+    types captured on the remark, so the trigger and the backfill agree.
+    """
+
+    __tablename__ = "call_outcome_daily"
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    caller_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("users.id"), nullable=False)
+    outcome: Mapped[str] = mapped_column(String(50), nullable=False)
+    customer_type_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("day", "caller_id", "outcome", "customer_type_id", name="pk_call_outcome_daily"),
+    )
+
+
+class HistoryArchive(Base):
+    """A month of call history exported to Parquet and detached from the live tables.
+
+    ``month`` is the first day of the assignment month; ``path`` is the archive root the files
+    were written under (``<table>/month=YYYY-MM/data.parquet``).
+    """
+
+    __tablename__ = "history_archives"
+
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    path: Mapped[str] = mapped_column(String(500), nullable=False)
+    assignments: Mapped[int] = mapped_column(Integer, nullable=False)
+    items: Mapped[int] = mapped_column(Integer, nullable=False)
+    remarks: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
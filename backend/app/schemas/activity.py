@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.customer import ActivityKind
+
+
+class ActivityEventCreate(BaseModel):
+    kind: ActivityKind
+    customer_id: Optional[UUID] = None
+    assignment_item_id: Optional[UUID] = None
+    details: Optional[dict[str, Any]] = None
+    # When the action happened on the client; defaults to the time it is received.
+    occurred_at: Optional[datetime] = None
+
+
+class ActivityBatchCreate(BaseModel):
+    events: list[ActivityEventCreate] = Field(min_length=1, max_length=100)
+
+
+class ActivityAcceptedResult(BaseModel):
+    accepted: int
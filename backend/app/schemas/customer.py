@@ -1,12 +1,23 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, Field, validator
 
 from app.schemas.customer_type import CustomerTypeRead
 
 
+def normalize_mobile(v: Optional[str]) -> Optional[str]:
+    if not v:
+        return v
+    digits = "".join(ch for ch in v if ch.isdigit())
+    if len(digits) < 7:
+        return v
+    if digits.startswith("91") and len(digits) == 12:
+        digits = digits[2:]
+    return digits
+
+
 class CustomerBase(BaseModel):
     name: str
     primary_mobile: Optional[str] = None
@@ -14,14 +25,7 @@ class CustomerBase(BaseModel):
 
     @validator("primary_mobile")
     def normalize_mobile(cls, v: Optional[str]) -> Optional[str]:
-        if not v:
-            return v
-        digits = "".join(ch for ch in v if ch.isdigit())
-        if len(digits) < 7:
-            return v
-        if digits.startswith("91") and len(digits) == 12:
-            digits = digits[2:]
-        return digits
+        return normalize_mobile(v)
 
 
 class CustomerCreate(CustomerBase):
@@ -36,6 +40,76 @@ class CustomerUpdate(BaseModel):
     customer_type_ids: Optional[list[UUID]] = None
 
 
+class CustomerUpsertResult(BaseModel):
+    id: UUID
+    created: bool
+    merged: bool
+
+
+class CustomerMergeProposalRead(BaseModel):
+    id: UUID
+    survivor_id: UUID
+    duplicate_id: UUID
+    score: float
+    reasons: str
+    status: str
+    created_at: datetime
+    applied_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CustomerMergeApplyRequest(BaseModel):
+    # None approves every pending proposal.
+    proposal_ids: Optional[list[UUID]] = None
+
+
+class CustomerSegmentQuery(BaseModel):
+    # Customers with every type in all_of, at least one in any_of (when given) and none in none_of.
+    all_of: list[UUID] = []
+    any_of: list[UUID] = []
+    none_of: list[UUID] = []
+    include_ids: bool = False
+    offset: int = Field(default=0, ge=0)
+    limit: int = Field(default=1000, ge=1, le=10000)
+
+
+class CustomerSegmentResult(BaseModel):
+    count: int
+    customer_ids: Optional[list[UUID]] = None
+
+
+class CallerIdSummaryRead(BaseModel):
+    customer_id: UUID
+    name: str
+    primary_mobile: str
+    customer_type_ids: list[UUID]
+    latest_remark: Optional[str] = None
+    latest_outcome: Optional[str] = None
+    latest_remark_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CustomerTimelineEventRead(BaseModel):
+    id: UUID
+    kind: str
+    actor_id: Optional[UUID] = None
+    details: dict[str, Any]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CustomerTimelinePage(BaseModel):
+    events: list[CustomerTimelineEventRead]
+    # Pass back as ``cursor`` for the next (older) page; None on the last page.
+    next_cursor: Optional[str] = None
+
+
 class CustomerTypeMapRead(BaseModel):
     id: UUID
     customer_type: CustomerTypeRead
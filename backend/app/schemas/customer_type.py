@@ -8,6 +8,7 @@ from pydantic import BaseModel
 class CustomerTypeBase(BaseModel):
     name: str
     is_active: bool = True
+    dispatch_priority: int = 0
 
 
 class CustomerTypeCreate(CustomerTypeBase):
@@ -17,6 +18,7 @@ class CustomerTypeCreate(CustomerTypeBase):
 class CustomerTypeUpdate(BaseModel):
     name: Optional[str] = None
     is_active: Optional[bool] = None
+    dispatch_priority: Optional[int] = None
 
 
 class CustomerTypeRead(CustomerTypeBase):
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class DispatchedCallRead(BaseModel):
+    assignment_id: UUID
+    assignment_date: date
+    item_id: UUID
+    customer_id: UUID
+    customer_name: str
+    primary_mobile: Optional[str] = None
+    reason: str
+    priority: int
+    due_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class DispatchReleaseResult(BaseModel):
+    released: int
+
+
+class DispatchRefreshResult(BaseModel):
+    # None when another worker was already refreshing the pool.
+    candidates: Optional[int] = None
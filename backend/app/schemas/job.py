@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class JobRead(BaseModel):
+    id: UUID
+    job_type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    progress_current: int
+    progress_total: Optional[int] = None
+    last_error: Optional[str] = None
+    upload_batch_id: Optional[UUID] = None
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
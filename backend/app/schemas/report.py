@@ -0,0 +1,25 @@
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class CallOutcomePoint(BaseModel):
+    day: date
+    caller_id: Optional[UUID] = None
+    outcome: str
+    count: int
+
+
+class CallHistoryEntry(BaseModel):
+    remark_id: UUID
+    assignment_id: UUID
+    assignment_date: date
+    caller_id: UUID
+    call_status: str
+    outcome: str
+    remark_text: str
+    follow_up_date: Optional[date] = None
+    created_at: datetime
+    archived: bool = False
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class UploadBatchRead(BaseModel):
+    id: UUID
+    file_name: str
+    status: str
+    total_rows: int
+    processed_rows: int
+    new_customers: int
+    merged_customers: int
+    failed_rows: int
+    content_sha256: Optional[str] = None
+    uploaded_by: Optional[UUID] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ImportUploadResult(BaseModel):
+    batch: UploadBatchRead
+    # True when the file matched an earlier batch, which was returned (or resumed) instead.
+    duplicate: bool
@@ -0,0 +1,187 @@
+"""Buffered, batched writer for the call activity log.
+
+Request handlers call ``activity_writer.record(...)``, which only appends to an in-memory
+buffer. One task per worker drains the buffer into ``call_activity_events`` with COPY (or a
+multi-row INSERT), in batches of up to ``ACTIVITY_BATCH_SIZE``, as soon as a full batch is
+waiting or every ``ACTIVITY_FLUSH_INTERVAL_MS``.
+
+Durability is deliberately bounded rather than per request:
+
+* a batch leaves the buffer only after its transaction commits; failed writes are retried;
+* shutdown flushes what is left for up to ``ACTIVITY_SHUTDOWN_FLUSH_SECONDS``;
+* a crash loses what was buffered, normally under one flush interval of events
+  (``oldest_buffered_ms`` in ``stats()`` is the current window);
+* the buffer is capped at ``ACTIVITY_MAX_BUFFER``; beyond that ``record`` refuses events and
+  counts them in ``rejected``, so a stalled database shows up as backpressure, not memory growth.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.customer import ActivityKind, CallActivityEvent
+
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = ["occurred_at", "caller_id", "kind", "customer_id", "assignment_item_id", "details"]
+
+
+class ActivityRecord(NamedTuple):
+    occurred_at: datetime
+    caller_id: UUID
+    kind: str
+    customer_id: Optional[UUID]
+    assignment_item_id: Optional[UUID]
+    details: Optional[dict[str, Any]]
+    enqueued_at: float
+
+    def copy_row(self) -> tuple:
+        details = json.dumps(self.details) if self.details is not None else None
+        return (self.occurred_at, self.caller_id, self.kind, self.customer_id, self.assignment_item_id, details)
+
+    def insert_row(self) -> dict[str, Any]:
+        return dict(zip(COPY_COLUMNS, self[:6]))
+
+
+async def write_activity_batch(records: list[ActivityRecord]) -> None:
+    async with AsyncSessionLocal() as session:
+        if settings.ACTIVITY_WRITE_METHOD == "copy":
+            connection = await session.connection()
+            driver = (await connection.get_raw_connection()).driver_connection
+            if driver is None:
+                raise RuntimeError("Pooled connection has no asyncpg connection to COPY through")
+            await driver.copy_records_to_table(
+                CallActivityEvent.__tablename__, records=[record.copy_row() for record in records], columns=COPY_COLUMNS
+            )
+        else:
+            await session.execute(insert(CallActivityEvent), [record.insert_row() for record in records])
+        await session.commit()
+
+
+class ActivityWriter:
+    def __init__(self, write: Callable[[list[ActivityRecord]], Awaitable[None]] = write_activity_batch) -> None:
+        self._write = write
+        self._buffer: deque[ActivityRecord] = deque()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.batches = 0
+        self.rejected = 0
+        self.failures = 0
+        self.last_batch_ms = 0.0
+
+    def has_room(self, count: int = 1) -> bool:
+        return len(self._buffer) + count <= settings.ACTIVITY_MAX_BUFFER
+
+    def record(
+        self,
+        kind: ActivityKind,
+        caller_id: UUID,
+        *,
+        customer_id: Optional[UUID] = None,
+        assignment_item_id: Optional[UUID] = None,
+        details: Optional[dict[str, Any]] = None,
+        occurred_at: Optional[datetime] = None,
+    ) -> bool:
+        """Queue one event; False (and counted in ``rejected``) when the buffer is full."""
+        if not self.has_room():
+            self.rejected += 1
+            return False
+        self._buffer.append(
+            ActivityRecord(
+                occurred_at or datetime.now(timezone.utc),
+                caller_id,
+                ActivityKind(kind).value,
+                customer_id,
+                assignment_item_id,
+                details,
+                time.monotonic(),
+            )
+        )
+        if len(self._buffer) >= settings.ACTIVITY_BATCH_SIZE:
+            self._wake.set()
+        return True
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; raises (leaving the rest buffered) if a batch fails."""
+        flushed = 0
+        while self._buffer:
+            batch = list(islice(self._buffer, settings.ACTIVITY_BATCH_SIZE))
+            started = time.perf_counter()
+            await self._write(batch)
+            # Only this task removes from the left; record() appends on the right meanwhile.
+            for _ in batch:
+                self._buffer.popleft()
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+            self.written += len(batch)
+            self.batches += 1
+            flushed += len(batch)
+        return flushed
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.ACTIVITY_FLUSH_INTERVAL_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                backoff = 0.5
+            except Exception:
+                self.failures += 1
+                logger.exception("Writing %s buffered activity events failed; retrying", len(self._buffer))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is left, for at most ACTIVITY_SHUTDOWN_FLUSH_SECONDS."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._stopping = True
+        self._wake.set()
+        try:
+            # Let an in-flight batch commit instead of cancelling it half-written.
+            await asyncio.wait_for(asyncio.shield(task), timeout=settings.ACTIVITY_SHUTDOWN_FLUSH_SECONDS)
+            await asyncio.wait_for(self.flush(), timeout=settings.ACTIVITY_SHUTDOWN_FLUSH_SECONDS)
+        except Exception:
+            task.cancel()
+            logger.exception("Activity log shutdown flush incomplete")
+        if self._buffer:
+            logger.error("Dropping %s unwritten activity events at shutdown", len(self._buffer))
+
+    def stats(self) -> dict[str, Any]:
+        oldest = self._buffer[0].enqueued_at if self._buffer else None
+        return {
+            "buffered": len(self._buffer),
+            "max_buffer": settings.ACTIVITY_MAX_BUFFER,
+            "oldest_buffered_ms": round((time.monotonic() - oldest) * 1000, 1) if oldest is not None else 0.0,
+            "written": self.written,
+            "batches": self.batches,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "rejected": self.rejected,
+            "write_failures": self.failures,
+        }
+
+
+activity_writer = ActivityWriter()
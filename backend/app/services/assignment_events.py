@@ -0,0 +1,125 @@
+"""Fan-out of assignment changes to server-sent event streams.
+
+Statement-level triggers on ``caller_assignment_items`` and ``call_remarks`` NOTIFY
+``assignment_events`` once per assignment a statement touched, with a small JSON payload: the
+assignment and caller ids (plus ``assignment_date`` on remarks), ``count``, and the changed rows under ``items`` or ``remarks`` (ids,
+status/outcome, timestamps; never remark text). Past 20 rows the list is null and clients
+refetch. Every worker receives them on its ``pg_listener`` connection and hands them to the
+subscribers whose scope matches: one assignment, one caller's assignments, or everything
+(supervisors).
+
+Each subscriber has a bounded queue. When a client reads slower than events arrive, its queue
+is dropped and replaced by a single ``resync`` event, after which the stream closes; the client
+refetches the assignment and reconnects. Memory per subscriber is therefore capped at
+``ASSIGNMENT_EVENTS_QUEUE_SIZE`` events no matter how slow the client is.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.notify import pg_listener
+
+
+logger = logging.getLogger(__name__)
+
+ASSIGNMENT_EVENTS_CHANNEL = "assignment_events"
+
+
+class AssignmentEvent:
+    __slots__ = ("kind", "assignment_id", "caller_id", "payload")
+
+    def __init__(self, kind: str, assignment_id: Optional[str], caller_id: Optional[str], payload: str) -> None:
+        self.kind = kind
+        self.assignment_id = assignment_id
+        self.caller_id = caller_id
+        self.payload = payload
+
+    def encode(self) -> str:
+        return f"event: {self.kind}\ndata: {self.payload}\n\n"
+
+
+RESYNC = AssignmentEvent("resync", None, None, "{}")
+
+
+class Subscription:
+    def __init__(self, assignment_id: Optional[UUID], caller_id: Optional[UUID], maxsize: int) -> None:
+        self.assignment_id = str(assignment_id) if assignment_id else None
+        self.caller_id = str(caller_id) if caller_id else None
+        self.queue: asyncio.Queue[AssignmentEvent] = asyncio.Queue(maxsize)
+        self.lagged = False
+
+    def matches(self, event: AssignmentEvent) -> bool:
+        if self.assignment_id is not None and event.assignment_id != self.assignment_id:
+            return False
+        return self.caller_id is None or event.caller_id == self.caller_id
+
+    def offer(self, event: AssignmentEvent) -> None:
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self) -> None:
+        """Drop everything buffered and leave only ``resync``; the stream ends after sending it."""
+        self.lagged = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESYNC)
+
+
+class AssignmentEventBroker:
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+        self._started = False
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, *, assignment_id: Optional[UUID] = None, caller_id: Optional[UUID] = None) -> Optional[Subscription]:
+        """New subscription, or ``None`` when this worker is at ``ASSIGNMENT_EVENTS_MAX_SUBSCRIBERS``."""
+        if len(self._subscribers) >= settings.ASSIGNMENT_EVENTS_MAX_SUBSCRIBERS:
+            return None
+        subscription = Subscription(assignment_id, caller_id, settings.ASSIGNMENT_EVENTS_QUEUE_SIZE)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed assignment event: %.200s", payload)
+            return
+        event = AssignmentEvent(data.get("kind", "change"), data.get("assignment_id"), data.get("caller_id"), payload)
+        for subscription in self._subscribers:
+            if subscription.matches(event):
+                was_lagged = subscription.lagged
+                subscription.offer(event)
+                if subscription.lagged and not was_lagged:
+                    self.dropped += 1
+
+    def resync_all(self) -> None:
+        # Notifications sent while the listener was reconnecting are gone; every client refetches.
+        for subscription in self._subscribers:
+            if not subscription.lagged:
+                subscription.resync()
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        await pg_listener.listen(ASSIGNMENT_EVENTS_CHANNEL, self.publish)
+        pg_listener.on_reconnect(self.resync_all)
+        pg_listener.start()
+
+
+assignment_event_broker = AssignmentEventBroker()
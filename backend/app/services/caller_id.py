@@ -0,0 +1,349 @@
+"""In-process caller-ID cache: normalized mobile number -> compact customer summary.
+
+The bulk-loaded base lives in parallel arrays sorted by mobile (as an integer key), with names
+and remark snippets packed into byte blobs, so 5M customers cost tens of bytes each rather
+than several Python objects apiece. Lookups bisect the mobile array. Changes since the last
+rebuild live in a small overlay dict: invalidated numbers are re-read from the database on
+their next lookup, and misses fall back to the database so customers created by other
+workers are still found. Invalidations arrive through ``cache_bus`` (namespace
+``caller_id``, keyed by mobile); a flush distrusts the whole base until the next rebuild.
+New remarks arrive as ``assignment_events`` notifications listing the customers' mobiles; when
+a statement wrote too many remarks to list, the assignment's mobiles are read back with one
+query and only those are invalidated.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Optional, cast
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.cache_bus import cache_bus
+from app.db.notify import pg_listener
+from app.db.session import AsyncSessionLocal
+from app.schemas.customer import normalize_mobile
+from app.services.assignment_events import ASSIGNMENT_EVENTS_CHANNEL
+
+
+logger = logging.getLogger(__name__)
+
+CALLER_ID_NAMESPACE = "caller_id"
+
+# Digit-only mobiles fit in a bigint; anything else is not cached and always read from the DB.
+_MOBILE_FILTER = "c.primary_mobile ~ '^[0-9]{7,15}$'"
+
+_SUMMARY_SELECT = """
+    SELECT c.primary_mobile, c.id, c.name,
+           ARRAY(SELECT m.customer_type_id FROM customer_type_maps m WHERE m.customer_id = c.id) AS type_ids,
+           lr.remark_text, lr.outcome, lr.created_at
+    FROM customers c
+    LEFT JOIN LATERAL (
+        SELECT r.remark_text, r.outcome, r.created_at
+        FROM caller_assignment_items i
+        JOIN call_remarks r ON r.assignment_item_id = i.id AND r.assignment_date = i.assignment_date
+        WHERE i.customer_id = c.id
+        ORDER BY r.created_at DESC
+        LIMIT 1
+    ) lr ON true
+"""
+_LOAD_ALL_SQL = text(
+    f"{_SUMMARY_SELECT} WHERE {_MOBILE_FILTER} ORDER BY CAST(c.primary_mobile AS bigint), length(c.primary_mobile)"
+).execution_options(yield_per=10_000)
+_LOAD_ONE_SQL = text(f"{_SUMMARY_SELECT} WHERE c.primary_mobile = :mobile LIMIT 1")
+_ASSIGNMENT_MOBILES_SQL = text(
+    """
+    SELECT DISTINCT c.primary_mobile
+    FROM caller_assignment_items i
+    JOIN customers c ON c.id = i.customer_id
+    WHERE i.assignment_id = :assignment_id AND i.assignment_date = :assignment_date
+    """
+)
+
+
+@dataclass(slots=True, frozen=True)
+class CallerSummary:
+    customer_id: UUID
+    name: str
+    primary_mobile: str
+    customer_type_ids: tuple[UUID, ...]
+    latest_remark: Optional[str] = None
+    latest_outcome: Optional[str] = None
+    latest_remark_at: Optional[datetime] = None
+
+
+def _mobile_key(normalized: Optional[str]) -> Optional[int]:
+    """The number shifted left by 4 bits plus its digit count, so "0987..." and "987..." differ."""
+    if not normalized or not normalized.isdigit() or not 7 <= len(normalized) <= 15:
+        return None
+    return int(normalized) << 4 | len(normalized)
+
+
+def _span(ends: array, index: int) -> tuple[int, int]:
+    return (ends[index - 1] if index else 0), ends[index]
+
+
+def _snippet(remark: Optional[str]) -> Optional[str]:
+    if remark is None:
+        return None
+    limit = settings.CALLER_ID_REMARK_CHARS
+    return remark if len(remark) <= limit else remark[: limit - 1] + "…"
+
+
+class _PackedSummaries:
+    """Sorted, array-backed summaries built once per rebuild and never mutated afterwards."""
+
+    def __init__(self) -> None:
+        self.mobiles = array("q")
+        self.ids = bytearray()
+        self.name_blob = bytearray()
+        self.name_ends = array("I")
+        self.type_refs = array("H")
+        self.type_ends = array("I")
+        self.remark_blob = bytearray()
+        self.remark_ends = array("I")
+        self.outcome_refs = array("B")
+        self.remark_at = array("d")
+        self.type_table: list[UUID] = []
+        self.outcome_table: list[Optional[str]] = [None]
+        self._type_index: dict[UUID, int] = {}
+        self._outcome_index: dict[Optional[str], int] = {None: 0}
+
+    def append(self, row) -> None:
+        mobile, customer_id, name, type_ids, remark, outcome, remark_at = row
+        key = _mobile_key(mobile)
+        if key is None:
+            return  # _MOBILE_FILTER already leaves these out
+        if self.mobiles and self.mobiles[-1] == key:
+            return  # the same number on two customers; keep the first and let the DB serve lookups
+        self.mobiles.append(key)
+        self.ids += customer_id.bytes
+        self.name_blob += name.encode()
+        self.name_ends.append(len(self.name_blob))
+        for type_id in type_ids or ():
+            type_id = UUID(bytes=type_id.bytes)
+            ref = self._type_index.get(type_id)
+            if ref is None:
+                ref = self._type_index[type_id] = len(self.type_table)
+                self.type_table.append(type_id)
+            self.type_refs.append(ref)
+        self.type_ends.append(len(self.type_refs))
+        snippet = _snippet(remark)
+        if snippet is not None:
+            self.remark_blob += snippet.encode()
+        self.remark_ends.append(len(self.remark_blob))
+        outcome_ref = self._outcome_index.get(outcome)
+        if outcome_ref is None:
+            outcome_ref = self._outcome_index[outcome] = len(self.outcome_table)
+            self.outcome_table.append(outcome)
+        self.outcome_refs.append(outcome_ref)
+        self.remark_at.append(remark_at.timestamp() if remark_at is not None else math.nan)
+
+    def get(self, key: int, mobile: str) -> Optional[CallerSummary]:
+        index = bisect_left(self.mobiles, key)
+        if index == len(self.mobiles) or self.mobiles[index] != key:
+            return None
+        name_start, name_end = _span(self.name_ends, index)
+        types_start, types_end = _span(self.type_ends, index)
+        remark_start, remark_end = _span(self.remark_ends, index)
+        remark_at = self.remark_at[index]
+        has_remark = not math.isnan(remark_at)
+        return CallerSummary(
+            customer_id=UUID(bytes=bytes(self.ids[index * 16 : index * 16 + 16])),
+            name=self.name_blob[name_start:name_end].decode(),
+            primary_mobile=mobile,
+            customer_type_ids=tuple(self.type_table[ref] for ref in self.type_refs[types_start:types_end]),
+            latest_remark=self.remark_blob[remark_start:remark_end].decode() if has_remark else None,
+            latest_outcome=self.outcome_table[self.outcome_refs[index]],
+            latest_remark_at=datetime.fromtimestamp(remark_at, timezone.utc) if has_remark else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.mobiles)
+
+    def size_in_bytes(self) -> int:
+        arrays = (self.mobiles, self.name_ends, self.type_refs, self.type_ends, self.remark_ends, self.outcome_refs, self.remark_at)
+        blobs = (self.ids, self.name_blob, self.remark_blob)
+        return sum(a.itemsize * len(a) for a in arrays) + sum(len(b) for b in blobs)
+
+
+# Overlay value meaning "changed since the rebuild; re-read from the database".
+_STALE = object()
+
+
+class CallerIdCache:
+    def __init__(self) -> None:
+        self._base = _PackedSummaries()
+        self._overlay: dict[int, object] = {}
+        # Numbers invalidated while a rebuild is loading; its snapshot may predate the change.
+        self._invalidated_during_rebuild: Optional[set[int]] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self._flush_rebuild: Optional[asyncio.Task] = None
+        self._assignment_reads: set[asyncio.Task] = set()
+        self._rebuild_lock = asyncio.Lock()
+        # Bumped by flush(); while the base predates the latest flush every lookup goes to the DB.
+        self._generation = 0
+        self._base_generation = 0
+        self.built_at: Optional[float] = None
+
+    async def rebuild(self) -> None:
+        async with self._rebuild_lock:
+            started = time.perf_counter()
+            generation = self._generation
+            packed = _PackedSummaries()
+            self._invalidated_during_rebuild = set()
+            try:
+                async with AsyncSessionLocal() as session:
+                    async for row in await session.stream(_LOAD_ALL_SQL):
+                        packed.append(row)
+                self._base = packed
+                self._base_generation = generation
+                if generation == self._generation:
+                    self._overlay = {key: _STALE for key in self._invalidated_during_rebuild}
+            finally:
+                self._invalidated_during_rebuild = None
+            self.built_at = time.time()
+            logger.info(
+                "Caller-ID cache rebuilt: %s numbers, %.1f MB in %.0f ms",
+                len(packed),
+                packed.size_in_bytes() / 1e6,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    def invalidate(self, mobile: Optional[str]) -> None:
+        """Mark ``mobile`` as changed (customer edited, merged or remarked on)."""
+        key = _mobile_key(normalize_mobile(mobile))
+        if key is None:
+            return
+        self._overlay[key] = _STALE
+        if self._invalidated_during_rebuild is not None:
+            self._invalidated_during_rebuild.add(key)
+
+    def evict(self, keys: list[str]) -> None:
+        for mobile in keys:
+            self.invalidate(mobile)
+
+    def flush(self) -> None:
+        """Distrust everything cached (missed invalidations) and rebuild in the background."""
+        self._generation += 1
+        self._overlay = {}
+        if self._refresh is not None and (self._flush_rebuild is None or self._flush_rebuild.done()):
+            self._flush_rebuild = asyncio.create_task(self._rebuild_after_flush())
+
+    async def _rebuild_after_flush(self) -> None:
+        # A flush during the rebuild may have missed changes the snapshot predates; go again.
+        while self._base_generation != self._generation:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Caller-ID cache rebuild after flush failed")
+                return
+
+    def peek(self, normalized: str) -> tuple[Optional[int], Optional[CallerSummary], bool]:
+        """``(key, summary, needs_db)`` for a normalized mobile, from memory only."""
+        key = _mobile_key(normalized)
+        if key is None:
+            return None, None, True
+        cached = self._overlay.get(key)
+        if cached is _STALE:
+            return key, None, True
+        if cached is not None:
+            return key, cast(CallerSummary, cached), False
+        if self._base_generation != self._generation:
+            return key, None, True
+        summary = self._base.get(key, normalized)
+        return key, summary, summary is None
+
+    async def lookup(self, mobile: str) -> Optional[CallerSummary]:
+        normalized = normalize_mobile(mobile) or mobile
+        key, summary, needs_db = self.peek(normalized)
+        if not needs_db:
+            return summary
+        before = self._overlay.get(key) if key is not None else None
+        generation = self._generation
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(_LOAD_ONE_SQL, {"mobile": normalized})).first()
+        if row is None:
+            return None
+        summary = CallerSummary(
+            customer_id=row.id,
+            name=row.name,
+            primary_mobile=row.primary_mobile,
+            customer_type_ids=tuple(UUID(bytes=type_id.bytes) for type_id in row.type_ids or ()),
+            latest_remark=_snippet(row.remark_text),
+            latest_outcome=row.outcome,
+            latest_remark_at=row.created_at,
+        )
+        # Skip caching if the number was invalidated again while we were reading it.
+        if key is not None and generation == self._generation and self._overlay.get(key) is before:
+            if before is not None or len(self._overlay) < settings.CALLER_ID_OVERLAY_MAX_ENTRIES:
+                self._overlay[key] = summary
+        return summary
+
+    def _on_assignment_event(self, payload: str) -> None:
+        # A new remark changes the latest-remark snippet cached for the customer's number.
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        if data.get("kind") != "remark":
+            return
+        remarks = data.get("remarks")
+        if remarks is None:
+            # Too many remarks in one statement to list; read the assignment's numbers instead.
+            task = asyncio.create_task(self._invalidate_assignment(data["assignment_id"], data["assignment_date"]))
+            self._assignment_reads.add(task)
+            task.add_done_callback(self._assignment_reads.discard)
+            return
+        for remark in remarks:
+            self.invalidate(remark.get("mobile"))
+
+    async def _invalidate_assignment(self, assignment_id: str, assignment_date: str) -> None:
+        params = {"assignment_id": UUID(assignment_id), "assignment_date": date.fromisoformat(assignment_date)}
+        try:
+            async with AsyncSessionLocal() as session:
+                mobiles = (await session.execute(_ASSIGNMENT_MOBILES_SQL, params)).scalars().all()
+        except Exception:
+            # Without the numbers the invalidation would be lost; distrust everything instead.
+            logger.exception("Caller-ID invalidation for assignment %s failed; flushing", assignment_id)
+            self.flush()
+            return
+        for mobile in mobiles:
+            self.invalidate(mobile)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Caller-ID cache rebuild failed")
+            await asyncio.sleep(settings.CALLER_ID_REBUILD_SECONDS)
+
+    async def start(self) -> None:
+        if self._refresh is None:
+            self._refresh = asyncio.create_task(self._refresh_loop())
+            # Missed notifications are covered by cache_bus flushing every cache on reconnect.
+            await pg_listener.listen(ASSIGNMENT_EVENTS_CHANNEL, self._on_assignment_event)
+            pg_listener.start()
+
+    async def stop(self) -> None:
+        if self._refresh is not None:
+            self._refresh.cancel()
+            self._refresh = None
+        if self._flush_rebuild is not None:
+            self._flush_rebuild.cancel()
+            self._flush_rebuild = None
+        for task in list(self._assignment_reads):
+            task.cancel()
+
+
+caller_id_cache = CallerIdCache()
+cache_bus.register(CALLER_ID_NAMESPACE, caller_id_cache)
@@ -0,0 +1,438 @@
+"""Near-duplicate customer detection and bulk merge.
+
+The scan streams every customer once, assigns each to a few blocking keys and only
+scores pairs that share a block, so the work grows with the number of customers
+rather than its square. Accepted pairs are clustered with union-find and each
+cluster yields one survivor (the oldest row) plus merge proposals for the members
+that matched it directly.
+"""
+
+import logging
+import re
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Optional, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, Row, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.cache_bus import cache_bus
+from app.db.session import AsyncSessionLocal
+from app.models.customer import Customer, CustomerMergeProposal, MergeProposalStatus
+from app.schemas.customer import normalize_mobile
+from app.services.caller_id import CALLER_ID_NAMESPACE
+from app.services.job_runner import JobContext, register_job
+from app.services.segment_index import SEGMENT_INDEX_NAMESPACE
+
+
+logger = logging.getLogger(__name__)
+
+DEDUPE_SCAN_JOB = "customer_dedupe_scan"
+MERGE_APPLY_JOB = "customer_merge_apply"
+
+# Blocks scored per worker-thread call; progress (the job's lock heartbeat) is reported between calls.
+_SCORE_BATCH_BLOCKS = 20_000
+
+ScanProgress = Callable[[int, int], Awaitable[None]]
+
+_SOUNDEX_CODES = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+_NON_ALPHA = re.compile(r"[^a-z ]+")
+
+
+def soundex(word: str) -> str:
+    word = _NON_ALPHA.sub("", word.lower())
+    if not word:
+        return ""
+    coded = word.translate(_SOUNDEX_CODES)
+    result = [word[0].upper()]
+    previous = coded[0]
+    for letter, code in zip(word[1:], coded[1:]):
+        if code.isdigit() and code != previous:
+            result.append(code)
+        if letter not in "hw":
+            previous = code
+    return "".join(result)[:4].ljust(4, "0")
+
+
+def name_tokens(name: str) -> list[str]:
+    return [token for token in _NON_ALPHA.sub(" ", name.lower()).split() if token]
+
+
+def email_local_part(email: Optional[str]) -> Optional[str]:
+    if not email or "@" not in email:
+        return None
+    local = email.split("@", 1)[0].lower().split("+", 1)[0].replace(".", "")
+    return local or None
+
+
+@dataclass
+class CustomerRecords:
+    """Column-oriented snapshot of the customers table, indexed by dense ordinal."""
+
+    ids: list[UUID] = field(default_factory=list)
+    created: list[float] = field(default_factory=list)
+    mobiles: list[Optional[str]] = field(default_factory=list)
+    emails: list[Optional[str]] = field(default_factory=list)
+    tokens: list[tuple[str, ...]] = field(default_factory=list)
+    phonetic: list[str] = field(default_factory=list)
+
+    def append(self, customer_id: UUID, name: str, mobile: Optional[str], email: Optional[str], created: float) -> None:
+        tokens = tuple(name_tokens(name))
+        self.ids.append(customer_id)
+        self.created.append(created)
+        self.mobiles.append(normalize_mobile(mobile) or None)
+        self.emails.append(email.lower() if email else None)
+        self.tokens.append(tokens)
+        self.phonetic.append(soundex(tokens[0]) + soundex(tokens[-1]) if tokens else "")
+
+    def extend(self, rows: Iterable[Row]) -> None:
+        for customer_id, name, mobile, email, created_at in rows:
+            self.append(customer_id, name, mobile, email, created_at.timestamp())
+
+    def blocking_keys(self, i: int) -> list[str]:
+        keys = []
+        mobile = self.mobiles[i]
+        if mobile and len(mobile) >= 7:
+            keys.append(f"m:{mobile[-7:]}")
+        local = email_local_part(self.emails[i])
+        if local and len(local) >= 4:
+            keys.append(f"e:{local}")
+        if self.phonetic[i]:
+            keys.append(f"n:{self.phonetic[i]}")
+        return keys
+
+
+def score_pair(records: CustomerRecords, a: int, b: int) -> tuple[float, list[str]]:
+    score = 0.0
+    reasons: list[str] = []
+    mobile_a, mobile_b = records.mobiles[a], records.mobiles[b]
+    if mobile_a and mobile_b:
+        if mobile_a == mobile_b:
+            score += 0.6
+            reasons.append("mobile")
+        elif mobile_a[-7:] == mobile_b[-7:]:
+            score += 0.4
+            reasons.append("mobile_suffix")
+
+    email_a, email_b = records.emails[a], records.emails[b]
+    if email_a and email_b:
+        if email_a == email_b:
+            score += 0.5
+            reasons.append("email")
+        elif email_local_part(email_a) == email_local_part(email_b):
+            score += 0.25
+            reasons.append("email_local")
+
+    tokens_a, tokens_b = set(records.tokens[a]), set(records.tokens[b])
+    if tokens_a and tokens_b:
+        overlap = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+        if records.phonetic[a] == records.phonetic[b]:
+            overlap = max(overlap, 0.75)
+        if overlap >= 0.5:
+            score += 0.4 * overlap
+            reasons.append("name")
+    return score, reasons
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent.setdefault(x, x)
+        while parent != self.parent[parent]:
+            self.parent[parent] = self.parent[self.parent[parent]]
+            parent = self.parent[parent]
+        self.parent[x] = parent
+        return parent
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+async def load_customers(session: AsyncSession) -> CustomerRecords:
+    records = CustomerRecords()
+    stmt = select(Customer.id, Customer.name, Customer.primary_mobile, Customer.email, Customer.created_at)
+    result = await session.stream(stmt.execution_options(yield_per=50_000))
+    # Tokenising and soundex are pure Python; each fetched partition is indexed off the event loop.
+    async for partition in result.partitions():
+        await run_in_threadpool(records.extend, partition)
+    return records
+
+
+def block_customers(records: CustomerRecords) -> list[list[int]]:
+    """Group ordinals by blocking key, keeping only blocks with something to compare."""
+    # Most keys are unique, so a bare ordinal is stored until a second member shows up.
+    blocks: dict[str, int | list[int]] = {}
+    for i in range(len(records.ids)):
+        for key in records.blocking_keys(i):
+            members = blocks.get(key)
+            if members is None:
+                blocks[key] = i
+            elif isinstance(members, int):
+                blocks[key] = [members, i]
+            elif len(members) <= settings.DEDUPE_MAX_BLOCK_SIZE:
+                members.append(i)
+    return [
+        members
+        for members in blocks.values()
+        if not isinstance(members, int) and len(members) <= settings.DEDUPE_MAX_BLOCK_SIZE
+    ]
+
+
+def score_blocks(
+    records: CustomerRecords, blocks: list[list[int]], seen: set[tuple[int, int]]
+) -> dict[tuple[int, int], tuple[float, str]]:
+    """Score every unseen pair within ``blocks``; returns ``(a, b) -> (score, reasons)`` for matches, ``a < b``."""
+    matches: dict[tuple[int, int], tuple[float, str]] = {}
+    for members in blocks:
+        for offset, a in enumerate(members):
+            for b in members[offset + 1:]:
+                pair = (a, b)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                score, reasons = score_pair(records, a, b)
+                if score >= settings.DEDUPE_MIN_SCORE:
+                    matches[pair] = (score, ",".join(reasons))
+    return matches
+
+
+def cluster_matches(
+    records: CustomerRecords, matches: dict[tuple[int, int], tuple[float, str]]
+) -> list[tuple[int, int, float, str]]:
+    """Return ``(survivor, duplicate, score, reasons)`` ordinals for every clustered duplicate.
+
+    Only members that scored against their cluster's survivor are proposed, with that pair's
+    score: a chain A~B~C proposes B into A but not C, which was never compared with A. Once B
+    is merged, the next scan compares C with A directly.
+    """
+    clusters = _UnionFind()
+    for a, b in matches:
+        clusters.union(a, b)
+    members_by_root: dict[int, list[int]] = {}
+    for ordinal in clusters.parent:
+        members_by_root.setdefault(clusters.find(ordinal), []).append(ordinal)
+
+    proposals = []
+    for members in members_by_root.values():
+        survivor = min(members, key=lambda ordinal: records.created[ordinal])
+        for duplicate in members:
+            match = matches.get((min(survivor, duplicate), max(survivor, duplicate)))
+            if duplicate != survivor and match is not None:
+                score, reasons = match
+                proposals.append((survivor, duplicate, round(score, 3), reasons))
+    return proposals
+
+
+def find_duplicates(records: CustomerRecords) -> list[tuple[int, int, float, str]]:
+    """Block, score and cluster ``records`` in one go."""
+    return cluster_matches(records, score_blocks(records, block_customers(records), set()))
+
+
+async def run_dedupe_scan(session: AsyncSession, progress: Optional[ScanProgress] = None) -> int:
+    """Scan every customer and store merge proposals; returns how many were found.
+
+    Scoring runs in a worker thread, ``_SCORE_BATCH_BLOCKS`` blocks at a time, and
+    ``progress(blocks_scored, blocks)`` is awaited after each batch.
+    """
+    started = time.perf_counter()
+    records = await load_customers(session)
+    # Don't hold the read snapshot open while scoring.
+    await session.commit()
+    loaded = time.perf_counter()
+    blocks = await run_in_threadpool(block_customers, records)
+    seen: set[tuple[int, int]] = set()
+    matches: dict[tuple[int, int], tuple[float, str]] = {}
+    for start in range(0, len(blocks), _SCORE_BATCH_BLOCKS):
+        batch = blocks[start:start + _SCORE_BATCH_BLOCKS]
+        matches.update(await run_in_threadpool(score_blocks, records, batch, seen))
+        if progress is not None:
+            await progress(start + len(batch), len(blocks))
+    proposals = await run_in_threadpool(cluster_matches, records, matches)
+    logger.info(
+        "Dedupe scan: %s customers loaded in %.1fs, %s proposals scored in %.1fs",
+        len(records.ids), loaded - started, len(proposals), time.perf_counter() - loaded,
+    )
+
+    for start in range(0, len(proposals), 5_000):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "survivor_id": records.ids[survivor],
+                "duplicate_id": records.ids[duplicate],
+                "score": score,
+                "reasons": reasons,
+                "status": MergeProposalStatus.pending.value,
+            }
+            for survivor, duplicate, score, reasons in proposals[start:start + 5_000]
+        ]
+        await session.execute(insert(CustomerMergeProposal).values(rows).on_conflict_do_nothing(constraint="uq_customer_merge_pair"))
+    await session.commit()
+    return len(proposals)
+
+
+# Set-based merge of every approved proposal. Runs in one transaction:
+#   1. copy type mappings onto the survivor (skipping ones it already has),
+#   2. collapse assignment items so each assignment keeps one item per survivor, moving
+#      remarks from the dropped items onto the kept one,
+#   3. move the duplicates' timelines onto the survivors and record the merge there,
+#   4. settle other proposals naming a duplicate: open ones for the same duplicate are
+#      superseded; any (of any status) using it as survivor move to the new survivor, and
+#      those that would then repeat a pair or pair a customer with itself are dropped,
+#   5. delete the duplicates and mark the proposals applied.
+# Type-map triggers would log the copied and deleted mappings; the merge event covers them.
+_APPLY_MERGES_SQL = [
+    "SET LOCAL app.timeline_suppress = 'on'",
+    """
+    CREATE TEMP TABLE merge_map ON COMMIT DROP AS
+    SELECT DISTINCT ON (p.duplicate_id) p.id AS proposal_id, p.duplicate_id, p.survivor_id,
+           dc.primary_mobile AS duplicate_mobile, sc.primary_mobile AS survivor_mobile
+    FROM customer_merge_proposals p
+    LEFT JOIN customers dc ON dc.id = p.duplicate_id
+    LEFT JOIN customers sc ON sc.id = p.survivor_id
+    WHERE p.status = 'approved'
+      AND NOT EXISTS (SELECT 1 FROM customer_merge_proposals s
+                      WHERE s.status = 'approved' AND s.duplicate_id = p.survivor_id)
+    ORDER BY p.duplicate_id, p.score DESC
+    """,
+    "CREATE UNIQUE INDEX ON merge_map (duplicate_id)",
+    """
+    INSERT INTO customer_type_maps (id, customer_id, customer_type_id, source, added_by_user, created_at)
+    SELECT DISTINCT ON (m.survivor_id, t.customer_type_id)
+           gen_random_uuid(), m.survivor_id, t.customer_type_id, t.source, t.added_by_user, t.created_at
+    FROM customer_type_maps t JOIN merge_map m ON m.duplicate_id = t.customer_id
+    ORDER BY m.survivor_id, t.customer_type_id, t.created_at
+    ON CONFLICT ON CONSTRAINT uq_customer_type_map DO NOTHING
+    """,
+    "DELETE FROM customer_type_maps t USING merge_map m WHERE t.customer_id = m.duplicate_id",
+    """
+    CREATE TEMP TABLE merge_item_map ON COMMIT DROP AS
+    WITH affected AS (
+        SELECT i.id, i.assignment_id, COALESCE(m.survivor_id, i.customer_id) AS target_customer_id,
+               row_number() OVER (
+                   PARTITION BY i.assignment_id, COALESCE(m.survivor_id, i.customer_id)
+                   ORDER BY (m.duplicate_id IS NOT NULL), i.last_updated_at DESC
+               ) AS rank
+        FROM caller_assignment_items i
+        LEFT JOIN merge_map m ON m.duplicate_id = i.customer_id
+        WHERE i.customer_id IN (SELECT duplicate_id FROM merge_map UNION SELECT survivor_id FROM merge_map)
+    )
+    SELECT a.id AS item_id, k.id AS keeper_id, a.target_customer_id
+    FROM affected a
+    JOIN affected k ON k.assignment_id = a.assignment_id
+                   AND k.target_customer_id = a.target_customer_id AND k.rank = 1
+    """,
+    """
+    UPDATE call_remarks r SET assignment_item_id = x.keeper_id
+    FROM merge_item_map x WHERE r.assignment_item_id = x.item_id AND x.item_id <> x.keeper_id
+    """,
+    """
+    DELETE FROM caller_assignment_items i USING merge_item_map x
+    WHERE i.id = x.item_id AND x.item_id <> x.keeper_id
+    """,
+    """
+    UPDATE caller_assignment_items i SET customer_id = x.target_customer_id
+    FROM merge_item_map x WHERE i.id = x.keeper_id AND i.customer_id <> x.target_customer_id
+    """,
+    "UPDATE customer_timeline t SET customer_id = m.survivor_id FROM merge_map m WHERE t.customer_id = m.duplicate_id",
+    """
+    INSERT INTO customer_timeline (customer_id, kind, details)
+    SELECT m.survivor_id, 'customer_merge', json_build_object('duplicate_id', m.duplicate_id, 'proposal_id', m.proposal_id)
+    FROM merge_map m
+    """,
+    """
+    UPDATE customer_merge_proposals p SET status = 'superseded'
+    FROM merge_map m
+    WHERE p.duplicate_id = m.duplicate_id AND p.id <> m.proposal_id AND p.status IN ('pending', 'approved')
+    """,
+    """
+    DELETE FROM customer_merge_proposals p
+    USING (
+        SELECT p.id,
+               p.duplicate_id = m.survivor_id AS self_pair,
+               EXISTS (SELECT 1 FROM customer_merge_proposals q
+                       WHERE q.survivor_id = m.survivor_id AND q.duplicate_id = p.duplicate_id) AS taken,
+               row_number() OVER (
+                   PARTITION BY m.survivor_id, p.duplicate_id ORDER BY p.status = 'applied' DESC, p.created_at
+               ) AS rank
+        FROM customer_merge_proposals p JOIN merge_map m ON m.duplicate_id = p.survivor_id
+    ) d
+    WHERE p.id = d.id AND (d.self_pair OR d.taken OR d.rank > 1)
+    """,
+    """
+    UPDATE customer_merge_proposals p SET survivor_id = m.survivor_id
+    FROM merge_map m WHERE p.survivor_id = m.duplicate_id
+    """,
+    "DELETE FROM customers c USING merge_map m WHERE c.id = m.duplicate_id",
+    """
+    UPDATE customer_merge_proposals p SET status = 'applied', applied_at = now()
+    FROM merge_map m WHERE p.id = m.proposal_id
+    """,
+]
+
+
+async def _apply_merge_pass(session: AsyncSession) -> int:
+    applied = await session.scalar(
+        select(CustomerMergeProposal.id).where(CustomerMergeProposal.status == MergeProposalStatus.approved.value).limit(1)
+    )
+    if applied is None:
+        return 0
+    for statement in _APPLY_MERGES_SQL:
+        await session.execute(text(statement))
+    merged = (
+        await session.execute(text("SELECT survivor_id, duplicate_id, survivor_mobile, duplicate_mobile FROM merge_map"))
+    ).all()
+    # Only the customers involved changed: survivors gained mappings and remarks, duplicates are gone.
+    cache_bus.publish(session, SEGMENT_INDEX_NAMESPACE, (customer_id for row in merged for customer_id in row[:2]))
+    cache_bus.publish(session, CALLER_ID_NAMESPACE, (mobile for row in merged for mobile in row[2:]))
+    await session.commit()
+    return len(merged)
+
+
+async def apply_approved_merges(
+    session: AsyncSession, progress: Optional[Callable[[int], Awaitable[None]]] = None
+) -> int:
+    """Apply approved proposals in passes, one transaction each, until none are left.
+
+    A proposal whose survivor is itself an approved duplicate waits for the next pass, by
+    which time it has been moved onto that duplicate's survivor. ``progress(merged_so_far)``
+    is awaited after each pass.
+    """
+    total = 0
+    while merged := await _apply_merge_pass(session):
+        total += merged
+        if progress is not None:
+            await progress(total)
+    return total
+
+
+async def approve_proposals(session: AsyncSession, proposal_ids: Optional[list[UUID]] = None) -> int:
+    """Approve the given pending proposals, or all pending ones when ``proposal_ids`` is None."""
+    stmt = update(CustomerMergeProposal).where(CustomerMergeProposal.status == MergeProposalStatus.pending.value)
+    if proposal_ids is not None:
+        stmt = stmt.where(CustomerMergeProposal.id.in_(proposal_ids))
+    result = cast(CursorResult, await session.execute(stmt.values(status=MergeProposalStatus.approved.value)))
+    await session.commit()
+    return result.rowcount
+
+
+@register_job(DEDUPE_SCAN_JOB)
+async def dedupe_scan_job(ctx: JobContext) -> None:
+    async with AsyncSessionLocal() as session:
+        await run_dedupe_scan(session, progress=ctx.report_progress)
+
+
+@register_job(MERGE_APPLY_JOB)
+async def merge_apply_job(ctx: JobContext) -> None:
+    async with AsyncSessionLocal() as session:
+        merged = await apply_approved_merges(session, progress=ctx.report_progress)
+    await ctx.report_progress(merged, merged)
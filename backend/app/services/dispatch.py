@@ -0,0 +1,360 @@
+"""Real-time "next best call" dispatch from a shared pool.
+
+``dispatch_pool`` holds every customer currently worth a call: follow-ups that are due, retries
+of unreachable customers (up to ``DISPATCH_MAX_UNREACHABLE`` attempts) and pending items left
+over from earlier days. A refresh loop recomputes it from call history; only one worker runs
+each refresh (advisory lock), and rows claimed by a caller are left alone.
+
+A caller asking for their next call is served from a small per-caller priority queue in this
+worker. When it runs dry the worker claims the next ``DISPATCH_PREFETCH`` rows with
+``FOR UPDATE SKIP LOCKED``, so concurrent callers on any worker skip each other's rows instead
+of waiting on them, and a row is only ever claimed by one caller. Serving a claim deletes it
+from the pool and adds the customer to the caller's assignment for today, so status updates,
+remarks, events and the timeline work exactly as for planned lists.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.customer import AssignmentStatus
+
+
+logger = logging.getLogger(__name__)
+
+_REFRESH_LOCK_SQL = text("SELECT pg_try_advisory_xact_lock(hashtext('dispatch_pool_refresh'))")
+_EXPIRE_CLAIMS_SQL = text(
+    """
+    UPDATE dispatch_pool SET claimed_by = NULL, claimed_at = NULL
+    WHERE claimed_by IS NOT NULL AND claimed_at < now() - make_interval(secs => CAST(:lease AS integer))
+    """
+)
+_CANDIDATES_TABLE_SQL = text(
+    """
+    CREATE TEMP TABLE dispatch_candidates (
+        customer_id uuid PRIMARY KEY, reason text NOT NULL, due_at timestamptz NOT NULL, priority integer NOT NULL
+    ) ON COMMIT DROP
+    """
+)
+# Latest item per customer in the lookback window decides why (and whether) they are due.
+# Customers already on anyone's list today are left to that list.
+_CANDIDATES_SQL = text(
+    """
+    INSERT INTO dispatch_candidates (customer_id, reason, due_at, priority)
+    WITH recent_items AS (
+        SELECT id, customer_id, assignment_date, call_status, last_updated_at
+        FROM caller_assignment_items
+        WHERE assignment_date >= CURRENT_DATE - CAST(:lookback_days AS integer)
+    ),
+    last_item AS (
+        SELECT DISTINCT ON (customer_id) id, customer_id, assignment_date, call_status, last_updated_at
+        FROM recent_items
+        ORDER BY customer_id, assignment_date DESC, last_updated_at DESC
+    ),
+    unreachable AS (
+        SELECT customer_id, count(*) AS attempts
+        FROM recent_items WHERE call_status = 'not_reachable'
+        GROUP BY customer_id
+    ),
+    states AS (
+        SELECT l.customer_id, l.assignment_date, l.call_status, l.last_updated_at, r.follow_up_date,
+               COALESCE(u.attempts, 0) AS attempts
+        FROM last_item l
+        LEFT JOIN LATERAL (
+            SELECT follow_up_date FROM call_remarks
+            WHERE assignment_item_id = l.id AND assignment_date = l.assignment_date
+            ORDER BY created_at DESC LIMIT 1
+        ) r ON true
+        LEFT JOIN unreachable u ON u.customer_id = l.customer_id
+        WHERE l.assignment_date < CURRENT_DATE
+    ),
+    reasons AS (
+        SELECT customer_id,
+               CASE
+                   WHEN follow_up_date IS NOT NULL OR call_status = 'follow_up' THEN 'follow_up_due'
+                   WHEN call_status = 'not_reachable' AND attempts < CAST(:max_unreachable AS integer)
+                       THEN 'not_reachable_retry'
+                   WHEN call_status = 'pending' THEN 'missed'
+               END AS reason,
+               CASE
+                   WHEN follow_up_date IS NOT NULL THEN CAST(follow_up_date AS timestamptz)
+                   WHEN call_status = 'follow_up' THEN last_updated_at + interval '1 day'
+                   WHEN call_status = 'not_reachable'
+                       THEN last_updated_at + make_interval(hours => CAST(:retry_after_hours AS integer))
+                   ELSE CAST(assignment_date + 1 AS timestamptz)
+               END AS due_at
+        FROM states
+    )
+    SELECT r.customer_id, r.reason, r.due_at,
+           CASE r.reason
+               WHEN 'follow_up_due' THEN CAST(:follow_up_priority AS integer)
+               WHEN 'not_reachable_retry' THEN CAST(:retry_priority AS integer)
+               ELSE CAST(:missed_priority AS integer)
+           END
+           + LEAST(GREATEST(CURRENT_DATE - CAST(r.due_at AS date), 0), 30)
+           + COALESCE((
+               SELECT max(t.dispatch_priority)
+               FROM customer_type_maps m JOIN customer_types t ON t.id = m.customer_type_id
+               WHERE m.customer_id = r.customer_id AND t.is_active
+           ), 0) AS priority
+    FROM reasons r
+    WHERE r.reason IS NOT NULL
+    """
+)
+_PRUNE_SQL = text(
+    """
+    DELETE FROM dispatch_pool p
+    WHERE p.claimed_by IS NULL
+      AND NOT EXISTS (SELECT 1 FROM dispatch_candidates c WHERE c.customer_id = p.customer_id)
+    """
+)
+_UPSERT_SQL = text(
+    """
+    INSERT INTO dispatch_pool (customer_id, priority, reason, due_at)
+    SELECT customer_id, priority, reason, due_at FROM dispatch_candidates
+    ON CONFLICT (customer_id) DO UPDATE
+        SET priority = EXCLUDED.priority, reason = EXCLUDED.reason, due_at = EXCLUDED.due_at
+        WHERE dispatch_pool.claimed_by IS NULL
+    """
+)
+
+# Claims this caller already holds (taken by another worker, or before a restart) come first.
+_ADOPT_SQL = text(
+    """
+    UPDATE dispatch_pool SET claimed_at = now()
+    WHERE claimed_by = :caller_id
+    RETURNING customer_id, priority, reason, due_at
+    """
+)
+_CLAIM_SQL = text(
+    """
+    WITH next AS (
+        SELECT customer_id FROM dispatch_pool
+        WHERE claimed_by IS NULL AND due_at <= now()
+        ORDER BY priority DESC, due_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE dispatch_pool p SET claimed_by = :caller_id, claimed_at = now()
+    FROM next WHERE p.customer_id = next.customer_id
+    RETURNING p.customer_id, p.priority, p.reason, p.due_at
+    """
+)
+_RELEASE_SQL = text("UPDATE dispatch_pool SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = :caller_id")
+
+_TAKE_SQL = text(
+    """
+    DELETE FROM dispatch_pool WHERE customer_id = :customer_id AND claimed_by = :caller_id
+    RETURNING NOT EXISTS (
+        SELECT 1 FROM caller_assignment_items
+        WHERE customer_id = :customer_id AND assignment_date = CURRENT_DATE
+    ) AS callable
+    """
+)
+_TODAY_ASSIGNMENT_SQL = text(
+    """
+    WITH created AS (
+        INSERT INTO caller_assignments (id, caller_id, assignment_date, status, created_at)
+        VALUES (gen_random_uuid(), :caller_id, CURRENT_DATE, 'open', now())
+        ON CONFLICT (caller_id, assignment_date) DO NOTHING
+        RETURNING id, assignment_date, status
+    )
+    SELECT id, assignment_date, status FROM created
+    UNION ALL
+    SELECT id, assignment_date, status FROM caller_assignments
+    WHERE caller_id = :caller_id AND assignment_date = CURRENT_DATE
+    LIMIT 1
+    """
+)
+_ADD_ITEM_SQL = text(
+    """
+    WITH item AS (
+        INSERT INTO caller_assignment_items (id, assignment_id, assignment_date, customer_id, call_status, last_updated_at)
+        VALUES (gen_random_uuid(), :assignment_id, :assignment_date, :customer_id, 'pending', now())
+        RETURNING id, customer_id
+    )
+    SELECT item.id, c.name, c.primary_mobile FROM item JOIN customers c ON c.id = item.customer_id
+    """
+)
+
+
+class DispatchClosed(Exception):
+    """The caller's assignment for today is locked (or gone); nothing more can be added to it."""
+
+
+@dataclass(frozen=True)
+class QueuedCall:
+    customer_id: UUID
+    priority: int
+    reason: str
+    due_at: datetime
+
+
+@dataclass(frozen=True)
+class DispatchedCall:
+    assignment_id: UUID
+    assignment_date: date
+    item_id: UUID
+    customer_id: UUID
+    customer_name: str
+    primary_mobile: Optional[str]
+    reason: str
+    priority: int
+    due_at: datetime
+
+
+async def refresh_dispatch_pool(session: AsyncSession) -> Optional[int]:
+    """Recompute unclaimed pool rows and expire stale claims; None if another worker is refreshing."""
+    if not await session.scalar(_REFRESH_LOCK_SQL):
+        await session.rollback()
+        return None
+    await session.execute(_EXPIRE_CLAIMS_SQL, {"lease": settings.DISPATCH_LEASE_SECONDS})
+    await session.execute(_CANDIDATES_TABLE_SQL)
+    await session.execute(
+        _CANDIDATES_SQL,
+        {
+            "lookback_days": settings.DISPATCH_LOOKBACK_DAYS,
+            "max_unreachable": settings.DISPATCH_MAX_UNREACHABLE,
+            "retry_after_hours": settings.DISPATCH_RETRY_AFTER_HOURS,
+            "follow_up_priority": settings.DISPATCH_FOLLOW_UP_PRIORITY,
+            "retry_priority": settings.DISPATCH_RETRY_PRIORITY,
+            "missed_priority": settings.DISPATCH_MISSED_PRIORITY,
+        },
+    )
+    await session.execute(_PRUNE_SQL)
+    result = cast(CursorResult, await session.execute(_UPSERT_SQL))
+    await session.commit()
+    return result.rowcount
+
+
+async def claim_calls(session: AsyncSession, caller_id: UUID, limit: int) -> list[QueuedCall]:
+    rows = list((await session.execute(_ADOPT_SQL, {"caller_id": caller_id})).all())
+    if len(rows) < limit:
+        rows += (await session.execute(_CLAIM_SQL, {"caller_id": caller_id, "limit": limit - len(rows)})).all()
+    await session.commit()
+    return [QueuedCall(*row) for row in rows]
+
+
+async def release_calls(session: AsyncSession, caller_id: UUID) -> int:
+    result = cast(CursorResult, await session.execute(_RELEASE_SQL, {"caller_id": caller_id}))
+    await session.commit()
+    return result.rowcount
+
+
+async def serve_call(session: AsyncSession, caller_id: UUID, call: QueuedCall) -> Optional[DispatchedCall]:
+    """Turn a claim into an item on today's assignment; None if the claim was lost or moot."""
+    callable_ = await session.scalar(_TAKE_SQL, {"customer_id": call.customer_id, "caller_id": caller_id})
+    if not callable_:
+        # Lease expired and someone else took it (None), or they are on a list today already.
+        await session.commit()
+        return None
+    params = {"caller_id": caller_id}
+    assignment = (await session.execute(_TODAY_ASSIGNMENT_SQL, params)).first()
+    if assignment is None:  # created concurrently by this caller on another worker
+        assignment = (await session.execute(_TODAY_ASSIGNMENT_SQL, params)).first()
+    if assignment is None or assignment.status == AssignmentStatus.locked.value:
+        await session.rollback()
+        raise DispatchClosed
+    item = (
+        await session.execute(
+            _ADD_ITEM_SQL,
+            {"assignment_id": assignment.id, "assignment_date": assignment.assignment_date, "customer_id": call.customer_id},
+        )
+    ).one()
+    await session.commit()
+    return DispatchedCall(
+        assignment_id=assignment.id,
+        assignment_date=assignment.assignment_date,
+        item_id=item.id,
+        customer_id=call.customer_id,
+        customer_name=item.name,
+        primary_mobile=item.primary_mobile,
+        reason=call.reason,
+        priority=call.priority,
+        due_at=call.due_at,
+    )
+
+
+class _CallerQueue:
+    __slots__ = ("heap", "lock")
+
+    def __init__(self) -> None:
+        self.heap: list[tuple[int, datetime, int, QueuedCall]] = []
+        self.lock = asyncio.Lock()
+
+
+class CallDispatcher:
+    def __init__(self) -> None:
+        self._queues: dict[UUID, _CallerQueue] = {}
+        self._order = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def _queue(self, caller_id: UUID) -> _CallerQueue:
+        queue = self._queues.get(caller_id)
+        if queue is None:
+            queue = self._queues[caller_id] = _CallerQueue()
+        return queue
+
+    def _push(self, queue: _CallerQueue, calls: list[QueuedCall]) -> None:
+        for call in calls:
+            heapq.heappush(queue.heap, (-call.priority, call.due_at, next(self._order), call))
+
+    async def next_call(self, session: AsyncSession, caller_id: UUID) -> Optional[DispatchedCall]:
+        """The caller's best due customer, now on their assignment for today; None if nothing is due."""
+        queue = self._queue(caller_id)
+        # One request per caller at a time here; other callers never wait on this lock.
+        async with queue.lock:
+            while True:
+                if not queue.heap:
+                    self._push(queue, await claim_calls(session, caller_id, settings.DISPATCH_PREFETCH))
+                    if not queue.heap:
+                        return None
+                call = heapq.heappop(queue.heap)[-1]
+                dispatched = await serve_call(session, caller_id, call)
+                if dispatched is not None:
+                    return dispatched
+
+    async def release(self, session: AsyncSession, caller_id: UUID) -> int:
+        """Return this caller's claims to the pool (end of shift) and forget their queue."""
+        queue = self._queue(caller_id)
+        async with queue.lock:
+            queue.heap.clear()
+            if self._queues.get(caller_id) is queue:
+                del self._queues[caller_id]
+            return await release_calls(session, caller_id)
+
+    def queued(self) -> dict[str, int]:
+        return {str(caller_id): len(queue.heap) for caller_id, queue in self._queues.items() if queue.heap}
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    refreshed = await refresh_dispatch_pool(session)
+                if refreshed is not None:
+                    logger.info("Dispatch pool refreshed: %s candidates", refreshed)
+            except Exception:
+                logger.exception("Dispatch pool refresh failed")
+            await asyncio.sleep(settings.DISPATCH_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+call_dispatcher = CallDispatcher()
@@ -3,7 +3,6 @@ import uuid
 from pathlib import Path
 from typing import Optional
 
-import boto3
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,6 +19,8 @@ class FileService:
         self.use_s3 = settings.USE_S3_STORAGE
 
         if self.use_s3:
+            import boto3  # deferred: boto3 adds noticeable import time and is only needed for S3
+
             s3_kwargs: dict = {
                 "region_name": settings.AWS_REGION,
                 "endpoint_url": settings.AWS_S3_ENDPOINT_URL or None,
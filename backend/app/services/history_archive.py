@@ -0,0 +1,285 @@
+"""Monthly partitions of the call history tables and their Parquet archive.
+
+``caller_assignments``, ``caller_assignment_items`` and ``call_remarks`` are range-partitioned
+by assignment month (``<table>_YYYY_MM``, plus a ``_default`` catch-all). Web workers create
+upcoming partitions in the background; ``archive_month`` exports a month to zstd-compressed
+Parquet under ``HISTORY_ARCHIVE_ROOT`` (``<table>/month=YYYY-MM/data.parquet``) and then
+detaches and drops its partitions in the same transaction, so a failed export leaves the live
+tables untouched.
+
+The remarks archive is denormalized with the item and assignment columns (customer, caller,
+status) and sorted by customer, so ``read_archived_remarks`` can answer history queries from
+that one dataset with row-group pruning. Daily rollups in ``call_outcome_daily`` are kept.
+"""
+
+import asyncio
+import logging
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.report import HistoryArchive
+
+
+logger = logging.getLogger(__name__)
+
+# Detach order: referencing tables first.
+HISTORY_TABLES = ("call_remarks", "caller_assignment_items", "caller_assignments")
+
+_PARTITION_NAME = re.compile(r"_(\d{4})_(\d{2})$")
+
+_LIST_PARTITIONS_SQL = text(
+    """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:parent AS regclass)
+    """
+)
+
+# Column name -> logical type; the Arrow schema is built from this when pyarrow is imported.
+_COLUMNS: dict[str, tuple[tuple[str, str], ...]] = {
+    "caller_assignments": (
+        ("id", "uuid"),
+        ("caller_id", "uuid"),
+        ("assignment_date", "date"),
+        ("status", "text"),
+        ("created_at", "timestamp"),
+    ),
+    "caller_assignment_items": (
+        ("id", "uuid"),
+        ("assignment_id", "uuid"),
+        ("assignment_date", "date"),
+        ("customer_id", "uuid"),
+        ("call_status", "text"),
+        ("last_updated_at", "timestamp"),
+    ),
+    "call_remarks": (
+        ("id", "uuid"),
+        ("assignment_item_id", "uuid"),
+        ("assignment_date", "date"),
+        ("assignment_id", "uuid"),
+        ("caller_id", "uuid"),
+        ("customer_id", "uuid"),
+        ("call_status", "text"),
+        ("remark_text", "text"),
+        ("outcome", "text"),
+        ("follow_up_date", "date"),
+        ("created_by", "uuid"),
+        ("created_at", "timestamp"),
+    ),
+}
+
+_EXPORT_SQL = {
+    "caller_assignments": """
+        SELECT id, caller_id, assignment_date, status, created_at
+        FROM "{caller_assignments}" ORDER BY caller_id, assignment_date
+    """,
+    "caller_assignment_items": """
+        SELECT id, assignment_id, assignment_date, customer_id, call_status, last_updated_at
+        FROM "{caller_assignment_items}" ORDER BY customer_id, assignment_date
+    """,
+    "call_remarks": """
+        SELECT r.id, r.assignment_item_id, r.assignment_date, i.assignment_id, a.caller_id, i.customer_id,
+               i.call_status, r.remark_text, r.outcome, r.follow_up_date, r.created_by, r.created_at
+        FROM "{call_remarks}" r
+        JOIN "{caller_assignment_items}" i ON i.id = r.assignment_item_id
+        JOIN "{caller_assignments}" a ON a.id = i.assignment_id
+        ORDER BY i.customer_id, r.created_at
+    """,
+}
+
+_EXPORT_BATCH_ROWS = 50_000
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def archive_path(root: Path, table: str, month: date) -> Path:
+    return root / table / f"month={month:%Y-%m}" / "data.parquet"
+
+
+def _arrow_schema(pa: Any, table: str) -> Any:
+    types = {
+        "uuid": pa.string(),
+        "text": pa.string(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in _COLUMNS[table]])
+
+
+async def ensure_partitions(session: AsyncSession, months_ahead: int) -> int:
+    """Create missing monthly partitions up to ``months_ahead`` months out; returns how many."""
+    # One worker at a time; the others skip this round rather than queue DDL behind it.
+    if not await session.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext('history_partitions'))")):
+        await session.rollback()
+        return 0
+    # CREATE TABLE ... PARTITION OF locks the parent; give up quickly instead of stalling traffic.
+    await session.execute(text("SET LOCAL lock_timeout = '5s'"))
+    created = await session.scalar(text("SELECT ensure_history_partitions(:ahead)"), {"ahead": months_ahead})
+    await session.commit()
+    return int(created or 0)
+
+
+async def live_months(session: AsyncSession) -> list[date]:
+    """Months with an attached ``call_remarks`` partition, oldest first."""
+    names = (await session.execute(_LIST_PARTITIONS_SQL, {"parent": "call_remarks"})).scalars()
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.search(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+async def _export(session: AsyncSession, table: str, month: date, root: Path) -> int:
+    import pyarrow as pa  # type: ignore[import-untyped]
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    schema = _arrow_schema(pa, table)
+    kinds = [kind for _, kind in _COLUMNS[table]]
+    sql = _EXPORT_SQL[table].format(**{name: partition_name(name, month) for name in HISTORY_TABLES})
+    path = archive_path(root, table, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.part")
+
+    written = 0
+    result = await session.stream(text(sql).execution_options(yield_per=_EXPORT_BATCH_ROWS))
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        async for rows in result.partitions():
+            columns = list(zip(*rows))
+            arrays = [
+                [None if value is None else str(value) for value in column] if kind == "uuid" else list(column)
+                for column, kind in zip(columns, kinds)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(rows)
+    if pq.ParquetFile(tmp).metadata.num_rows != written:
+        raise RuntimeError(f"Parquet row count mismatch for {path}")
+    os.replace(tmp, path)
+    return written
+
+
+async def archive_month(month: date, root: Optional[Path] = None) -> HistoryArchive:
+    """Export one assignment month to Parquet, then detach and drop its partitions."""
+    root = Path(root or settings.HISTORY_ARCHIVE_ROOT)
+    month = month.replace(day=1)
+    async with AsyncSessionLocal() as session:
+        if await session.get(HistoryArchive, month) is not None:
+            raise ValueError(f"{month:%Y-%m} is already archived")
+        if month not in await live_months(session):
+            raise ValueError(f"No call history partition for {month:%Y-%m}")
+
+        # Writers to these (old) partitions wait until the export has been detached.
+        for table in HISTORY_TABLES:
+            await session.execute(text(f'LOCK TABLE "{partition_name(table, month)}" IN SHARE MODE'))
+        counts = {table: await _export(session, table, month, root) for table in HISTORY_TABLES}
+
+        await session.execute(text("SET LOCAL lock_timeout = '30s'"))
+        for table in HISTORY_TABLES:
+            part = partition_name(table, month)
+            await session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{part}"'))
+            await session.execute(text(f'DROP TABLE "{part}"'))
+        archive = HistoryArchive(
+            month=month,
+            path=str(root),
+            assignments=counts["caller_assignments"],
+            items=counts["caller_assignment_items"],
+            remarks=counts["call_remarks"],
+        )
+        session.add(archive)
+        await session.commit()
+    logger.info("Archived call history for %s: %s", f"{month:%Y-%m}", counts)
+    return archive
+
+
+async def latest_archived_month(session: AsyncSession) -> Optional[date]:
+    return await session.scalar(select(HistoryArchive.month).order_by(HistoryArchive.month.desc()).limit(1))
+
+
+def read_archived_remarks(
+    *,
+    customer_id: Optional[UUID] = None,
+    caller_id: Optional[UUID] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: Optional[int] = None,
+    root: Optional[Path] = None,
+) -> list[dict[str, Any]]:
+    """Archived remarks (newest first) matching the filters; blocking, run it in a thread.
+
+    ``start``/``end`` bound the assignment date. Raises ImportError without pyarrow, but
+    only when an archive exists.
+    """
+    directory = Path(root or settings.HISTORY_ARCHIVE_ROOT) / "call_remarks"
+    if not directory.is_dir():
+        return []
+
+    import pyarrow as pa
+    import pyarrow.dataset as ds  # type: ignore[import-untyped]
+
+    dataset = ds.dataset(
+        directory,
+        schema=_arrow_schema(pa, "call_remarks").append(pa.field("month", pa.string())),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+    )
+    conditions = []
+    if customer_id is not None:
+        conditions.append(ds.field("customer_id") == str(customer_id))
+    if caller_id is not None:
+        conditions.append(ds.field("caller_id") == str(caller_id))
+    if start is not None:
+        conditions.append(ds.field("assignment_date") >= pa.scalar(start, pa.date32()))
+        conditions.append(ds.field("month") >= f"{start:%Y-%m}")
+    if end is not None:
+        conditions.append(ds.field("assignment_date") <= pa.scalar(end, pa.date32()))
+        conditions.append(ds.field("month") <= f"{end:%Y-%m}")
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(filter=expression).sort_by([("created_at", "descending")])
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table.to_pylist()
+
+
+class PartitionMaintainer:
+    """Keeps future monthly partitions in place so new rows never land in ``_default``."""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    created = await ensure_partitions(session, settings.HISTORY_PARTITION_MONTHS_AHEAD)
+                if created:
+                    logger.info("Created %s call history partitions", created)
+            except Exception:
+                logger.exception("Call history partition maintenance failed")
+            await asyncio.sleep(settings.HISTORY_PARTITION_CHECK_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+partition_maintainer = PartitionMaintainer()
@@ -0,0 +1,169 @@
+"""Compact per-row import errors and the downloadable error report.
+
+Each committed import chunk stores its failures as one ``ImportErrorChunk`` blob, written in
+the same transaction as the chunk's customers and checkpoint. A blob is the zlib-compressed
+concatenation of: error count (uint32), row-number deltas (uint32 each), source column
+indexes (uint16 each) and error codes (uint8 each), all little-endian. Rows are the 1-based
+data-row numbers the import counts in ``processed_rows``.
+
+The error report re-reads the stored upload and emits, in the upload's own format, the
+failed rows with their original values plus ``import_row``, ``error_column`` and
+``error_code`` columns. Those extra headers are not import aliases, so the fixed file can be
+uploaded again as-is.
+"""
+
+import csv
+import io
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.customer import ImportErrorChunk
+from app.services.import_parsing import XLSX_SUFFIXES, RowErrorCode, iter_source_rows
+
+
+REPORT_COLUMNS = ["import_row", "error_column", "error_code"]
+
+# (row, column, code)
+RowError = tuple[int, int, int]
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_errors(errors: list[RowError]) -> bytes:
+    """Pack errors (sorted by row) into one compressed blob."""
+    rows = array("I")
+    previous = 0
+    for row, _, _ in errors:
+        rows.append(row - previous)
+        previous = row
+    columns = array("H", (column for _, column, _ in errors))
+    codes = bytes(code for _, _, code in errors)
+    payload = struct.pack("<I", len(errors)) + _little_endian(rows) + _little_endian(columns) + codes
+    return zlib.compress(payload, 6)
+
+
+def decode_errors(data: bytes) -> list[RowError]:
+    payload = zlib.decompress(data)
+    (count,) = struct.unpack_from("<I", payload)
+    rows_end = 4 + 4 * count
+    columns_end = rows_end + 2 * count
+    rows = array("I", payload[4:rows_end])
+    columns = array("H", payload[rows_end:columns_end])
+    if sys.byteorder == "big":
+        rows.byteswap()
+        columns.byteswap()
+    codes = payload[columns_end : columns_end + count]
+
+    errors = []
+    row = 0
+    for delta, column, code in zip(rows, columns, codes):
+        row += delta
+        errors.append((row, column, code))
+    return errors
+
+
+def error_chunk(batch_id: UUID, errors: list[RowError]) -> ImportErrorChunk:
+    errors = sorted(errors)
+    return ImportErrorChunk(
+        batch_id=batch_id,
+        first_row=errors[0][0],
+        last_row=errors[-1][0],
+        error_count=len(errors),
+        data=encode_errors(errors),
+    )
+
+
+async def load_error_blobs(session: AsyncSession, batch_id: UUID) -> list[bytes]:
+    """The batch's compressed blobs in row order (a few bytes per failed row)."""
+    result = await session.execute(
+        select(ImportErrorChunk.data).where(ImportErrorChunk.batch_id == batch_id).order_by(ImportErrorChunk.first_row)
+    )
+    return list(result.scalars())
+
+
+def _grouped_errors(blobs: list[bytes]) -> Iterator[tuple[int, list[tuple[int, int]]]]:
+    """``(row, [(column, code), ...])`` in row order, decoding one blob at a time."""
+    for blob in blobs:
+        errors = decode_errors(blob)
+        start = 0
+        while start < len(errors):
+            row = errors[start][0]
+            end = start
+            while end < len(errors) and errors[end][0] == row:
+                end += 1
+            yield row, [(column, code) for _, column, code in errors[start:end]]
+            start = end
+
+
+def _failed_rows(path: Path, blobs: list[bytes]) -> Iterator[tuple[Optional[str], list[Any], list[Any]]]:
+    """``(sheet, header, report row)`` for each failed row, by walking the source file once."""
+    errors = _grouped_errors(blobs)
+    pending = next(errors, None)
+    for number, (sheet, header, values) in enumerate(iter_source_rows(path), start=1):
+        while pending is not None and pending[0] < number:
+            pending = next(errors, None)
+        if pending is None:
+            return
+        if pending[0] != number:
+            continue
+        failures = pending[1]
+        pending = next(errors, None)
+        padding = [None] * (len(header) - len(values))
+        columns = "; ".join(str(header[column]) if column < len(header) else str(column) for column, _ in failures)
+        codes = "; ".join(RowErrorCode(code).name for _, code in failures)
+        yield sheet, header, [*values, *padding, number, columns, codes]
+
+
+def csv_error_report(path: Path, blobs: list[bytes]) -> Iterator[bytes]:
+    """The error report as CSV, streamed row by row (blocking; iterate it in a thread)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    wrote_header = False
+    for _, header, row in _failed_rows(path, blobs):
+        if not wrote_header:
+            writer.writerow([*header, *REPORT_COLUMNS])
+            wrote_header = True
+        writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if not wrote_header:
+        with open(path, encoding="utf-8-sig", newline="") as handle:
+            header = next(csv.reader(handle), [])
+        writer.writerow([*header, *REPORT_COLUMNS])
+        yield buffer.getvalue().encode()
+
+
+def xlsx_error_report(path: Path, blobs: list[bytes], out: BinaryIO) -> None:
+    """Write the error report as XLSX, one sheet per source sheet with failures (blocking)."""
+    from openpyxl import Workbook  # type: ignore[import-untyped]
+
+    workbook = Workbook(write_only=True)
+    sheets: dict[Optional[str], Any] = {}
+    for sheet_name, header, row in _failed_rows(path, blobs):
+        sheet = sheets.get(sheet_name)
+        if sheet is None:
+            sheet = sheets[sheet_name] = workbook.create_sheet(sheet_name)
+            sheet.append([*header, *REPORT_COLUMNS])
+        sheet.append(row)
+    if not sheets:
+        workbook.create_sheet("errors").append(REPORT_COLUMNS)
+    workbook.save(out)
+
+
+def is_xlsx(path: Path) -> bool:
+    return path.suffix.lower() in XLSX_SUFFIXES
@@ -0,0 +1,353 @@
+"""Chunked, multi-process parsing of lead import files.
+
+CSV files are split into byte ranges that end on a record boundary (quote-aware, so a quoted
+newline never splits a record) before any row is parsed, and each pool worker reads its own
+range. XLSX cannot be read from the middle (openpyxl parses a sheet from its first row, and
+every load re-reads the shared strings), so a single reader streams the workbook once and
+sends batches of raw rows to the pool. Either way chunks are validated in a process pool and
+handed back strictly in file order through a window of ``IMPORT_PARSE_WINDOW`` chunks, so
+parsing uses several cores while memory is bounded by the window rather than the file.
+
+This module is imported by the pool's worker processes, so it must not pull in the database.
+"""
+
+import asyncio
+import csv
+import enum
+import io
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Generator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.customer import CustomerBase
+
+
+# Accepted header spellings (compared lower-cased, spaces and dashes as underscores).
+HEADER_ALIASES = {
+    "name": "name",
+    "full_name": "name",
+    "customer_name": "name",
+    "mobile": "primary_mobile",
+    "phone": "primary_mobile",
+    "mobile_number": "primary_mobile",
+    "phone_number": "primary_mobile",
+    "primary_mobile": "primary_mobile",
+    "email": "email",
+    "email_address": "email",
+}
+
+XLSX_SUFFIXES = {".xlsx", ".xlsm"}
+
+# A parsed data row: (name, primary_mobile, email) after validation, or None if the row failed.
+ParsedRow = Optional[tuple[str, Optional[str], Optional[str]]]
+
+
+class RowErrorCode(enum.IntEnum):
+    missing_name = 1
+    invalid_name = 2
+    invalid_mobile = 3
+    invalid_email = 4
+
+
+_FIELD_ERRORS = {
+    "name": RowErrorCode.invalid_name,
+    "primary_mobile": RowErrorCode.invalid_mobile,
+    "email": RowErrorCode.invalid_email,
+}
+
+
+@dataclass(slots=True)
+class ParsedChunk:
+    # One entry per non-blank data row, in file order; None where the row failed.
+    rows: list[ParsedRow]
+    # (index into rows, source column index, RowErrorCode) for every failure.
+    errors: list[tuple[int, int, int]]
+
+
+def _header_field(header: Any) -> Optional[str]:
+    if header is None:
+        return None
+    return HEADER_ALIASES.get(str(header).strip().lower().replace(" ", "_").replace("-", "_"))
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkSpec:
+    """Byte range ``[start, end)`` of a CSV, or the data rows ``[start, end)`` of an XLSX sheet (1-based)."""
+
+    start: int
+    end: Optional[int]
+    fields: tuple[Optional[str], ...]
+    sheet: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ParsePlan:
+    # CSV byte ranges, or one spec per XLSX sheet that the reader splits into ``xlsx_chunk_rows`` batches.
+    chunks: list[ChunkSpec]
+    # Physical line/row count; exact unless quoted fields contain newlines. Used for progress.
+    estimated_rows: int
+    xlsx_chunk_rows: int = 0
+
+
+def _fields(header: list[Any]) -> tuple[Optional[str], ...]:
+    fields = tuple(_header_field(column) for column in header)
+    if "name" not in fields:
+        raise ValueError("Import file needs a name column")
+    return fields
+
+
+def _record_end(data: mmap.mmap, start: int, target: int) -> tuple[int, int]:
+    """First record boundary at or after ``target`` for a record starting at ``start``.
+
+    Returns ``(offset, newlines passed)``. Quote parity since ``start`` tells whether a newline
+    ends a record; escaped quotes ("") come in pairs and do not change it.
+    """
+    size = len(data)
+    segment = data[start:target]
+    quoted = segment.count(b'"') % 2 == 1
+    lines = segment.count(b"\n")
+    end = target
+    while end < size and (quoted or end == start or data[end - 1] != 0x0A):
+        newline = data.find(b"\n", end)
+        stop = size if newline == -1 else newline + 1
+        segment = data[end:stop]
+        quoted ^= segment.count(b'"') % 2 == 1
+        lines += segment.count(b"\n")
+        end = stop
+    return end, lines
+
+
+def _plan_csv(path: Path, chunk_bytes: int) -> ParsePlan:
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return ParsePlan([], 0)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            header_end, lines = _record_end(data, 0, 0)
+            header = next(csv.reader(io.StringIO(data[:header_end].decode("utf-8-sig"), newline="")), None)
+            if header is None:
+                return ParsePlan([], 0)
+            fields = _fields(header)
+
+            chunks = []
+            start = header_end
+            while start < size:
+                end, chunk_lines = _record_end(data, start, min(start + chunk_bytes, size))
+                chunks.append(ChunkSpec(start, end, fields))
+                lines += chunk_lines
+                start = end
+            # A final record without a trailing newline still counts as a row.
+            unterminated = 0 if data[size - 1] == 0x0A else 1
+    return ParsePlan(chunks, max(0, lines - 1 + unterminated))
+
+
+def _plan_xlsx(path: Path, chunk_rows: int) -> ParsePlan:
+    from openpyxl import load_workbook  # type: ignore[import-untyped]
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        chunks = []
+        rows = 0
+        for sheet in workbook.worksheets:
+            header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), None)
+            if header is None or "name" not in (fields := tuple(_header_field(value) for value in header)):
+                continue
+            # read-only sheets report the stored dimension, which some writers omit.
+            max_row = sheet.max_row if sheet.max_row and sheet.max_row > 1 else None
+            if max_row is not None:
+                rows += max_row - 1
+            chunks.append(ChunkSpec(2, max_row + 1 if max_row else None, fields, sheet.title))
+        if not chunks and workbook.worksheets:
+            raise ValueError("Import file needs a name column")
+        return ParsePlan(chunks, rows, max(1, chunk_rows))
+    finally:
+        workbook.close()
+
+
+def plan_chunks(path: Path, chunk_bytes: int, xlsx_chunk_rows: int) -> ParsePlan:
+    if path.suffix.lower() in XLSX_SUFFIXES:
+        return _plan_xlsx(path, xlsx_chunk_rows)
+    return _plan_csv(path, chunk_bytes)
+
+
+def _read_range(path: Path, start: int, end: Optional[int]) -> bytes:
+    """Bytes ``[start, end)`` of ``path``; an open ``end`` reads to the end of the file."""
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        return handle.read(-1 if end is None else end - start)
+
+
+def _parse_values(values: Any, fields: tuple[Optional[str], ...]) -> tuple[ParsedRow, list[tuple[int, int]]]:
+    """The validated row, or None and its ``(column, error code)`` failures."""
+    raw = {}
+    columns = {}
+    for index, (field, value) in enumerate(zip(fields, values)):
+        if field is None or value is None:
+            continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # spreadsheet numbers: 9876543210.0 -> "9876543210"
+        text = str(value).strip()
+        if text:
+            raw[field] = text
+            columns[field] = index
+    if not raw.get("name"):
+        return None, [(fields.index("name"), int(RowErrorCode.missing_name))]
+    try:
+        row = CustomerBase(name=raw["name"], primary_mobile=raw.get("primary_mobile"), email=raw.get("email"))
+    except ValidationError as exc:
+        failures: dict[int, RowErrorCode] = {}
+        for error in exc.errors():
+            field = str(error["loc"][0]) if error["loc"] else "name"
+            failures.setdefault(columns.get(field, columns["name"]), _FIELD_ERRORS.get(field, RowErrorCode.invalid_name))
+        return None, [(column, int(code)) for column, code in failures.items()]
+    return (row.name, row.primary_mobile, row.email), []
+
+
+def _is_blank(values: Any) -> bool:
+    return all(value is None or str(value).strip() == "" for value in values)
+
+
+def _parse_rows(rows: Iterable[Any], fields: tuple[Optional[str], ...]) -> ParsedChunk:
+    chunk = ParsedChunk([], [])
+    for values in rows:
+        if _is_blank(values):
+            continue
+        row, failures = _parse_values(values, fields)
+        chunk.errors.extend((len(chunk.rows), column, code) for column, code in failures)
+        chunk.rows.append(row)
+    return chunk
+
+
+def parse_chunk(path: Path, spec: ChunkSpec) -> ParsedChunk:
+    """Validate one CSV chunk's non-blank data rows."""
+    text = _read_range(path, spec.start, spec.end).decode("utf-8")
+    return _parse_rows(csv.reader(io.StringIO(text, newline="")), spec.fields)
+
+
+def _xlsx_batches(
+    path: Path, plan: ParsePlan
+) -> Generator[tuple[list[tuple[Any, ...]], tuple[Optional[str], ...]], None, None]:
+    """``(raw rows, fields)`` batches of every planned sheet, loading the workbook once."""
+    from openpyxl import load_workbook  # type: ignore[import-untyped]
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for spec in plan.chunks:
+            rows = workbook[spec.sheet].iter_rows(
+                min_row=spec.start, max_row=spec.end - 1 if spec.end else None, values_only=True
+            )
+            while batch := list(islice(rows, plan.xlsx_chunk_rows)):
+                yield batch, spec.fields
+    finally:
+        workbook.close()
+
+
+def iter_source_rows(path: Path) -> Iterator[tuple[Optional[str], list[Any], tuple[Any, ...]]]:
+    """``(sheet, header, values)`` for every row ``plan_chunks`` + ``parse_chunk`` would parse, in the same order."""
+    if path.suffix.lower() in XLSX_SUFFIXES:
+        from openpyxl import load_workbook  # type: ignore[import-untyped]
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None or "name" not in (_header_field(value) for value in header):
+                    continue
+                header = list(header)
+                for values in rows:
+                    if not _is_blank(values):
+                        yield sheet.title, header, values
+        finally:
+            workbook.close()
+        return
+
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        for values in reader:
+            if not _is_blank(values):
+                yield None, header, tuple(values)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _parse_processes() -> int:
+    if settings.IMPORT_PARSE_PROCESSES is not None:
+        return settings.IMPORT_PARSE_PROCESSES
+    return min(4, os.cpu_count() or 1)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    processes = _parse_processes()
+    if processes <= 0:
+        return None
+    if _pool is None:
+        # spawn, not fork: the parent runs an event loop, threads and open DB connections.
+        _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def iter_parsed_chunks(path: Path, plan: ParsePlan) -> AsyncIterator[ParsedChunk]:
+    """Parsed chunks in file order, with at most ``IMPORT_PARSE_WINDOW`` in flight or buffered."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    reader: Optional[ThreadPoolExecutor] = None
+    if any(spec.sheet is not None for spec in plan.chunks):
+        # openpyxl blocks while it parses, so the XLSX reader runs on its own thread; one thread
+        # keeps its calls (including the final close) in order.
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xlsx-reader")
+        batches = _xlsx_batches(path, plan)
+        jobs: Iterator[tuple[Callable[..., ParsedChunk], tuple]] = ((_parse_rows, batch) for batch in batches)
+    else:
+        jobs = ((parse_chunk, (path, spec)) for spec in plan.chunks)
+    window: deque[asyncio.Future] = deque()
+
+    async def submit() -> None:
+        job = await loop.run_in_executor(reader, next, jobs, None) if reader else next(jobs, None)
+        if job is None:
+            return
+        function, args = job
+        if pool is not None:
+            window.append(asyncio.wrap_future(pool.submit(function, *args)))
+        else:
+            window.append(loop.run_in_executor(None, function, *args))
+
+    try:
+        for _ in range(max(1, settings.IMPORT_PARSE_WINDOW)):
+            await submit()
+        while window:
+            chunk = await window.popleft()
+            await submit()
+            yield chunk
+    except BrokenProcessPool:
+        shutdown_parse_pool()  # a worker died; start a fresh pool on the next import
+        raise
+    finally:
+        for future in window:
+            future.cancel()
+        if reader is not None:
+            reader.submit(batches.close)
+            reader.shutdown(wait=False)
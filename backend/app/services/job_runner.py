@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import os
+import socket
+import traceback
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, func, select, update
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.customer import UploadBatch, UploadStatus
+from app.models.job import Job, JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobContext:
+    job_id: UUID
+    job_type: str
+    payload: dict[str, Any]
+    attempt: int
+    upload_batch_id: Optional[UUID] = None
+
+    async def report_progress(
+        self, current: int, total: Optional[int] = None, **batch_values: Any
+    ) -> None:
+        """Persist progress on the job (doubles as the lock heartbeat) and on its upload batch.
+
+        ``batch_values`` are written to the ``UploadBatch`` row as-is, e.g. ``new_customers=120``.
+        """
+        job_values: dict[str, Any] = {"progress_current": current, "locked_at": func.now()}
+        if total is not None:
+            job_values["progress_total"] = total
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Job).where(Job.id == self.job_id).values(**job_values))
+            if self.upload_batch_id is not None:
+                batch_update = {"processed_rows": current, **batch_values}
+                if total is not None:
+                    batch_update.setdefault("total_rows", total)
+                await session.execute(
+                    update(UploadBatch).where(UploadBatch.id == self.upload_batch_id).values(**batch_update)
+                )
+            await session.commit()
+
+
+JobHandler = Callable[[JobContext], Awaitable[None]]
+
+
+@dataclass
+class JobDefinition:
+    job_type: str
+    handler: JobHandler
+    concurrency: int = 1
+    retry_backoff_seconds: float = 30.0
+
+
+_registry: dict[str, JobDefinition] = {}
+
+
+def register_job(job_type: str, *, concurrency: int = 1, retry_backoff_seconds: float = 30.0):
+    """Register an async handler for ``job_type``; at most ``concurrency`` run at once per worker."""
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        _registry[job_type] = JobDefinition(job_type, handler, concurrency, retry_backoff_seconds)
+        return handler
+
+    return decorator
+
+
+@dataclass
+class _ClaimedJob:
+    id: UUID
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+    upload_batch_id: Optional[UUID]
+
+
+@dataclass
+class JobRunner:
+    """Polls the ``jobs`` table and runs registered handlers inside this worker's event loop."""
+
+    worker_id: str = field(default_factory=lambda: f"{socket.gethostname()}:{os.getpid()}")
+    _loops: list[asyncio.Task] = field(default_factory=list)
+    _running: set[asyncio.Task] = field(default_factory=set)
+
+    async def start(self) -> None:
+        if self._loops:
+            return
+        for definition in _registry.values():
+            self._loops.append(asyncio.create_task(self._poll(definition)))
+        self._loops.append(asyncio.create_task(self._requeue_orphans()))
+        logger.info("Job runner %s started for %s", self.worker_id, sorted(_registry))
+
+    async def stop(self, grace_seconds: float = 10.0) -> None:
+        for task in self._loops:
+            task.cancel()
+        self._loops = []
+        if self._running:
+            # Jobs still running after the grace period are left "running"; another worker
+            # re-queues them once their lock times out and they resume from their checkpoint.
+            await asyncio.wait(self._running, timeout=grace_seconds)
+
+    async def _poll(self, definition: JobDefinition) -> None:
+        in_flight: set[asyncio.Task] = set()
+        while True:
+            free = definition.concurrency - len(in_flight)
+            claimed: list[_ClaimedJob] = []
+            if free > 0:
+                try:
+                    claimed = await self._claim(definition.job_type, free)
+                except Exception:
+                    logger.exception("Claiming %s jobs failed", definition.job_type)
+            for job in claimed:
+                task = asyncio.create_task(self._run(definition, job))
+                for tracked in (in_flight, self._running):
+                    tracked.add(task)
+                    task.add_done_callback(tracked.discard)
+            if not claimed:
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+
+    async def _claim(self, job_type: str, limit: int) -> list[_ClaimedJob]:
+        claimable = (
+            select(Job.id)
+            .where(Job.job_type == job_type, Job.status == JobStatus.queued.value, Job.run_after <= func.now())
+            .order_by(Job.run_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id.in_(claimable))
+            .values(
+                status=JobStatus.running.value,
+                locked_by=self.worker_id,
+                locked_at=func.now(),
+                attempts=Job.attempts + 1,
+            )
+            .returning(Job.id, Job.payload, Job.attempts, Job.max_attempts, Job.upload_batch_id)
+        )
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+            await session.commit()
+        return [_ClaimedJob(*row) for row in rows]
+
+    async def _run(self, definition: JobDefinition, job: _ClaimedJob) -> None:
+        context = JobContext(job.id, definition.job_type, job.payload, job.attempts, job.upload_batch_id)
+        try:
+            await definition.handler(context)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            outcome = self._record_failure(definition, job, exc)
+        else:
+            outcome = self._finish(job, JobStatus.completed)
+        try:
+            await outcome
+        except Exception:
+            # Nothing awaits this task; the job stays "running" until the orphan sweep re-queues it.
+            logger.exception("Recording the outcome of job %s (%s) failed", job.id, definition.job_type)
+
+    async def _finish(self, job: _ClaimedJob, status: JobStatus, error: Optional[str] = None) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job.id)
+                .values(status=status.value, finished_at=func.now(), locked_by=None, last_error=error)
+            )
+            if job.upload_batch_id is not None:
+                batch_status = UploadStatus.completed if status == JobStatus.completed else UploadStatus.failed
+                await session.execute(
+                    update(UploadBatch)
+                    .where(UploadBatch.id == job.upload_batch_id)
+                    .values(status=batch_status.value)
+                )
+            await session.commit()
+
+    async def _record_failure(self, definition: JobDefinition, job: _ClaimedJob, exc: Exception) -> None:
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed permanently: %s", job.id, definition.job_type, error)
+            await self._finish(job, JobStatus.failed, error)
+            return
+
+        delay = definition.retry_backoff_seconds * (2 ** (job.attempts - 1))
+        logger.warning("Job %s (%s) attempt %s failed, retrying in %ss: %s", job.id, definition.job_type, job.attempts, delay, error)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job.id)
+                .values(
+                    status=JobStatus.queued.value,
+                    run_after=func.now() + timedelta(seconds=delay),
+                    locked_by=None,
+                    last_error=error,
+                )
+            )
+            await session.commit()
+
+    async def requeue_orphans(self) -> tuple[int, int]:
+        """Re-queue jobs whose worker stopped heartbeating; returns ``(requeued, failed)``."""
+        orphaned = (
+            Job.status == JobStatus.running.value,
+            Job.locked_at < func.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS),
+        )
+        async with AsyncSessionLocal() as session:
+            # A job that keeps killing its worker must not be retried forever.
+            failed = await session.execute(
+                update(Job)
+                .where(*orphaned, Job.attempts >= Job.max_attempts)
+                .values(status=JobStatus.failed.value, locked_by=None, finished_at=func.now(),
+                        last_error="Worker lost while running the final attempt")
+                .returning(Job.upload_batch_id)
+            )
+            failed_batches = list(failed.scalars())
+            batch_ids = [batch_id for batch_id in failed_batches if batch_id is not None]
+            if batch_ids:
+                await session.execute(
+                    update(UploadBatch)
+                    .where(UploadBatch.id.in_(batch_ids))
+                    .values(status=UploadStatus.failed.value)
+                )
+            requeued = cast(
+                CursorResult,
+                await session.execute(
+                    update(Job).where(*orphaned).values(status=JobStatus.queued.value, locked_by=None)
+                ),
+            )
+            await session.commit()
+        return requeued.rowcount, len(failed_batches)
+
+    async def _requeue_orphans(self) -> None:
+        while True:
+            await asyncio.sleep(max(settings.JOB_POLL_INTERVAL_SECONDS, settings.JOB_LOCK_TIMEOUT_SECONDS / 10))
+            try:
+                requeued, failed = await self.requeue_orphans()
+                if requeued or failed:
+                    logger.warning("Orphaned jobs: %s re-queued, %s failed after their last attempt", requeued, failed)
+            except Exception:
+                logger.exception("Re-queueing orphaned jobs failed")
+
+
+job_runner = JobRunner()
@@ -0,0 +1,196 @@
+"""Customer (lead) file imports run as resumable background jobs.
+
+Uploaded files are stored content-addressed under ``IMPORT_ROOT`` and fingerprinted with
+sha256, so uploading the same file again returns the existing batch instead of importing
+twice. CSV and XLSX files are parsed in a process pool (``app.services.import_parsing``) and
+loaded in file order in chunks of ``IMPORT_CHUNK_ROWS``; each chunk's customers and the batch
+checkpoint (``processed_rows`` and counters) commit in one transaction, so a retried or
+resumed job skips exactly the rows that were already committed. Failed rows are kept per chunk
+as compact error blobs (``app.services.import_errors``) in that same transaction.
+"""
+
+import hashlib
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID
+
+import anyio
+from fastapi import UploadFile
+from sqlalchemy import exists, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.crud.customer import bulk_upsert_customers
+from app.crud.job import enqueue_job
+from app.db.cache_bus import cache_bus
+from app.db.session import AsyncSessionLocal
+from app.models.customer import UploadBatch, UploadStatus
+from app.models.job import Job, JobStatus
+from app.schemas.customer import CustomerCreate
+from app.services.caller_id import CALLER_ID_NAMESPACE
+from app.services.import_errors import RowError, error_chunk
+from app.services.import_parsing import ParsedRow, iter_parsed_chunks, plan_chunks
+from app.services.job_runner import JobContext, register_job
+from app.services.segment_index import SEGMENT_INDEX_NAMESPACE
+
+
+logger = logging.getLogger(__name__)
+
+LEAD_IMPORT_JOB = "lead_import"
+
+
+async def store_upload(upload: UploadFile) -> tuple[Path, str]:
+    """Stream ``upload`` to ``IMPORT_ROOT`` while hashing it; returns ``(path, sha256 hex)``."""
+    root = Path(settings.IMPORT_ROOT)
+    await run_in_threadpool(root.mkdir, parents=True, exist_ok=True)
+    suffix = Path(upload.filename or "").suffix.lower() or ".csv"
+    digest = hashlib.sha256()
+    tmp = root / f".{uuid.uuid4()}.part"
+    try:
+        # File I/O goes through worker threads so a large upload never blocks the event loop.
+        async with await anyio.open_file(tmp, "wb") as out:
+            while chunk := await upload.read(1024 * 1024):
+                digest.update(chunk)
+                await out.write(chunk)
+        path = root / f"{digest.hexdigest()}{suffix}"
+        await run_in_threadpool(os.replace, tmp, path)
+    finally:
+        await run_in_threadpool(tmp.unlink, missing_ok=True)
+    return path, digest.hexdigest()
+
+
+async def create_or_reuse_batch(
+    session: AsyncSession,
+    *,
+    path: Path,
+    content_sha256: str,
+    file_name: str,
+    options: dict[str, Any],
+    uploaded_by: Optional[UUID],
+    force: bool = False,
+) -> tuple[UploadBatch, bool]:
+    """Batch for an uploaded file and whether it was an existing one.
+
+    An earlier batch with the same content is returned as-is while it is completed or still
+    has a live job, and resumed otherwise. ``force`` always starts a new batch.
+    """
+    # Serialize identical uploads so two concurrent requests cannot both create a batch.
+    await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:sha))"), {"sha": content_sha256})
+    if not force:
+        existing = await session.scalar(
+            select(UploadBatch)
+            .where(UploadBatch.content_sha256 == content_sha256)
+            .order_by(UploadBatch.created_at.desc())
+            .limit(1)
+        )
+        if existing is not None:
+            live_job = await session.scalar(
+                select(
+                    exists().where(
+                        Job.upload_batch_id == existing.id,
+                        Job.status.in_([JobStatus.queued.value, JobStatus.running.value]),
+                    )
+                )
+            )
+            if existing.status == UploadStatus.completed.value or live_job:
+                await session.commit()
+            else:
+                await resume_batch(session, existing, uploaded_by)
+            return existing, True
+
+    batch = UploadBatch(
+        uploaded_by=uploaded_by,
+        file_name=file_name,
+        content_sha256=content_sha256,
+        file_path=str(path),
+        options=options,
+        status=UploadStatus.processing.value,
+    )
+    session.add(batch)
+    await session.flush()
+    await enqueue_job(session, LEAD_IMPORT_JOB, upload_batch_id=batch.id, created_by=uploaded_by, commit=False)
+    await session.commit()
+    await session.refresh(batch)
+    return batch, False
+
+
+async def resume_batch(session: AsyncSession, batch: UploadBatch, requested_by: Optional[UUID]) -> Job:
+    """Re-queue a failed batch; the new job continues after ``processed_rows``."""
+    batch.status = UploadStatus.processing.value
+    job = await enqueue_job(session, LEAD_IMPORT_JOB, upload_batch_id=batch.id, created_by=requested_by, commit=False)
+    await session.commit()
+    await session.refresh(batch)
+    return job
+
+
+def _customers(rows: list[ParsedRow], options: dict[str, Any]) -> list[CustomerCreate]:
+    """Rows validated by the parse stage as ``CustomerCreate`` with the batch-wide options."""
+    type_ids = [UUID(str(type_id)) for type_id in options.get("customer_type_ids", [])]
+    source = options.get("source", "upload")
+    return [
+        CustomerCreate.model_construct(
+            name=row[0], primary_mobile=row[1], email=row[2], customer_type_ids=type_ids, source=source
+        )
+        for row in rows
+        if row is not None
+    ]
+
+
+async def _commit_chunk(
+    batch: UploadBatch, rows: list[CustomerCreate], failed: int, processed_rows: int, errors: list[RowError]
+) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await bulk_upsert_customers(session, rows, added_by=batch.uploaded_by)
+        if errors:
+            session.add(error_chunk(batch.id, errors))
+        await session.execute(
+            update(UploadBatch)
+            .where(UploadBatch.id == batch.id)
+            .values(
+                processed_rows=processed_rows,
+                new_customers=UploadBatch.new_customers + result.created,
+                merged_customers=UploadBatch.merged_customers + result.merged,
+                failed_rows=UploadBatch.failed_rows + failed,
+            )
+        )
+        cache_bus.publish(session, SEGMENT_INDEX_NAMESPACE, (customer_id for customer_id, _ in result.customers))
+        cache_bus.publish(session, CALLER_ID_NAMESPACE, (row.primary_mobile for row in rows))
+        await session.commit()
+
+
+@register_job(LEAD_IMPORT_JOB, concurrency=2)
+async def lead_import_job(ctx: JobContext) -> None:
+    async with AsyncSessionLocal() as session:
+        batch = await session.get(UploadBatch, ctx.upload_batch_id)
+    if batch is None or not batch.file_path:
+        raise ValueError(f"Upload batch {ctx.upload_batch_id} has no stored file")
+
+    path = Path(batch.file_path)
+    options = batch.options or {}
+    plan = await run_in_threadpool(
+        plan_chunks, path, settings.IMPORT_PARSE_CHUNK_BYTES, settings.IMPORT_XLSX_CHUNK_ROWS
+    )
+    resume_from = offset = batch.processed_rows
+    if offset:
+        logger.info("Resuming import %s at row %s of ~%s", batch.id, offset, plan.estimated_rows)
+    await ctx.report_progress(offset, plan.estimated_rows)
+
+    parsed = 0
+    async for parsed_chunk in iter_parsed_chunks(path, plan):
+        rows = parsed_chunk.rows
+        # Rows before the checkpoint were committed by an earlier attempt.
+        skip = min(len(rows), max(0, resume_from - parsed))
+        for start in range(skip, len(rows), settings.IMPORT_CHUNK_ROWS):
+            end = min(start + settings.IMPORT_CHUNK_ROWS, len(rows))
+            customers = _customers(rows[start:end], options)
+            # Row numbers are 1-based over the whole file, like processed_rows.
+            errors = [(parsed + index + 1, column, code) for index, column, code in parsed_chunk.errors if start <= index < end]
+            offset += end - start
+            await _commit_chunk(batch, customers, end - start - len(customers), offset, errors)
+            await ctx.report_progress(offset, max(offset, plan.estimated_rows))
+        parsed += len(rows)
+    await ctx.report_progress(offset, offset)
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Formats kept when resizing; anything else (GIF, BMP, TIFF...) is re-encoded as PNG.
+_KEEP_FORMATS = {"JPEG": "jpeg", "PNG": "png", "WEBP": "webp"}
+
+
+def render_thumbnail(source: Path, width: int, height: int) -> tuple[bytes, str]:
+    """Resize ``source`` to fit within ``width`` x ``height``; returns ``(data, media subtype)``."""
+    from PIL import Image, ImageOps  # deferred: Pillow is only needed for derived images
+
+    try:
+        opened = Image.open(source)
+    except OSError as exc:
+        raise ValueError(f"{source.name} is not a readable image") from exc
+    with opened:
+        source_format = opened.format or ""
+        image = ImageOps.exif_transpose(opened)
+        image.thumbnail((width, height))
+        subtype = _KEEP_FORMATS.get(source_format, "png")
+        if subtype == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format=subtype.upper(), quality=85, optimize=True)
+    return buffer.getvalue(), subtype
+
+
+class DerivedImageCache:
+    """On-disk cache of derived images, evicting least recently used entries by total size.
+
+    Recency is the file mtime (touched on every hit), so the cache survives restarts and is
+    shared by all workers on the host. Each worker tracks an approximate byte total and
+    rescans the directory when that total crosses ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+        self._pending: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def key(*parts: object) -> str:
+        return hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str, subtype: str) -> Path:
+        return self.root / key[:2] / f"{key}.{subtype}"
+
+    def _lookup(self, key: str) -> Optional[Path]:
+        directory = self.root / key[:2]
+        for subtype in set(_KEEP_FORMATS.values()):
+            path = directory / f"{key}.{subtype}"
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            return path
+        return None
+
+    def _store(self, key: str, data: bytes, subtype: str) -> Path:
+        path = self._path(key, subtype)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+        return path
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        # Trim to 90% so a full cache does not rescan on every store.
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        logger.info("Derived image cache evicted %s files, %s bytes remain", removed, total)
+
+    async def get_or_create(self, key: str, render: Callable[[], tuple[bytes, str]]) -> Path:
+        """Cached file for ``key``, rendering it in a worker thread on a miss.
+
+        Concurrent misses for the same key in this worker share one render.
+        """
+        path = await run_in_threadpool(self._lookup, key)
+        if path is not None:
+            return path
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            path = await run_in_threadpool(self._render_and_store, key, render)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            del self._pending[key]
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                future.exception()  # mark retrieved when nobody else was waiting
+
+    def _render_and_store(self, key: str, render: Callable[[], tuple[bytes, str]]) -> Path:
+        data, subtype = render()
+        return self._store(key, data, subtype)
+
+
+derived_image_cache = DerivedImageCache(Path(settings.MEDIA_CACHE_ROOT), settings.MEDIA_CACHE_MAX_BYTES)
@@ -0,0 +1,291 @@
+import asyncio
+import itertools
+import logging
+import time
+from array import array
+from collections.abc import Iterable
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.bitmap import RoaringBitmap
+from app.core.config import settings
+from app.db.cache_bus import cache_bus
+from app.db.session import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_INDEX_NAMESPACE = "segment_index"
+
+# Ordinals follow uuid order (Postgres compares uuids bytewise), so the ordinal of a customer
+# loaded at rebuild time is its position in the sorted id list.
+_CUSTOMER_IDS_SQL = text("SELECT id FROM customers ORDER BY id").execution_options(yield_per=10_000)
+_TYPE_ORDINALS_SQL = text(
+    """
+    SELECT m.customer_type_id, c.ordinal
+    FROM (SELECT id, row_number() OVER (ORDER BY id) - 1 AS ordinal FROM customers) c
+    JOIN customer_type_maps m ON m.customer_id = c.id
+    ORDER BY m.customer_type_id, c.ordinal
+    """
+).execution_options(yield_per=10_000)
+_CUSTOMER_TYPES_SQL = text(
+    """
+    SELECT c.id, ARRAY(SELECT m.customer_type_id FROM customer_type_maps m WHERE m.customer_id = c.id)
+    FROM customers c WHERE c.id = ANY(CAST(:ids AS uuid[]))
+    """
+)
+
+
+_ID_BYTES = 16
+
+
+class _Snapshot:
+    """One rebuilt generation of the index; incremental updates mutate it in place until the next rebuild.
+
+    The rebuild's ids are packed back to back in one ``bytearray`` (16 bytes each, sorted)
+    rather than held as millions of separate ``bytes`` objects.
+    """
+
+    def __init__(self, base_ids: bytearray, by_type: dict[UUID, RoaringBitmap]) -> None:
+        self.base_ids = base_ids
+        self.base_count = len(base_ids) // _ID_BYTES
+        # Customers created since the rebuild get ordinals after the sorted base.
+        self.appended_ids: list[bytes] = []
+        self.appended_ordinals: dict[bytes, int] = {}
+        self.by_type = by_type
+        self.universe = RoaringBitmap.from_sorted(range(self.base_count))
+
+    def _base_id(self, ordinal: int) -> bytes:
+        start = ordinal * _ID_BYTES
+        return bytes(self.base_ids[start:start + _ID_BYTES])
+
+    def ordinal(self, customer_id: UUID) -> Optional[int]:
+        key = customer_id.bytes
+        low, high = 0, self.base_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._base_id(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.base_count and self._base_id(low) == key:
+            return low
+        return self.appended_ordinals.get(key)
+
+    def add(self, customer_id: UUID) -> int:
+        """The customer's ordinal, appending it if the rebuild did not see it."""
+        ordinal = self.ordinal(customer_id)
+        if ordinal is None:
+            key = customer_id.bytes
+            ordinal = self.base_count + len(self.appended_ids)
+            self.appended_ids.append(key)
+            self.appended_ordinals[key] = ordinal
+        self.universe.add(ordinal)
+        return ordinal
+
+    def customer_id(self, ordinal: int) -> UUID:
+        if ordinal < self.base_count:
+            return UUID(bytes=self._base_id(ordinal))
+        return UUID(bytes=self.appended_ids[ordinal - self.base_count])
+
+
+def _build_snapshot(base_ids: bytearray, ordinals_by_type: dict[UUID, array]) -> _Snapshot:
+    by_type = {type_id: RoaringBitmap.from_sorted(ordinals) for type_id, ordinals in ordinals_by_type.items()}
+    return _Snapshot(base_ids, by_type)
+
+
+class CustomerSegmentIndex:
+    """In-memory bitmaps of customers per ``CustomerType`` for segment counts and id lists.
+
+    The index is rebuilt in bulk on startup and every ``SEGMENT_INDEX_REBUILD_SECONDS``. In
+    between, customer ids published on ``cache_bus`` (namespace ``segment_index``) by any
+    worker have their mappings re-read and replaced, and ids that no longer exist (merged
+    duplicates) are dropped; a flush triggers a rebuild.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[_Snapshot] = None
+        self._rebuild_lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+        self._pending: set[UUID] = set()
+        self._reload: Optional[asyncio.Task] = None
+        self._flush_rebuild: Optional[asyncio.Task] = None
+        # Ids published while a rebuild is loading; its snapshot may predate their changes.
+        self._evicted_during_rebuild: Optional[set[UUID]] = None
+        self.built_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    async def rebuild(self) -> None:
+        async with self._rebuild_lock:
+            started = time.perf_counter()
+            self._evicted_during_rebuild = set()
+            try:
+                base_ids, ordinals_by_type = await self._load()
+                # Bitmap building is pure Python over every ordinal; keep it off the event loop.
+                snapshot = await run_in_threadpool(_build_snapshot, base_ids, ordinals_by_type)
+                self._snapshot = snapshot
+                self._queue_reload(self._evicted_during_rebuild)
+            finally:
+                self._evicted_during_rebuild = None
+            self.built_at = time.time()
+            logger.info(
+                "Segment index rebuilt: %s customers, %s types in %.0f ms",
+                snapshot.base_count,
+                len(snapshot.by_type),
+                (time.perf_counter() - started) * 1000,
+            )
+
+    async def _load(self) -> tuple[bytearray, dict[UUID, array]]:
+        async with AsyncSessionLocal() as session:
+            # Both reads must see the same customers for the ordinals to line up.
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            base_ids = bytearray()
+            async for partition in (await session.stream(_CUSTOMER_IDS_SQL)).partitions():
+                base_ids += b"".join(row[0].bytes for row in partition)
+            ordinals_by_type: dict[UUID, array] = {}
+            async for partition in (await session.stream(_TYPE_ORDINALS_SQL)).partitions():
+                for type_id, ordinal in partition:
+                    ordinals_by_type.setdefault(UUID(bytes=type_id.bytes), array("q")).append(ordinal)
+        return base_ids, ordinals_by_type
+
+    def set_mappings(self, customer_id: UUID, customer_type_ids: Iterable[UUID]) -> None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        ordinal = snapshot.add(customer_id)
+        customer_type_ids = set(customer_type_ids)
+        for type_id, bitmap in snapshot.by_type.items():
+            if type_id not in customer_type_ids:
+                bitmap.discard(ordinal)
+        for type_id in customer_type_ids:
+            snapshot.by_type.setdefault(type_id, RoaringBitmap()).add(ordinal)
+
+    def remove_customer(self, customer_id: UUID) -> None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        ordinal = snapshot.ordinal(customer_id)
+        if ordinal is None:
+            return
+        snapshot.universe.discard(ordinal)
+        for bitmap in snapshot.by_type.values():
+            bitmap.discard(ordinal)
+
+    def evict(self, keys: list[str]) -> None:
+        """Re-read the mappings of the given customer ids; ids no longer in the table are removed."""
+        customer_ids = {UUID(key) for key in keys}
+        if self._evicted_during_rebuild is not None:
+            self._evicted_during_rebuild.update(customer_ids)
+        self._queue_reload(customer_ids)
+
+    def flush(self) -> None:
+        if self._refresh is not None and (self._flush_rebuild is None or self._flush_rebuild.done()):
+            self._flush_rebuild = asyncio.create_task(self._rebuild_after_flush())
+
+    async def _rebuild_after_flush(self) -> None:
+        try:
+            await self.rebuild()
+        except Exception:
+            logger.exception("Segment index rebuild after flush failed")
+
+    def _queue_reload(self, customer_ids: Iterable[UUID]) -> None:
+        if self._snapshot is None:
+            return  # the first rebuild reads everything anyway
+        self._pending.update(customer_ids)
+        if self._pending and (self._reload is None or self._reload.done()):
+            self._reload = asyncio.create_task(self._reload_pending())
+
+    async def _reload_pending(self) -> None:
+        backoff = 1.0
+        while self._pending:
+            customer_ids = list(self._pending)
+            self._pending.clear()
+            try:
+                async with AsyncSessionLocal() as session:
+                    rows = (await session.execute(_CUSTOMER_TYPES_SQL, {"ids": customer_ids})).all()
+            except Exception:
+                logger.exception(
+                    "Segment index reload of %s customers failed (retrying in %.0fs)", len(customer_ids), backoff
+                )
+                self._pending.update(customer_ids)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                continue
+            backoff = 1.0
+            found = set()
+            for customer_id, type_ids in rows:
+                customer_id = UUID(bytes=customer_id.bytes)
+                found.add(customer_id)
+                self.set_mappings(customer_id, [UUID(bytes=t.bytes) for t in type_ids or ()])
+            # Merged duplicates are gone from the table.
+            for customer_id in customer_ids:
+                if customer_id not in found:
+                    self.remove_customer(customer_id)
+
+    def _evaluate(
+        self, all_of: list[UUID], any_of: list[UUID], none_of: list[UUID]
+    ) -> tuple[_Snapshot, RoaringBitmap]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Segment index has not been built yet")
+        empty = RoaringBitmap()
+        result = snapshot.universe
+        # Intersect smallest-first so later steps work on the fewest containers.
+        for bitmap in sorted((snapshot.by_type.get(t, empty) for t in all_of), key=len):
+            result = result & bitmap
+        if any_of:
+            union = RoaringBitmap()
+            for type_id in any_of:
+                union = union | snapshot.by_type.get(type_id, empty)
+            result = result & union
+        for type_id in none_of:
+            result = result - snapshot.by_type.get(type_id, empty)
+        return snapshot, result
+
+    def count(self, all_of: list[UUID], any_of: list[UUID], none_of: list[UUID]) -> int:
+        return len(self._evaluate(all_of, any_of, none_of)[1])
+
+    def customer_ids(
+        self,
+        all_of: list[UUID],
+        any_of: list[UUID],
+        none_of: list[UUID],
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> tuple[int, list[UUID]]:
+        """``(total, ids)`` for the segment, ids in ordinal order and sliced by offset/limit."""
+        snapshot, result = self._evaluate(all_of, any_of, none_of)
+        stop = None if limit is None else offset + limit
+        ids = [snapshot.customer_id(ordinal) for ordinal in itertools.islice(result, offset, stop)]
+        return len(result), ids
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Segment index rebuild failed")
+            await asyncio.sleep(settings.SEGMENT_INDEX_REBUILD_SECONDS)
+
+    def start(self) -> None:
+        if self._refresh is None:
+            self._refresh = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh is not None:
+            self._refresh.cancel()
+            self._refresh = None
+        for task in (self._reload, self._flush_rebuild):
+            if task is not None:
+                task.cancel()
+        self._reload = self._flush_rebuild = None
+
+
+segment_index = CustomerSegmentIndex()
+cache_bus.register(SEGMENT_INDEX_NAMESPACE, segment_index)
@@ -0,0 +1,79 @@
+"""
+Measure the bandwidth/CPU trade-off of response compression on API-shaped JSON.
+
+Builds customer-list payloads of several sizes and, for each gzip level and brotli
+quality (when the ``brotli`` package is installed), prints the compressed size, ratio
+and compression time per response. Use it to pick COMPRESSION_GZIP_LEVEL,
+COMPRESSION_BROTLI_QUALITY and COMPRESSION_MINIMUM_SIZE.
+
+Usage:
+  python benchmarks/compression.py --rows 10,100,1000,10000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def payload(rows: int) -> bytes:
+    now = datetime.now(timezone.utc).isoformat()
+    data = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Customer {i}",
+            "primary_mobile": f"98{i:08d}",
+            "email": f"customer{i}@example.com",
+            "created_at": now,
+            "updated_at": now,
+            "types": [{"id": str(uuid.uuid4()), "source": "upload", "created_at": now}],
+        }
+        for i in range(rows)
+    ]
+    return json.dumps({"status": "success", "data": data, "error": None}).encode()
+
+
+def codecs() -> dict[str, Callable[[bytes], bytes]]:
+    options: dict[str, Callable[[bytes], bytes]] = {}
+    for level in (1, 6, 9):
+        options[f"gzip-{level}"] = lambda body, level=level: gzip.compress(body, compresslevel=level)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            options[f"br-{quality}"] = lambda body, quality=quality: brotli.compress(
+                body, quality=quality, mode=brotli.MODE_TEXT
+            )
+    return options
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10,100,1000,10000", help="comma-separated list sizes")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli not installed; measuring gzip only")
+    print(f"{'rows':>6} {'codec':>8} {'bytes':>10} {'ratio':>7} {'ms/resp':>9}")
+    for rows in (int(r) for r in args.rows.split(",")):
+        body = payload(rows)
+        print(f"{rows:>6} {'identity':>8} {len(body):>10} {1.0:>7.2f} {0.0:>9.3f}")
+        for name, compress in codecs().items():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                compressed = compress(body)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+            print(f"{rows:>6} {name:>8} {len(compressed):>10} {len(body) / len(compressed):>7.2f} {elapsed_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Compare per-query cost of the precompiled hot statements with plain ``select()`` builds.
+
+Offline (default): times what SQLAlchemy does in Python before a statement reaches the
+driver (construct, cache key, compiled-cache lookup, bind parameters) for the asyncpg
+dialect. No database needed; this is the CPU the registry removes from every request.
+
+With --db: runs each lookup against the configured Postgres (POSTGRES_* settings) and
+reports wall-clock latency and process CPU per query for both forms.
+
+Usage:
+  python benchmarks/hot_queries.py --iterations 50000
+  python benchmarks/hot_queries.py --db --iterations 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect  # noqa: E402
+from sqlalchemy.util import LRUCache  # noqa: E402
+
+from app.crud import statements  # noqa: E402
+from app.models.customer import CallerAssignment, Customer  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+# name -> (plain builder, precompiled builder, sample argument)
+CASES: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any], Callable[[], Any]]] = {
+    "user_by_id": (lambda v: select(User).where(User.id == v), statements.user_by_id, uuid.uuid4),
+    "user_by_email": (
+        lambda v: select(User).where(User.email == v),
+        statements.user_by_email,
+        lambda: f"{uuid.uuid4().hex[:12]}@example.com",
+    ),
+    "customer_by_identity_key": (
+        lambda v: select(Customer).where(Customer.identity_key == v),
+        statements.customer_by_identity_key,
+        lambda: f"m:9{uuid.uuid4().int % 10**9:09d}",
+    ),
+    "assignment_by_id": (
+        lambda v: select(CallerAssignment).where(CallerAssignment.id == v),
+        statements.assignment_by_id,
+        uuid.uuid4,
+    ),
+}
+
+
+def summarize(label: str, wall: list[float], cpu_seconds: float) -> str:
+    ordered = sorted(wall)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    return (
+        f"  {label:<12} p50={statistics.median(ordered) * 1e6:8.1f}us p99={p99 * 1e6:8.1f}us "
+        f"cpu/query={cpu_seconds / len(ordered) * 1e6:8.1f}us"
+    )
+
+
+def run_offline(iterations: int) -> None:
+    dialect = asyncpg_dialect()
+    for name, (plain, hot, sample) in CASES.items():
+        print(name)
+        for label, build in (("select()", plain), ("precompiled", hot)):
+            cache = LRUCache(500)
+            values = [sample() for _ in range(iterations)]
+            wall = []
+            cpu_started = time.process_time()
+            for value in values:
+                started = time.perf_counter()
+                stmt = build(value)
+                compiled, extracted, _, _ = stmt._compile_w_cache(
+                    dialect, compiled_cache=cache, column_keys=[], for_executemany=False, schema_translate_map=None
+                )
+                compiled.construct_params(extracted_parameters=extracted, escape_names=False)
+                wall.append(time.perf_counter() - started)
+            print(summarize(label, wall, time.process_time() - cpu_started))
+
+
+async def run_db(iterations: int) -> None:
+    from app.db.session import AsyncSessionLocal, dispose_engines, init_engines
+
+    await init_engines()
+    try:
+        for name, (plain, hot, sample) in CASES.items():
+            print(name)
+            for label, build in (("select()", plain), ("precompiled", hot)):
+                async with AsyncSessionLocal() as session:
+                    await session.execute(build(sample()))  # prepare on this connection first
+                    wall = []
+                    cpu_started = time.process_time()
+                    for _ in range(iterations):
+                        value = sample()
+                        started = time.perf_counter()
+                        (await session.execute(build(value))).scalar_one_or_none()
+                        wall.append(time.perf_counter() - started)
+                    print(summarize(label, wall, time.process_time() - cpu_started))
+    finally:
+        await dispose_engines()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--db", action="store_true", help="execute against Postgres instead of compiling only")
+    args = parser.parse_args()
+
+    if args.db:
+        asyncio.run(run_db(args.iterations))
+    else:
+        run_offline(args.iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Measure how a /auth/login flood affects latency on other routes.
+
+Runs a baseline of probe requests, then the same probes while a pool of
+clients hammers /auth/login with wrong passwords, and prints p50/p95/p99
+for both phases plus the login status-code mix (429s show throttling).
+
+Usage:
+  export API_BASE_URL=http://localhost:8000
+  python benchmarks/login_flood.py --flooders 64 --duration 20 --probe /health
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000").rstrip("/")
+API_PREFIX = os.getenv("API_PREFIX", "/api/v1")
+
+
+def percentiles(samples: list[float]) -> str:
+    if not samples:
+        return "no samples"
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return (
+        f"n={len(ordered)} p50={statistics.median(ordered):.1f}ms "
+        f"p95={pick(0.95):.1f}ms p99={pick(0.99):.1f}ms max={ordered[-1]:.1f}ms"
+    )
+
+
+async def probe(client: httpx.AsyncClient, path: str, stop_at: float, interval: float) -> list[float]:
+    latencies: list[float] = []
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        resp = await client.get(f"{BASE_URL}{path}")
+        resp.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def flood(client: httpx.AsyncClient, stop_at: float, worker: int, statuses: Counter) -> None:
+    # Spread attempts over several accounts and forged client IPs (only honoured behind a proxy).
+    email = f"flood{worker % 8}@example.com"
+    while time.perf_counter() < stop_at:
+        try:
+            resp = await client.post(
+                f"{BASE_URL}{API_PREFIX}/auth/login",
+                json={"email": email, "password": "wrong-password"},
+                headers={"X-Forwarded-For": f"10.0.{worker // 250}.{worker % 250}"},
+            )
+            statuses[resp.status_code] += 1
+        except httpx.HTTPError:
+            statuses["error"] += 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flooders", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--probe", default="/health")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.flooders + 8)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        baseline = await probe(client, args.probe, time.perf_counter() + args.duration / 2, args.probe_interval)
+
+        statuses: Counter = Counter()
+        stop_at = time.perf_counter() + args.duration
+        flooders = [asyncio.create_task(flood(client, stop_at, i, statuses)) for i in range(args.flooders)]
+        under_flood = await probe(client, args.probe, stop_at, args.probe_interval)
+        await asyncio.gather(*flooders)
+
+    print(f"baseline    {args.probe}: {percentiles(baseline)}")
+    print(f"login flood {args.probe}: {percentiles(under_flood)}")
+    print(f"login responses: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+"""
+Compare serving configurations (event loop, HTTP parser, worker count) on representative routes.
+
+For each configuration this starts ``gunicorn -c gunicorn.conf.py app.main:app`` with the
+SERVER_* / WEB_CONCURRENCY overrides, waits for /health, drives every route with keep-alive
+clients for --duration seconds, prints throughput and latency, then sends SIGTERM and reports
+how long the drain took. The app starts normally, so the configured Postgres must be reachable.
+
+The load generator is Python too; keep it off the server's cores (--client-processes, or run
+the clients on another machine against --base-url with --no-launch).
+
+Usage (from backend/):
+  python benchmarks/serving.py --workers 1 4 --duration 15
+  python benchmarks/serving.py --route /api/v1/customers/lookup?mobile=9876543210 --token "$TOKEN"
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# name -> settings overrides
+CONFIGS: dict[str, dict[str, str]] = {
+    "asyncio-h11": {"SERVER_LOOP": "asyncio", "SERVER_HTTP": "h11"},
+    "asyncio-httptools": {"SERVER_LOOP": "asyncio", "SERVER_HTTP": "httptools"},
+    "uvloop-httptools": {"SERVER_LOOP": "uvloop", "SERVER_HTTP": "httptools"},
+}
+DEFAULT_ROUTES = ["/health", "/health/pool", "/api/v1/openapi.json"]
+
+
+async def _drive(
+    base_url: str, route: str, connections: int, duration: float, headers: dict[str, str]
+) -> tuple[int, int, list[float]]:
+    latencies: list[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers=headers, timeout=30) as client:
+
+        async def loop() -> None:
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(route)
+                    await resp.aread()
+                    if resp.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(loop() for _ in range(connections)))
+    return len(latencies), errors, latencies
+
+
+def _client_process(base_url: str, route: str, connections: int, duration: float, headers: dict[str, str]):
+    return asyncio.run(_drive(base_url, route, connections, duration, headers))
+
+
+def measure(base_url: str, route: str, args: argparse.Namespace, headers: dict[str, str]) -> str:
+    per_process = max(1, args.concurrency // args.client_processes)
+    with ProcessPoolExecutor(args.client_processes) as pool:
+        futures = [
+            pool.submit(_client_process, base_url, route, per_process, args.duration, headers)
+            for _ in range(args.client_processes)
+        ]
+        results = [future.result() for future in futures]
+    total = sum(count for count, _, _ in results)
+    errors = sum(errs for _, errs, _ in results)
+    ordered = sorted(latency for _, _, latencies in results for latency in latencies)
+    if not ordered:
+        return f"  {route:<40} no responses"
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    return (
+        f"  {route:<40} {total / args.duration:9.0f} req/s  p50={statistics.median(ordered) * 1000:7.2f}ms "
+        f"p99={p99 * 1000:7.2f}ms errors={errors}"
+    )
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def run_config(name: str, workers: int, args: argparse.Namespace, headers: dict[str, str]) -> None:
+    print(f"{name} workers={workers}")
+    env = {**os.environ, **CONFIGS[name], "WEB_CONCURRENCY": str(workers), "SERVER_BIND": f"127.0.0.1:{args.port}"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(base_url, process)
+        for route in args.routes:
+            measure(base_url, route, argparse.Namespace(**{**vars(args), "duration": 2}), headers)  # warm up
+            print(measure(base_url, route, args, headers))
+    finally:
+        started = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=120)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        print(f"  drained and stopped in {time.perf_counter() - started:.1f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS), default=sorted(CONFIGS))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+    parser.add_argument("--route", dest="routes", action="append", help="repeatable; defaults to health and openapi")
+    parser.add_argument("--token", help="bearer token for authenticated routes")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--base-url", help="with --no-launch: benchmark an already running server")
+    parser.add_argument("--no-launch", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="show gunicorn's log")
+    args = parser.parse_args()
+    args.routes = args.routes or DEFAULT_ROUTES
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+
+    if args.no_launch:
+        base_url = (args.base_url or "http://localhost:8000").rstrip("/")
+        for route in args.routes:
+            print(measure(base_url, route, args, headers))
+        return 0
+
+    for workers in args.workers:
+        for name in args.configs:
+            run_config(name, workers, args, headers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
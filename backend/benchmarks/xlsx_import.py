@@ -0,0 +1,71 @@
+"""
+Measure XLSX import parsing wall time against the number of parse processes.
+
+Writes a synthetic single-sheet workbook of leads (name, mobile, email), then parses it
+through ``iter_parsed_chunks`` once per process count and prints wall time and rows/s. The
+workbook is read once by a single reader and validation fans out to the pool, so wall time
+should fall with more processes until the reader (roughly a quarter of the single-process
+cost) becomes the bottleneck. Needs as many free cores as the largest process count.
+
+Usage:
+  python benchmarks/xlsx_import.py --rows 200000 --processes 0,1,2,4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.services.import_parsing import iter_parsed_chunks, plan_chunks, shutdown_parse_pool  # noqa: E402
+
+
+def write_workbook(path: Path, rows: int) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Leads")
+    sheet.append(["Name", "Mobile", "Email"])
+    for i in range(rows):
+        sheet.append([f"Lead {i}", 9000000000 + i, f"lead{i}@example.com"])
+    workbook.save(path)
+
+
+async def parse(path: Path) -> int:
+    plan = plan_chunks(path, settings.IMPORT_PARSE_CHUNK_BYTES, settings.IMPORT_XLSX_CHUNK_ROWS)
+    return sum([len(chunk.rows) async for chunk in iter_parsed_chunks(path, plan)])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-rows", type=int, default=settings.IMPORT_XLSX_CHUNK_ROWS)
+    parser.add_argument("--processes", default="0,1,2,4", help="comma-separated; 0 parses in threads")
+    args = parser.parse_args()
+    settings.IMPORT_XLSX_CHUNK_ROWS = args.chunk_rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "leads.xlsx"
+        started = time.perf_counter()
+        write_workbook(path, args.rows)
+        print(f"wrote {args.rows:,} rows in {time.perf_counter() - started:.1f}s ({path.stat().st_size / 1e6:.1f} MB)")
+
+        for processes in (int(value) for value in args.processes.split(",")):
+            settings.IMPORT_PARSE_PROCESSES = processes
+            shutdown_parse_pool()
+            started = time.perf_counter()
+            parsed = asyncio.run(parse(path))
+            elapsed = time.perf_counter() - started
+            print(f"processes={processes} rows={parsed:,} wall={elapsed:.2f}s rate={parsed / elapsed:,.0f} rows/s")
+        shutdown_parse_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
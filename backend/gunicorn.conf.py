@@ -0,0 +1,28 @@
+"""Production launcher: ``gunicorn -c gunicorn.conf.py app.main:app`` (run from backend/).
+
+Every value comes from app settings (environment or .env), so the worker count here and the
+per-worker pool sizes derived in app.db.session always agree. See the SERVER_* settings.
+"""
+
+from app.core.config import settings
+from app.core.serving import log_connection_plan
+
+bind = settings.SERVER_BIND
+workers = max(1, settings.WEB_CONCURRENCY)
+worker_class = "app.core.serving.ProductionWorker"
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE_SECONDS
+timeout = settings.SERVER_WORKER_TIMEOUT
+graceful_timeout = settings.SERVER_DRAIN_SECONDS + settings.SERVER_SHUTDOWN_SECONDS
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS // 10
+# Workers fork after the app is imported; engines, caches and listeners are created per worker
+# on startup (app.db.session drops anything inherited across the fork).
+preload_app = settings.SERVER_PRELOAD
+forwarded_allow_ips = settings.SERVER_FORWARDED_ALLOW_IPS
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server) -> None:
+    log_connection_plan(workers, server.log)
@@ -0,0 +1,52 @@
+import asyncio
+import uuid
+
+from app.core.config import settings
+from app.models.customer import ActivityKind
+from app.services.activity_log import ActivityWriter
+
+
+def test_flushes_full_batches_and_keeps_failed_ones(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "ACTIVITY_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "ACTIVITY_FLUSH_INTERVAL_MS", 60_000)
+    batches: list[list] = []
+    fail = {"next": True}
+
+    async def write(records) -> None:
+        if fail["next"]:
+            fail["next"] = False
+            raise OSError("connection reset")
+        batches.append(records)
+
+    async def scenario() -> ActivityWriter:
+        writer = ActivityWriter(write)
+        writer.start()
+        caller = uuid.uuid4()
+        for _ in range(3):
+            assert writer.record(ActivityKind.dial, caller)
+        for _ in range(50):  # the full batch wakes the writer long before the interval
+            await asyncio.sleep(0.02)
+            if batches:
+                break
+        writer.record(ActivityKind.hangup, caller, details={"seconds": 42})
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert batches[1][0].copy_row()[2:] == ("hangup", None, None, '{"seconds": 42}')
+    assert writer.stats()["written"] == 4 and writer.stats()["write_failures"] == 1
+    assert writer.stats()["buffered"] == 0
+
+
+def test_full_buffer_rejects_instead_of_growing(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "ACTIVITY_MAX_BUFFER", 2)
+
+    async def write(records) -> None:
+        raise AssertionError("not started")
+
+    writer = ActivityWriter(write)
+    caller = uuid.uuid4()
+    assert writer.record(ActivityKind.remark, caller) and writer.record(ActivityKind.remark, caller)
+    assert not writer.record(ActivityKind.remark, caller)
+    assert writer.stats()["buffered"] == 2 and writer.stats()["rejected"] == 1
@@ -0,0 +1,112 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import admission
+from app.core.admission import AdmissionControlMiddleware, AdmissionController, RouteClass
+
+
+class Pool:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.checked_out = 0
+
+    def usage(self) -> tuple[int, int]:
+        return self.size, self.checked_out
+
+    def checkout(self, controller: AdmissionController, ticket) -> None:
+        self.checked_out += 1
+        token = admission._current_ticket.set(ticket)
+        try:
+            controller.connection_checked_out()
+        finally:
+            admission._current_ticket.reset(token)
+
+
+def test_admitted_requests_hold_capacity_until_they_check_out(monkeypatch) -> None:
+    monkeypatch.setattr(admission.settings, "ADMISSION_REQUESTS_PER_CONNECTION", 10.0)
+    pool = Pool(2)
+    controller = AdmissionController(pool.usage)
+
+    async def scenario() -> None:
+        first = await controller.admit(RouteClass.interactive)
+        second = await controller.admit(RouteClass.interactive)
+        # Nothing is checked out yet, but both free connections are spoken for.
+        third = asyncio.create_task(controller.admit(RouteClass.interactive))
+        await asyncio.sleep(0)
+        assert not third.done() and controller.stats()["interactive"]["queued"] == 1
+
+        pool.checkout(controller, first)
+        assert controller.awaiting_connection == 1 and not third.done()
+
+        pool.checked_out -= 1
+        controller.release(first)
+        assert (await third) is not None
+        assert controller.stats()["interactive"] == {"in_flight": 2, "queued": 0, "shed": 0}
+
+        controller.release(second)  # never touched the database
+        controller.release(third.result())
+        assert controller.awaiting_connection == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_times_out_and_sheds_when_full(monkeypatch) -> None:
+    monkeypatch.setattr(admission.settings, "ADMISSION_MAX_WAIT_MS", 20)
+    monkeypatch.setattr(admission.settings, "ADMISSION_MAX_QUEUE", 1)
+    pool = Pool(1)
+    pool.checked_out = 1
+    controller = AdmissionController(pool.usage)
+
+    async def scenario() -> None:
+        queued = asyncio.create_task(controller.admit(RouteClass.interactive))
+        await asyncio.sleep(0)
+        assert await controller.admit(RouteClass.interactive) is None  # queue full: shed at once
+        assert await queued is None  # timed out waiting
+        assert controller.shed[RouteClass.interactive] == 2
+        assert controller.stats()["interactive"]["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_low_priority_leaves_the_reserve_free(monkeypatch) -> None:
+    monkeypatch.setattr(admission.settings, "ADMISSION_LOW_PRIORITY_RESERVE", 2)
+    monkeypatch.setattr(admission.settings, "ADMISSION_MAX_WAIT_MS", 10)
+    pool = Pool(3)
+    controller = AdmissionController(pool.usage)
+
+    async def scenario() -> None:
+        assert await controller.admit(RouteClass.low_priority) is not None
+        assert await controller.admit(RouteClass.low_priority) is None
+        assert await controller.admit(RouteClass.interactive) is not None
+
+    asyncio.run(scenario())
+
+
+def test_middleware_sheds_with_503_and_skips_exempt_routes(monkeypatch) -> None:
+    monkeypatch.setattr(admission.settings, "ADMISSION_MAX_WAIT_MS", 10)
+    pool = Pool(1)
+    pool.checked_out = 1
+    controller = AdmissionController(pool.usage)
+
+    app = FastAPI()
+
+    @app.get("/api/v1/customers")
+    async def customers() -> dict:
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"ok": True}
+
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    client = TestClient(app)
+
+    shed = client.get("/api/v1/customers")
+    assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+    assert client.get("/health").status_code == 200
+
+    pool.checked_out = 0
+    assert client.get("/api/v1/customers").status_code == 200
+    assert controller.awaiting_connection == 0 and controller.in_flight[RouteClass.interactive] == 0
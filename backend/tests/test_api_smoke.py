@@ -172,3 +172,14 @@ def test_candidate_get_payments(authed: requests.Session):
     assert resp.status_code in (200, 404)
     if resp.status_code == 200:
         assert isinstance(resp.json()["data"], list)
+
+
+def test_customer_upsert_merges_on_mobile(authed: requests.Session):
+    mobile = f"9{uuid.uuid4().int % 10**9:09d}"
+    payload = {"name": "Smoke Customer", "primary_mobile": mobile, "customer_type_ids": [], "source": "manual"}
+    first = authed.post(f"{BASE_URL}/customers", json=payload)
+    assert first.status_code == 200
+    second = authed.post(f"{BASE_URL}/customers", json={**payload, "primary_mobile": f"+91 {mobile}"})
+    assert second.status_code == 200
+    assert second.json()["data"]["id"] == first.json()["data"]["id"]
+    assert second.json()["data"]["merged"] is True
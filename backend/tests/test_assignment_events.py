@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import re
+import uuid
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.assignment_events import RESYNC, AssignmentEventBroker
+
+
+NOTIFY_MIGRATION = (
+    Path(__file__).resolve().parents[1]
+    / "app" / "db" / "migrations" / "versions" / "4a1e8c3d9b72_statement_level_assignment_notify.py"
+)
+
+
+def _payload(assignment_id: uuid.UUID, caller_id: uuid.UUID, status: str = "called") -> str:
+    return json.dumps(
+        {"kind": "item", "assignment_id": str(assignment_id), "caller_id": str(caller_id), "call_status": status}
+    )
+
+
+def test_events_reach_matching_subscribers_only() -> None:
+    broker = AssignmentEventBroker()
+    assignment, other_assignment, caller = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    by_assignment = broker.subscribe(assignment_id=assignment)
+    by_caller = broker.subscribe(caller_id=caller)
+    floor = broker.subscribe()
+
+    broker.publish(_payload(assignment, caller))
+    broker.publish(_payload(other_assignment, uuid.uuid4()))
+
+    assert by_assignment.queue.qsize() == 1
+    assert by_caller.queue.qsize() == 1
+    assert floor.queue.qsize() == 2
+    event = by_assignment.queue.get_nowait()
+    assert event.encode().startswith("event: item\ndata: {")
+
+
+def test_slow_subscriber_is_bounded_and_resynced(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ASSIGNMENT_EVENTS_QUEUE_SIZE", 4)
+    broker = AssignmentEventBroker()
+    subscription = broker.subscribe()
+
+    for _ in range(50):
+        broker.publish(_payload(uuid.uuid4(), uuid.uuid4()))
+
+    assert subscription.lagged
+    assert subscription.queue.qsize() == 1
+    assert subscription.queue.get_nowait() is RESYNC
+    assert broker.dropped == 1
+
+
+def test_subscriber_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ASSIGNMENT_EVENTS_MAX_SUBSCRIBERS", 1)
+    broker = AssignmentEventBroker()
+    first = broker.subscribe()
+    assert broker.subscribe() is None
+    broker.unsubscribe(first)
+    assert broker.subscribe() is not None
+
+
+def test_notify_triggers_fire_once_per_statement_with_bounded_payloads() -> None:
+    spec = importlib.util.spec_from_file_location("notify_migration", NOTIFY_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    upgrade = NOTIFY_MIGRATION.read_text().split("def downgrade")[0]
+    triggers = re.findall(r"CREATE TRIGGER (\w+)\s+(.*?)EXECUTE", upgrade, re.S)
+    assert {name for name, _ in triggers} == {
+        "caller_assignment_items_notify",
+        "caller_assignment_items_status_notify",
+        "call_remarks_notify",
+    }
+    assert all("REFERENCING" in body and "FOR EACH STATEMENT" in body for _, body in triggers)
+
+    # Largest listed remark notification, in json_build_object's spacing.
+    remark = {
+        "item_id": str(uuid.uuid4()),
+        "customer_id": str(uuid.uuid4()),
+        "mobile": "9" * 20,
+        "remark_id": str(uuid.uuid4()),
+        "outcome": "x" * 50,
+        "follow_up_date": "2026-10-20",
+        "at": "2026-10-20T14:26:51.093314+05:30",
+    }
+    payload = {
+        "kind": "remark",
+        "op": "insert",
+        "assignment_id": str(uuid.uuid4()),
+        "assignment_date": "2026-10-20",
+        "caller_id": str(uuid.uuid4()),
+        "count": migration.MAX_LISTED,
+        "remarks": [remark] * migration.MAX_LISTED,
+    }
+    assert len(json.dumps(payload, separators=(", ", " : ")).encode()) < 8000
@@ -0,0 +1,32 @@
+import random
+
+from app.core.bitmap import ARRAY_LIMIT, RoaringBitmap
+
+
+def test_set_algebra_matches_python_sets() -> None:
+    rng = random.Random(7)
+    universe = 1 << 20
+    # Mix sparse (array) and dense (bitmap) containers on both sides.
+    left = set(rng.sample(range(universe), 5_000)) | set(range(0, 70_000, 2))
+    right = set(rng.sample(range(universe), 200_000))
+    a = RoaringBitmap.from_sorted(sorted(left))
+    b = RoaringBitmap.from_sorted(sorted(right))
+
+    assert len(a) == len(left)
+    assert set(a & b) == left & right
+    assert set(a | b) == left | right
+    assert set(a - b) == left - right
+    assert set(b - a) == right - left
+
+
+def test_add_and_discard_switch_container_kinds() -> None:
+    bitmap = RoaringBitmap()
+    for value in range(ARRAY_LIMIT + 10):
+        bitmap.add(value)
+    bitmap.add(5)
+    assert len(bitmap) == ARRAY_LIMIT + 10
+
+    for value in range(20):
+        bitmap.discard(value)
+    assert 19 not in bitmap and 20 in bitmap
+    assert list(bitmap) == list(range(20, ARRAY_LIMIT + 10))
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.db.cache_bus import _MAX_PAYLOAD_BYTES, FLUSH_ALL, CacheBus, _payloads
+from app.db.notify import PgListener
+
+
+class RecordingCache:
+    def __init__(self) -> None:
+        self.evicted: list[list[str]] = []
+        self.flushes = 0
+
+    def evict(self, keys: list[str]) -> None:
+        self.evicted.append(sorted(keys))
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.info: dict = {}
+        self.executed: list[dict] = []
+        self.sync_session = self
+
+    def execute(self, statement, params) -> None:
+        self.executed.append(params)
+
+
+def test_payloads_split_under_notify_limit() -> None:
+    keys = [f"{index:036d}" for index in range(1000)]
+    payloads = _payloads("host:1", "segment_index", keys)
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) < 8000 for payload in payloads)
+    assert all(len(payload.encode()) <= _MAX_PAYLOAD_BYTES + 100 for payload in payloads)
+    assert [key for payload in payloads for key in json.loads(payload)["keys"]] == keys
+
+
+def test_publish_notifies_on_commit_and_applies_locally_after() -> None:
+    bus = CacheBus()
+    cache = RecordingCache()
+    bus.register("caller_id", cache)
+    session = FakeSession()
+
+    bus.publish(session, "caller_id", ["9876543210", None, "9876543210"])
+    bus.publish(session, "caller_id", ["9123456789"])
+    bus._before_commit(session)
+    assert cache.evicted == []
+    [params] = session.executed
+    [payload] = params["payloads"]
+    assert json.loads(payload) == {"origin": bus.origin, "ns": "caller_id", "keys": ["9123456789", "9876543210"]}
+
+    bus._after_commit(session)
+    assert cache.evicted == [["9123456789", "9876543210"]]
+    bus._before_commit(session)
+    assert len(session.executed) == 1  # nothing pending for the next transaction
+
+    bus.publish(session, "caller_id", ["9000000000"])
+    bus._after_rollback(session)
+    bus._after_commit(session)
+    assert len(cache.evicted) == 1
+
+
+def test_receive_dispatches_other_workers_and_flushes_on_reconnect() -> None:
+    bus = CacheBus()
+    callers, segments = RecordingCache(), RecordingCache()
+    bus.register("caller_id", callers)
+    bus.register("segment_index", segments)
+
+    bus._receive(json.dumps({"origin": "elsewhere:7", "ns": "caller_id", "keys": ["1", "2"]}))
+    bus._receive(json.dumps({"origin": bus.origin, "ns": "caller_id", "keys": ["3"]}))
+    bus._receive(json.dumps({"origin": "elsewhere:7", "ns": "segment_index", "keys": [FLUSH_ALL]}))
+    bus._receive("not json")
+    assert callers.evicted == [["1", "2"]]
+    assert segments.evicted == [] and segments.flushes == 1
+
+    bus.flush_all()
+    assert callers.flushes == 1 and segments.flushes == 2
+
+
+def test_publish_accepts_uuid_keys() -> None:
+    bus = CacheBus()
+    session = FakeSession()
+    customer_id = uuid.uuid4()
+    bus.publish(session, "segment_index", [customer_id, None, "9876500001"])
+    assert session.info["cache_bus_pending"]["segment_index"] == {str(customer_id), "9876500001"}
+
+
+class DroppingConnection:
+    """Accepts LISTEN, then fails the first keepalive."""
+
+    async def execute(self, sql: str) -> None:
+        raise OSError("connection reset")
+
+    def terminate(self) -> None:
+        pass
+
+
+class StopListening(BaseException):
+    """Ends PgListener._run from inside; it only catches Exception."""
+
+
+def test_failing_reconnect_handler_does_not_stop_the_listener(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "DB_LISTEN_KEEPALIVE_SECONDS", 0)
+    listener = PgListener()
+    resyncs = []
+    listener.on_reconnect(lambda: 1 / 0)
+    listener.on_reconnect(lambda: resyncs.append(1))
+
+    async def connect() -> DroppingConnection:
+        if len(resyncs) == 2:
+            raise StopListening
+        return DroppingConnection()
+
+    monkeypatch.setattr(listener, "_connect", connect)
+    # A ZeroDivisionError escaping the first handler would end the loop before the second reconnect.
+    with pytest.raises(StopListening):
+        asyncio.run(listener._run())
+    assert len(resyncs) == 2
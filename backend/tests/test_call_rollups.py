@@ -0,0 +1,106 @@
+import asyncio
+import importlib.util
+import uuid
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.crud import call_rollup
+from app.crud.call_rollup import backfill_call_rollups, call_outcome_series, rollup_day_function_sql
+from app.models.report import ALL_CUSTOMER_TYPES
+
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "app" / "db" / "migrations" / "versions"
+ROLLUP_SOURCE = "CROSS JOIN LATERAL call_rollup_types(r.customer_type_ids, i.customer_id) AS t(customer_type_id)"
+# Both joins carry assignment_date so only the remark's partitions are probed.
+ROLLUP_JOINS = [
+    "JOIN caller_assignment_items i ON i.id = r.assignment_item_id AND i.assignment_date = r.assignment_date",
+    "JOIN caller_assignments a ON a.id = i.assignment_id AND a.assignment_date = i.assignment_date",
+]
+
+
+class Session:
+    def __init__(self, scalar=None, rows=()) -> None:
+        self._scalar = scalar
+        self._rows = list(rows)
+        self.statements: list[tuple[str, dict]] = []
+        self.commits = 0
+
+    async def scalar(self, stmt):
+        return self._scalar
+
+    async def execute(self, stmt, params=None):
+        if params is None:
+            compiled = stmt.compile(dialect=asyncpg_dialect())
+            self.statements.append((str(compiled), compiled.params))
+        else:
+            self.statements.append((str(stmt), params))
+        rows = self._rows
+        return type("Result", (), {"rowcount": 12, "all": lambda self: rows})()
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def test_report_timezone_is_written_into_the_day_function(monkeypatch) -> None:
+    assert "AT TIME ZONE 'America/Sao_Paulo'" in rollup_day_function_sql("America/Sao_Paulo")
+    with pytest.raises(ValueError):
+        rollup_day_function_sql("UTC'; DROP TABLE call_outcome_daily; --")
+
+    monkeypatch.setattr(call_rollup.settings, "REPORT_TIMEZONE", "Europe/Berlin")
+    session = Session()
+    assert asyncio.run(backfill_call_rollups(session, date(2026, 10, 1), date(2026, 10, 7))) == 12
+
+    statements = [sql for sql, _ in session.statements]
+    assert "AT TIME ZONE 'Europe/Berlin'" in statements[0]
+    assert statements[1].startswith("LOCK TABLE call_outcome_daily")
+    assert session.statements[-1][1] == {"start": date(2026, 10, 1), "end": date(2026, 10, 7)}
+    assert session.commits == 1
+
+
+def test_backfill_counts_calls_under_the_same_types_as_the_trigger() -> None:
+    backfill_insert = call_rollup._BACKFILL_SQL[-1]
+    spec = importlib.util.spec_from_file_location(
+        "rollup_migration", MIGRATIONS / "b5e1d7c3a926_rollup_partition_pruning.py"
+    )
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    trigger_body = migration._rollup_apply_function(pruned=True)
+    assert ROLLUP_SOURCE in backfill_insert
+    assert ROLLUP_SOURCE in trigger_body
+    for join in ROLLUP_JOINS:
+        assert join in backfill_insert
+        assert join in trigger_body
+    assert "customer_type_maps" not in backfill_insert
+
+
+def test_backfill_refuses_archived_months() -> None:
+    session = Session(scalar=date(2026, 3, 1))
+    with pytest.raises(ValueError, match="2026-03"):
+        asyncio.run(backfill_call_rollups(session, date(2026, 3, 31), date(2026, 4, 2)))
+    assert session.statements == [] and session.commits == 0
+
+    asyncio.run(backfill_call_rollups(session, date(2026, 4, 1), date(2026, 4, 2)))
+    assert session.commits == 1
+
+
+def test_series_reads_the_total_rows_unless_a_type_is_given() -> None:
+    caller, customer_type = uuid.uuid4(), uuid.uuid4()
+    day = date(2026, 10, 19)
+
+    session = Session(rows=[(day, "connected", 7)])
+    assert asyncio.run(call_outcome_series(session, day, day)) == [(day, None, "connected", 7)]
+    sql, params = session.statements[0]
+    assert "GROUP BY call_outcome_daily.day, call_outcome_daily.outcome" in sql
+    assert ALL_CUSTOMER_TYPES in params.values()
+
+    session = Session(rows=[(day, caller, "connected", 3)])
+    series = asyncio.run(
+        call_outcome_series(session, day, day, by_caller=True, caller_id=caller, customer_type_id=customer_type)
+    )
+    assert series == [(day, caller, "connected", 3)]
+    sql, params = session.statements[0]
+    assert "call_outcome_daily.caller_id" in sql.split("GROUP BY")[1]
+    assert customer_type in params.values() and caller in params.values()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+from app.services import caller_id as caller_id_module
+from app.services.caller_id import CallerIdCache, _mobile_key, _PackedSummaries
+
+
+TYPE_ID = uuid.uuid4()
+
+
+def _row(mobile: str, name: str, remark: str | None = None, outcome: str | None = None):
+    remark_at = datetime(2024, 5, 1, tzinfo=timezone.utc) if remark is not None else None
+    return (mobile, uuid.uuid4(), name, [TYPE_ID], remark, outcome, remark_at)
+
+
+def _packed(*rows) -> _PackedSummaries:
+    packed = _PackedSummaries()
+    for row in sorted(rows, key=lambda row: _mobile_key(row[0])):
+        packed.append(row)
+    return packed
+
+
+def test_packed_summaries_round_trip() -> None:
+    rows = [_row("9876500001", "Asha", "Call back after 5", "callback"), _row("9876500002", "Ravi Kumar")]
+    packed = _packed(*rows)
+
+    first = packed.get(_mobile_key("9876500001"), "9876500001")
+    assert first.customer_id == rows[0][1]
+    assert first.name == "Asha"
+    assert first.customer_type_ids == (TYPE_ID,)
+    assert first.latest_remark == "Call back after 5"
+    assert first.latest_outcome == "callback"
+    assert first.latest_remark_at == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+    second = packed.get(_mobile_key("9876500002"), "9876500002")
+    assert second.name == "Ravi Kumar"
+    assert second.latest_remark is None and second.latest_remark_at is None
+    assert packed.get(_mobile_key("9876500003"), "9876500003") is None
+
+
+def test_invalidate_marks_number_for_database_read() -> None:
+    cache = CallerIdCache()
+    cache._base = _packed(_row("9876500001", "Asha"))
+
+    key, summary, needs_db = cache.peek("9876500001")
+    assert summary.name == "Asha" and not needs_db
+
+    cache.invalidate("+91 98765 00001")
+    key, summary, needs_db = cache.peek("9876500001")
+    assert key == _mobile_key("9876500001") and summary is None and needs_db
+
+    # Numbers that are not plain digits are never cached.
+    assert cache.peek("not-a-number") == (None, None, True)
+
+
+def test_leading_zero_numbers_are_separate_entries() -> None:
+    cache = CallerIdCache()
+    cache._base = _packed(_row("09876543210", "Zero Prefixed"))
+
+    key, summary, needs_db = cache.peek("09876543210")
+    assert summary.name == "Zero Prefixed" and summary.primary_mobile == "09876543210"
+
+    # Same integer value, different number: not cached, so the DB answers.
+    other_key, summary, needs_db = cache.peek("9876543210")
+    assert other_key != key and summary is None and needs_db
+
+    cache._base = _packed(_row("09876543210", "Zero Prefixed"), _row("9876543210", "Plain"))
+    assert cache.peek("9876543210")[1].name == "Plain"
+    assert cache.peek("09876543210")[1].name == "Zero Prefixed"
+
+
+def test_remark_events_evict_the_customers_number() -> None:
+    cache = CallerIdCache()
+    cache._base = _packed(_row("9876500001", "Asha", "Not home", "no_answer"))
+
+    cache._on_assignment_event(json.dumps({"kind": "item", "call_status": "called"}))
+    assert not cache.peek("9876500001")[2]
+
+    remark = {"outcome": "callback", "mobile": "9876500001"}
+    cache._on_assignment_event(json.dumps({"kind": "remark", "count": 1, "remarks": [remark]}))
+    assert cache.peek("9876500001")[2]
+
+
+
+class Session:
+    """Stands in for AsyncSessionLocal(); returns the assignment's mobiles."""
+
+    def __init__(self, reads: list, mobiles: list[str]) -> None:
+        self.reads = reads
+        self.mobiles = mobiles
+
+    async def __aenter__(self) -> "Session":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def execute(self, stmt, params):
+        self.reads.append(params)
+        mobiles = self.mobiles
+        return type("Result", (), {"scalars": lambda self: type("Scalars", (), {"all": lambda self: mobiles})()})()
+
+
+def test_unlisted_remarks_invalidate_only_the_assignments_numbers(monkeypatch) -> None:
+    cache = CallerIdCache()
+    cache._base = _packed(_row("9876500001", "Asha"), _row("9876500002", "Ravi"))
+    reads: list = []
+    monkeypatch.setattr(caller_id_module, "AsyncSessionLocal", lambda: Session(reads, ["9876500001"]))
+    assignment_id = uuid.uuid4()
+
+    async def scenario() -> None:
+        event = {"kind": "remark", "assignment_id": str(assignment_id), "assignment_date": "2026-10-20"}
+        cache._on_assignment_event(json.dumps({**event, "count": 500, "remarks": None}))
+        await asyncio.gather(*cache._assignment_reads)
+
+    asyncio.run(scenario())
+    assert reads == [{"assignment_id": assignment_id, "assignment_date": date(2026, 10, 20)}]
+    assert cache.peek("9876500001")[2]
+    # The rest of the cache is still trusted.
+    assert cache._base_generation == cache._generation
+    assert cache.peek("9876500002")[1].name == "Ravi"
@@ -0,0 +1,134 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import customer_dedupe
+from app.services.caller_id import CALLER_ID_NAMESPACE
+from app.services.segment_index import SEGMENT_INDEX_NAMESPACE
+from app.services.customer_dedupe import (
+    CustomerRecords,
+    apply_approved_merges,
+    email_local_part,
+    find_duplicates,
+    score_pair,
+    soundex,
+)
+
+
+@pytest.mark.parametrize(
+    "word,code",
+    [("Robert", "R163"), ("Rupert", "R163"), ("Ashcraft", "A261"), ("Tymczak", "T522"), ("Pfister", "P236"), ("", "")],
+)
+def test_soundex(word: str, code: str) -> None:
+    assert soundex(word) == code
+
+
+def test_email_local_part_ignores_dots_tags_and_case() -> None:
+    assert email_local_part("Asha.Rao+leads@Example.com") == "asharao"
+    assert email_local_part("no-at-sign") is None
+
+
+def _records(*rows: tuple[str, str | None, str | None]) -> CustomerRecords:
+    records = CustomerRecords()
+    for created, (name, mobile, email) in enumerate(rows):
+        records.append(uuid.uuid4(), name, mobile, email, float(created))
+    return records
+
+
+def test_scoring_weighs_mobile_email_and_name() -> None:
+    records = _records(
+        ("Asha Rao", "+91 98765 43210", "asha@example.com"),
+        ("Aasha Rao", "9876543210", "asha@example.org"),
+        ("Vikram Shah", "9116543210", None),
+    )
+    score, reasons = score_pair(records, 0, 1)
+    assert reasons == ["mobile", "email_local", "name"] and score >= 0.7
+    score, reasons = score_pair(records, 0, 2)
+    assert reasons == ["mobile_suffix"] and score < 0.7
+
+
+def test_duplicates_cluster_onto_the_oldest_customer() -> None:
+    records = _records(
+        ("Asha Rao", "9876543210", None),
+        ("Unrelated Person", "9000000001", None),
+        ("Asha R", "09876543210", "asha.rao@example.com"),
+        ("Asha Rao", None, "asha.rao@example.com"),
+    )
+    proposals = find_duplicates(records)
+    # 2 matches 0 (by mobile suffix), 3 only matches 2 (by email): one cluster, survivor 0. 3 was never
+    # compared with 0, so it is left for the scan after 2 is merged.
+    assert proposals == [(0, 2, round(score_pair(records, 0, 2)[0], 3), "mobile_suffix,name")]
+
+
+def test_scan_scores_in_batches_and_reports_progress(monkeypatch) -> None:
+    monkeypatch.setattr(customer_dedupe, "_SCORE_BATCH_BLOCKS", 2)
+    records = _records(
+        ("Asha Rao", "9876543210", None),
+        ("Asha Rao", "9876543210", None),
+        ("Vikram Shah", "9116500001", "vikram@example.com"),
+        ("Vikram Shah", "9116500001", "vikram@example.org"),
+    )
+
+    async def load_customers(session):
+        return records
+
+    monkeypatch.setattr(customer_dedupe, "load_customers", load_customers)
+    session = MergeSession([])
+    reports = []
+
+    async def progress(current: int, total: int) -> None:
+        reports.append((current, total))
+
+    assert asyncio.run(customer_dedupe.run_dedupe_scan(session, progress=progress)) == 2
+    # Five blocks: mobile suffix and soundex name for both pairs, email local part for the second.
+    assert reports == [(2, 5), (4, 5), (5, 5)]
+
+
+def test_oversized_blocks_are_skipped(monkeypatch) -> None:
+    monkeypatch.setattr(customer_dedupe.settings, "DEDUPE_MAX_BLOCK_SIZE", 2)
+    records = _records(*[(f"Person {i}", "9876543210", None) for i in range(4)])
+    assert find_duplicates(records) == []
+
+
+class MergeSession:
+    """Replays merge passes: each pass reports the rows its merge_map holds."""
+
+    def __init__(self, passes: list[list[tuple]]) -> None:
+        self.passes = passes
+        self.statements: list[str] = []
+        self.commits = 0
+        self.sync_session = type("Sync", (), {"info": {}})()
+
+    async def scalar(self, stmt):
+        return uuid.uuid4() if self.passes else None  # an approved proposal is left
+
+    async def execute(self, stmt):
+        sql = " ".join(str(stmt).split())
+        self.statements.append(sql)
+        rows = self.passes.pop(0) if sql.endswith("FROM merge_map") and sql.startswith("SELECT") else []
+        return type("Result", (), {"all": lambda self: rows})()
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def test_survivor_chains_apply_over_several_passes() -> None:
+    # Pass 1 merges B into C; the approved A->B proposal now points at C and applies in pass 2.
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    session = MergeSession([[(c, b, "9876500003", "09876500003")], [(c, a, "9876500003", None)]])
+    assert asyncio.run(apply_approved_merges(session)) == 2
+    assert session.commits == 2
+
+    # Only the merged customers are invalidated, never the whole cache.
+    pending = session.sync_session.info["cache_bus_pending"]
+    assert pending[SEGMENT_INDEX_NAMESPACE] == {str(a), str(b), str(c)}
+    assert pending[CALLER_ID_NAMESPACE] == {"9876500003", "09876500003"}
+
+    statements = session.statements[: len(customer_dedupe._APPLY_MERGES_SQL)]
+    delete_customers = statements.index("DELETE FROM customers c USING merge_map m WHERE c.id = m.duplicate_id")
+    repoint = next(i for i, sql in enumerate(statements) if sql.startswith("UPDATE customer_merge_proposals p SET survivor_id"))
+    supersede = next(i for i, sql in enumerate(statements) if "SET status = 'superseded'" in sql)
+    # Nothing may reference a duplicate as survivor when it is deleted.
+    assert supersede < repoint < delete_customers
+    assert "WHERE p.survivor_id = m.duplicate_id" in statements[repoint]
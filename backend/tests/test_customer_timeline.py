@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.crud.customer import decode_timeline_cursor, encode_timeline_cursor, timeline_page_stmt
+from app.models.customer import CustomerTimelineEvent
+
+
+def test_cursor_round_trips_and_rejects_garbage() -> None:
+    event = CustomerTimelineEvent(
+        id=uuid.uuid4(),
+        customer_id=uuid.uuid4(),
+        kind="remark",
+        details={},
+        created_at=datetime(2026, 10, 19, 12, 30, 5, 123456, tzinfo=timezone.utc),
+    )
+    assert decode_timeline_cursor(encode_timeline_cursor(event)) == (event.created_at, event.id)
+    for cursor in ("not-base64!", "Zm9v", encode_timeline_cursor(event)[:-4]):
+        with pytest.raises(ValueError):
+            decode_timeline_cursor(cursor)
+
+
+def test_later_pages_seek_past_the_cursor() -> None:
+    before = (datetime(2026, 10, 19, tzinfo=timezone.utc), uuid.uuid4())
+    sql = str(timeline_page_stmt(uuid.uuid4(), 51, before).compile(dialect=asyncpg_dialect()))
+    assert "(customer_timeline.created_at, customer_timeline.id) <" in sql
+    assert "ORDER BY customer_timeline.created_at DESC, customer_timeline.id DESC" in sql
+    assert "OFFSET" not in sql
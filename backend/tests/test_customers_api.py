@@ -0,0 +1,70 @@
+import uuid
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.api.v1 import customers
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.sync_session = SimpleNamespace(info={})
+        self.commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def build_client(monkeypatch, known_type_ids: set[uuid.UUID]) -> tuple[TestClient, FakeSession, list]:
+    session = FakeSession()
+    upserts: list = []
+
+    async def missing_customer_type_ids(session, type_ids):
+        return [type_id for type_id in type_ids if type_id not in known_type_ids]
+
+    async def upsert_customer(session, customer_in, added_by=None):
+        upserts.append(customer_in)
+        return uuid.uuid4(), True
+
+    monkeypatch.setattr(customers, "missing_customer_type_ids", missing_customer_type_ids)
+    monkeypatch.setattr(customers, "upsert_customer", upsert_customer)
+
+    async def current_user():
+        return SimpleNamespace(id=uuid.uuid4(), role="manager", is_active=True)
+
+    async def db_session():
+        yield session
+
+    app = FastAPI()
+    app.include_router(customers.router)
+    app.dependency_overrides[deps.get_current_user] = current_user
+    app.dependency_overrides[deps.get_db_session] = db_session
+    return TestClient(app), session, upserts
+
+
+def test_unknown_customer_type_is_rejected_before_writing(monkeypatch) -> None:
+    known, unknown = uuid.uuid4(), uuid.uuid4()
+    client, session, upserts = build_client(monkeypatch, {known})
+
+    response = client.post(
+        "/customers", json={"name": "Asha", "primary_mobile": "9876543210", "customer_type_ids": [str(known), str(unknown)]}
+    )
+    assert response.status_code == 422
+    assert str(unknown) in response.json()["detail"]
+    assert upserts == [] and session.commits == 0
+
+
+def test_upsert_commits_once_with_cache_invalidations(monkeypatch) -> None:
+    known = uuid.uuid4()
+    client, session, upserts = build_client(monkeypatch, {known})
+
+    response = client.post(
+        "/customers", json={"name": "Asha", "primary_mobile": "9876543210", "customer_type_ids": [str(known)]}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["created"] is True
+    assert len(upserts) == 1 and session.commits == 1
+    pending = session.sync_session.info["cache_bus_pending"]
+    assert set(pending) == {customers.CALLER_ID_NAMESPACE, customers.SEGMENT_INDEX_NAMESPACE}
@@ -0,0 +1,65 @@
+"""The framework minimums in requirements.txt must provide what the app is built on."""
+
+import inspect
+import os
+import re
+import subprocess
+import sys
+from importlib.metadata import version
+from pathlib import Path
+
+from fastapi import Depends, FastAPI, Response, status
+from fastapi.testclient import TestClient
+from packaging.version import Version
+from starlette.middleware.gzip import IdentityResponder
+
+from app.core.compression import CompressionMiddleware
+
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def _minimums() -> dict[str, Version]:
+    pins = {}
+    for line in (BACKEND / "requirements.txt").read_text().splitlines():
+        match = re.fullmatch(r"([A-Za-z0-9_.-]+)(?:\[[^\]]*\])?>=([0-9.]+)", line.strip())
+        if match:
+            pins[match[1].lower()] = Version(match[2])
+    return pins
+
+
+def test_installed_framework_meets_the_pinned_minimums() -> None:
+    pins = _minimums()
+    for package in ("fastapi", "starlette"):
+        assert Version(version(package)) >= pins[package], package
+
+
+def test_framework_provides_the_features_the_app_uses() -> None:
+    # Request-scoped sessions in app/api/deps.py and the routes.
+    assert "scope" in inspect.signature(Depends).parameters
+    assert status.HTTP_422_UNPROCESSABLE_CONTENT == 422
+    # app/core/compression.py subclasses IdentityResponder.
+    assert "exclude_content_types" in inspect.signature(IdentityResponder.__init__).parameters
+    assert "more_body" in inspect.signature(IdentityResponder.apply_compression).parameters
+
+
+def test_partial_responses_are_never_compressed() -> None:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=10, gzip_level=6, brotli_quality=4)
+
+    @app.get("/range")
+    async def partial() -> Response:
+        return Response(b"x" * 4096, status_code=206, headers={"Content-Range": "bytes 0-4095/8192"})
+
+    response = TestClient(app).get("/range", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.content == b"x" * 4096
+
+
+def test_app_imports(tmp_path: Path) -> None:
+    env = {**os.environ, "MEDIA_ROOT": str(tmp_path)}
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.main"], cwd=BACKEND, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
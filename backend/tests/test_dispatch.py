@@ -0,0 +1,132 @@
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.services import dispatch
+from app.services.dispatch import CallDispatcher, DispatchClosed, DispatchedCall, QueuedCall, serve_call
+
+
+NOW = datetime(2026, 10, 19, 9, tzinfo=timezone.utc)
+
+
+def _call(priority: int, minutes_overdue: int = 0) -> QueuedCall:
+    return QueuedCall(uuid.uuid4(), priority, "follow_up_due", NOW - timedelta(minutes=minutes_overdue))
+
+
+def _dispatched(caller_id: uuid.UUID, call: QueuedCall) -> DispatchedCall:
+    return DispatchedCall(
+        assignment_id=caller_id,
+        assignment_date=date(2026, 10, 19),
+        item_id=uuid.uuid4(),
+        customer_id=call.customer_id,
+        customer_name="Customer",
+        primary_mobile=None,
+        reason=call.reason,
+        priority=call.priority,
+        due_at=call.due_at,
+    )
+
+
+def test_serves_claims_in_priority_order_and_skips_lost_claims(monkeypatch) -> None:
+    caller = uuid.uuid4()
+    low, high, lost, older = _call(100), _call(300), _call(500), _call(300, minutes_overdue=60)
+    batches = [[low, high, lost, older], []]
+    claims: list[int] = []
+
+    async def claim_calls(session, caller_id, limit):
+        claims.append(limit)
+        return batches.pop(0)
+
+    async def serve_call(session, caller_id, call):
+        return None if call is lost else _dispatched(caller_id, call)
+
+    monkeypatch.setattr(dispatch, "claim_calls", claim_calls)
+    monkeypatch.setattr(dispatch, "serve_call", serve_call)
+
+    async def scenario() -> list:
+        dispatcher = CallDispatcher()
+        return [await dispatcher.next_call(None, caller) for _ in range(4)]
+
+    served = asyncio.run(scenario())
+    assert [call.customer_id if call else None for call in served] == [
+        older.customer_id, high.customer_id, low.customer_id, None
+    ]
+    assert len(claims) == 2  # refilled only once the queue ran dry
+
+
+def test_callers_do_not_wait_on_each_other(monkeypatch) -> None:
+    slow_caller, fast_caller = uuid.uuid4(), uuid.uuid4()
+    release_slow = asyncio.Event()
+
+    async def claim_calls(session, caller_id, limit):
+        if caller_id == slow_caller:
+            await release_slow.wait()
+        return [_call(100)]
+
+    async def serve_call(session, caller_id, call):
+        return _dispatched(caller_id, call)
+
+    monkeypatch.setattr(dispatch, "claim_calls", claim_calls)
+    monkeypatch.setattr(dispatch, "serve_call", serve_call)
+
+    async def scenario() -> None:
+        dispatcher = CallDispatcher()
+        slow = asyncio.create_task(dispatcher.next_call(None, slow_caller))
+        await asyncio.sleep(0)
+        fast = await asyncio.wait_for(dispatcher.next_call(None, fast_caller), timeout=1)
+        assert fast is not None and not slow.done()
+        release_slow.set()
+        assert (await slow) is not None
+
+    asyncio.run(scenario())
+
+
+def test_release_forgets_the_callers_queue(monkeypatch) -> None:
+    caller = uuid.uuid4()
+
+    async def claim_calls(session, caller_id, limit):
+        return [_call(100), _call(200)]
+
+    async def serve_call(session, caller_id, call):
+        return _dispatched(caller_id, call)
+
+    async def release_calls(session, caller_id):
+        return 1
+
+    monkeypatch.setattr(dispatch, "claim_calls", claim_calls)
+    monkeypatch.setattr(dispatch, "serve_call", serve_call)
+    monkeypatch.setattr(dispatch, "release_calls", release_calls)
+
+    async def scenario() -> None:
+        dispatcher = CallDispatcher()
+        await dispatcher.next_call(None, caller)
+        assert dispatcher.queued() == {str(caller): 1}
+        assert await dispatcher.release(None, caller) == 1
+        assert dispatcher._queues == {}
+
+    asyncio.run(scenario())
+
+
+class NoAssignmentSession:
+    """The claim succeeds but today's assignment never reads back."""
+
+    def __init__(self) -> None:
+        self.rolled_back = False
+
+    async def scalar(self, stmt, params):
+        return True
+
+    async def execute(self, stmt, params):
+        return type("Result", (), {"first": lambda self: None})()
+
+    async def rollback(self) -> None:
+        self.rolled_back = True
+
+
+def test_missing_assignment_closes_dispatch_instead_of_crashing() -> None:
+    session = NoAssignmentSession()
+    with pytest.raises(DispatchClosed):
+        asyncio.run(serve_call(session, uuid.uuid4(), _call(100)))
+    assert session.rolled_back
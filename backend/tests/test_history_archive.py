@@ -0,0 +1,54 @@
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.services import history_archive
+
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _write_month(root: Path, month: date, customer_id: uuid.UUID, remarks: int) -> None:
+    path = history_archive.archive_path(root, "call_remarks", month)
+    path.parent.mkdir(parents=True)
+    rows = {
+        "id": [str(uuid.uuid4()) for _ in range(remarks)],
+        "assignment_item_id": [str(uuid.uuid4())] * remarks,
+        "assignment_date": [month] * remarks,
+        "assignment_id": [str(uuid.uuid4())] * remarks,
+        "caller_id": [str(uuid.uuid4())] * remarks,
+        "customer_id": [str(customer_id)] * remarks,
+        "call_status": ["called"] * remarks,
+        "remark_text": [f"remark {i}" for i in range(remarks)],
+        "outcome": ["callback"] * remarks,
+        "follow_up_date": [None] * remarks,
+        "created_by": [str(uuid.uuid4())] * remarks,
+        "created_at": [datetime(month.year, month.month, 1 + i, tzinfo=timezone.utc) for i in range(remarks)],
+    }
+    schema = history_archive._arrow_schema(pa, "call_remarks")
+    pq.write_table(pa.Table.from_pydict(rows, schema=schema), path, compression="zstd")
+
+
+def test_archived_remarks_are_filtered_and_newest_first(tmp_path: Path) -> None:
+    customer, other = uuid.uuid4(), uuid.uuid4()
+    _write_month(tmp_path, date(2024, 1, 1), customer, 2)
+    _write_month(tmp_path, date(2024, 2, 1), customer, 1)
+    _write_month(tmp_path, date(2024, 3, 1), other, 3)
+
+    rows = history_archive.read_archived_remarks(customer_id=customer, root=tmp_path)
+    assert [row["created_at"].date() for row in rows] == [date(2024, 2, 1), date(2024, 1, 2), date(2024, 1, 1)]
+
+    january = history_archive.read_archived_remarks(customer_id=customer, end=date(2024, 1, 31), limit=1, root=tmp_path)
+    assert len(january) == 1 and january[0]["assignment_date"] == date(2024, 1, 1)
+
+
+def test_no_archive_reads_nothing(tmp_path: Path) -> None:
+    assert history_archive.read_archived_remarks(customer_id=uuid.uuid4(), root=tmp_path) == []
+
+
+def test_partition_names_match_database_function() -> None:
+    # create_history_partitions() names partitions <table>_YYYY_MM.
+    assert history_archive.partition_name("call_remarks", date(2025, 3, 1)) == "call_remarks_2025_03"
@@ -0,0 +1,91 @@
+import threading
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, accepted_encodings
+from app.core.http_cache import PRIVATE_REVALIDATE, compute_etag, etag_matches, not_modified, set_cache_headers
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, gzip_level=6, brotli_quality=4)
+
+    @app.get("/items")
+    async def items(request: Request, response: Response, size: int = 10) -> dict:
+        etag = compute_etag("items", size)
+        if etag_matches(request, etag):
+            return not_modified(etag, PRIVATE_REVALIDATE)
+        set_cache_headers(response, etag, PRIVATE_REVALIDATE)
+        return {"items": ["customer"] * size}
+
+    return app
+
+
+def test_conditional_get_returns_empty_304() -> None:
+    client = TestClient(build_app())
+    first = client.get("/items")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == PRIVATE_REVALIDATE
+
+    second = client.get("/items", headers={"If-None-Match": f"W/{etag}, \"other\""})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    assert client.get("/items?size=11", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_compression_respects_threshold_and_accept_encoding() -> None:
+    client = TestClient(build_app())
+    small = client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    large = client.get("/items?size=1000", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < len(large.content)
+
+    refused = client.get("/items?size=1000", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+    assert accepted_encodings("br;q=0.5, gzip;q=0, identity") == {"br", "identity"}
+
+
+class RecordingBrotli:
+    """Stands in for the ``brotli`` module; records which thread compressed each chunk."""
+
+    MODE_TEXT = 1
+
+    def __init__(self) -> None:
+        self.threads: list[int] = []
+
+    def Compressor(self, quality: int, mode: int) -> "RecordingBrotli":
+        return self
+
+    def process(self, body: bytes) -> bytes:
+        self.threads.append(threading.get_ident())
+        return body[:10]
+
+    def finish(self) -> bytes:
+        return b""
+
+
+def test_large_brotli_bodies_are_compressed_off_the_event_loop(monkeypatch) -> None:
+    brotli = RecordingBrotli()
+    monkeypatch.setattr(compression, "_load_brotli", lambda: brotli)
+    app = build_app()
+    loop_thread = []
+
+    @app.get("/loop-thread")
+    async def loop_thread_id() -> dict:
+        loop_thread.append(threading.get_ident())
+        return {}
+
+    # One portal, so every request runs on the same event loop thread.
+    with TestClient(app) as client:
+        client.get("/loop-thread")
+        assert client.get("/items?size=200", headers={"Accept-Encoding": "br"}).headers["content-encoding"] == "br"
+        assert client.get("/items?size=20000", headers={"Accept-Encoding": "br"}).headers["content-encoding"] == "br"
+    assert brotli.threads[0] == loop_thread[0]
+    assert brotli.threads[1] != loop_thread[0]
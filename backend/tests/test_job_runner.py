@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.services import job_runner as job_runner_module
+from app.services.job_runner import JobDefinition, JobRunner, _ClaimedJob
+
+
+class RecordingSession:
+    """Stands in for AsyncSessionLocal(); records compiled statements and replays canned results."""
+
+    def __init__(self, log: list, results: list) -> None:
+        self.log = log
+        self.results = results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt, params=None):
+        compiled = stmt.compile(dialect=asyncpg_dialect())
+        self.log.append((str(compiled), compiled.params))
+        result = self.results.pop(0) if self.results else None
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def commit(self) -> None:
+        self.log.append(("COMMIT", {}))
+
+
+def use_sessions(monkeypatch, results: list) -> list:
+    log: list = []
+    monkeypatch.setattr(job_runner_module, "AsyncSessionLocal", lambda: RecordingSession(log, results))
+    return log
+
+
+class Rows:
+    def __init__(self, rows: list, rowcount: int = 0) -> None:
+        self._rows = rows
+        self.rowcount = rowcount
+
+    def all(self) -> list:
+        return self._rows
+
+    def scalars(self):
+        return iter(self._rows)
+
+
+def _job(attempts: int, max_attempts: int = 3, batch_id=None) -> _ClaimedJob:
+    return _ClaimedJob(uuid.uuid4(), {}, attempts, max_attempts, batch_id)
+
+
+def _failing_definition() -> JobDefinition:
+    async def handler(context) -> None:
+        raise RuntimeError("boom")
+
+    return JobDefinition("test", handler, retry_backoff_seconds=10)
+
+
+def test_claim_skips_locked_rows_and_counts_the_attempt(monkeypatch) -> None:
+    job_id, batch_id = uuid.uuid4(), uuid.uuid4()
+    log = use_sessions(monkeypatch, [Rows([(job_id, {"k": 1}, 1, 3, batch_id)])])
+
+    claimed = asyncio.run(JobRunner(worker_id="w1")._claim("test", 2))
+
+    assert claimed == [_ClaimedJob(job_id, {"k": 1}, 1, 3, batch_id)]
+    sql, params = log[0]
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "attempts=(jobs.attempts + $" in sql
+    assert params["status"] == "running" and params["locked_by"] == "w1"
+    assert log[-1][0] == "COMMIT"
+
+
+def test_failed_attempt_is_requeued_until_the_last_one(monkeypatch) -> None:
+    log = use_sessions(monkeypatch, [])
+    batch_id = uuid.uuid4()
+    runner = JobRunner()
+
+    asyncio.run(runner._run(_failing_definition(), _job(attempts=2, batch_id=batch_id)))
+    sql, params = log[0]
+    assert params["status"] == "queued" and "RuntimeError: boom" in params["last_error"]
+    assert "upload_batches" not in "".join(entry[0] for entry in log)
+
+    log.clear()
+    asyncio.run(runner._run(_failing_definition(), _job(attempts=3, batch_id=batch_id)))
+    assert [entry[1].get("status") for entry in log[:2]] == ["failed", "failed"]
+    assert log[1][0].startswith("UPDATE upload_batches")
+
+
+def test_orphans_past_their_last_attempt_fail_their_upload_batch(monkeypatch) -> None:
+    batch_id = uuid.uuid4()
+    log = use_sessions(monkeypatch, [Rows([batch_id, None]), None, Rows([], rowcount=4)])
+
+    requeued, failed = asyncio.run(JobRunner().requeue_orphans())
+
+    assert (requeued, failed) == (4, 2)
+    statements = [sql for sql, _ in log]
+    assert "jobs.attempts >= jobs.max_attempts" in statements[0] and "RETURNING" in statements[0]
+    assert statements[1].startswith("UPDATE upload_batches") and log[1][1]["status"] == "failed"
+    assert log[2][1]["status"] == "queued"
+    assert statements[-1] == "COMMIT"
+
+
+def test_errors_recording_the_outcome_are_logged(monkeypatch, caplog) -> None:
+    use_sessions(monkeypatch, [ConnectionError("database went away")])
+
+    async def handler(context) -> None:
+        return None
+
+    with caplog.at_level(logging.ERROR, logger=job_runner_module.__name__):
+        asyncio.run(JobRunner()._run(JobDefinition("test", handler), _job(attempts=1)))
+
+    assert "Recording the outcome of job" in caplog.text
+    assert "database went away" in caplog.text
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import io
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.core.config import settings
+from app.crud.customer import MAX_BIND_PARAMS, _merge_by_identity, bulk_upsert_customers
+from app.schemas.customer import CustomerCreate
+from app.services.import_errors import csv_error_report, decode_errors, encode_errors
+from app.services.import_parsing import RowErrorCode, iter_parsed_chunks, parse_chunk, plan_chunks
+from app.services.lead_import import _customers, store_upload
+
+
+def _parse_all(path: Path, chunk_bytes: int) -> list:
+    plan = plan_chunks(path, chunk_bytes, 2)
+    return [row for spec in plan.chunks for row in parse_chunk(path, spec).rows]
+
+
+def test_rows_are_validated_in_file_order(tmp_path: Path) -> None:
+    path = tmp_path / "leads.csv"
+    path.write_text(
+        "\ufeffFull Name,Phone Number,Email,Notes\n"
+        "Asha,+91 98765 43210,asha@example.com,x\n"
+        ",9876500000,,missing name\n"
+        "Ravi,,RAVI@example.com,\n"
+    )
+    plan = plan_chunks(path, 1024, 2)
+    assert plan.estimated_rows == 3
+
+    rows = _parse_all(path, 1024)
+    assert rows[0] == ("Asha", "9876543210", "asha@example.com")
+    assert rows[1] is None
+    customers = _customers(rows, {"customer_type_ids": [], "source": "upload"})
+    assert [customer.name for customer in customers] == ["Asha", "Ravi"]
+
+
+def test_uploads_are_stored_under_their_content_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "IMPORT_ROOT", str(tmp_path / "imports"))
+    data = b"name,mobile\n" + b"Asha,9876543210\n" * 100_000
+    upload = UploadFile(io.BytesIO(data), filename="Leads.CSV")
+
+    path, sha256 = asyncio.run(store_upload(upload))
+    assert sha256 == hashlib.sha256(data).hexdigest()
+    assert path == tmp_path / "imports" / f"{sha256}.csv"
+    assert path.read_bytes() == data
+    assert [entry.name for entry in path.parent.iterdir()] == [path.name]
+
+
+def test_error_report_returns_failed_rows_in_upload_format(tmp_path: Path) -> None:
+    path = tmp_path / "leads.csv"
+    path.write_text(
+        "Name,Mobile,Email\n"
+        "Asha,9876543210,asha@example.com\n"
+        ",9876500000,\n"
+        "\n"
+        "Ravi,9876500001,not-an-email\n"
+    )
+    plan = plan_chunks(path, 1024, 2)
+    chunk = parse_chunk(path, plan.chunks[0])
+    assert chunk.errors == [(1, 0, RowErrorCode.missing_name), (2, 2, RowErrorCode.invalid_email)]
+
+    errors = [(index + 1, column, code) for index, column, code in chunk.errors]
+    blob = encode_errors(errors)
+    assert decode_errors(blob) == errors
+
+    report = b"".join(csv_error_report(path, [blob])).decode()
+    assert report.splitlines() == [
+        "Name,Mobile,Email,import_row,error_column,error_code",
+        ",9876500000,,2,Name,missing_name",
+        "Ravi,9876500001,not-an-email,3,Email,invalid_email",
+    ]
+
+
+def test_csv_chunks_never_split_quoted_newlines(tmp_path: Path) -> None:
+    path = tmp_path / "leads.csv"
+    body = "".join(f'"Lead {i}\nsecond line, with comma",98765{i:05d},\n' for i in range(50))
+    path.write_text("Name,Mobile,Email\n" + body)
+
+    single = _parse_all(path, 1 << 20)
+    assert len(single) == 50
+    for chunk_bytes in (1, 7, 64):
+        assert _parse_all(path, chunk_bytes) == single
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_xlsx_is_read_once_and_batched_to_the_pool(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, processes: int
+) -> None:
+    openpyxl = pytest.importorskip("openpyxl")
+    monkeypatch.setattr(settings, "IMPORT_PARSE_PROCESSES", processes)
+    monkeypatch.setattr(settings, "IMPORT_PARSE_WINDOW", 2)
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Customer Name", "Mobile"])
+    for i in range(5):
+        sheet.append([f"Lead {i}", 9876500000 + i])
+    second = workbook.create_sheet("More")
+    second.append(["Name"])
+    second.append(["Lead 5"])
+    path = tmp_path / "leads.xlsx"
+    workbook.save(path)
+
+    plan = plan_chunks(path, 1024, 2)
+    assert [spec.sheet for spec in plan.chunks] == [sheet.title, "More"] and plan.estimated_rows == 6
+
+    loads = []
+    load_workbook = openpyxl.load_workbook
+    monkeypatch.setattr(openpyxl, "load_workbook", lambda *args, **kwargs: loads.append(args) or load_workbook(*args, **kwargs))
+
+    async def collect() -> list:
+        return [chunk.rows async for chunk in iter_parsed_chunks(path, plan)]
+
+    chunks = asyncio.run(collect())
+    assert [len(rows) for rows in chunks] == [2, 2, 1, 1]
+    assert [row[1] for rows in chunks for row in rows] == [str(9876500000 + i) for i in range(5)] + [None]
+    # One load for the whole file, however many chunks: workers only validate rows.
+    assert len(loads) == 1
+
+
+def test_process_pool_preserves_order(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "IMPORT_PARSE_PROCESSES", 2)
+    monkeypatch.setattr(settings, "IMPORT_PARSE_WINDOW", 2)
+    path = tmp_path / "leads.csv"
+    path.write_text("Name,Mobile\n" + "".join(f"Lead {i},98765{i:05d}\n" for i in range(200)))
+    plan = plan_chunks(path, 256, 2)
+
+    async def collect() -> list:
+        return [row async for chunk in iter_parsed_chunks(path, plan) for row in chunk.rows]
+
+    rows = asyncio.run(collect())
+    assert [row[0] for row in rows] == [f"Lead {i}" for i in range(200)]
+
+
+def test_rows_sharing_identity_are_merged_before_upsert() -> None:
+    type_a, type_b = uuid.uuid4(), uuid.uuid4()
+    rows = [
+        CustomerCreate(name="Asha", primary_mobile="9876543210", customer_type_ids=[type_a]),
+        CustomerCreate(name="Asha K", primary_mobile="+919876543210", email="a@x.com", customer_type_ids=[type_b]),
+        CustomerCreate(name="No contact", customer_type_ids=[]),
+        CustomerCreate(name="No contact", customer_type_ids=[]),
+    ]
+    merged = _merge_by_identity(rows)
+    assert [key for key, _ in merged] == ["m:9876543210", None, None]
+    first = merged[0][1]
+    assert first.email == "a@x.com"
+    assert first.customer_type_ids == [type_a, type_b]
+
+
+
+def test_bulk_upsert_keeps_every_statement_under_the_bind_limit() -> None:
+    type_ids = [uuid.uuid4() for _ in range(8)]
+    rows = [
+        CustomerCreate(name=f"Lead {i}", primary_mobile=f"98{i:08d}", customer_type_ids=type_ids, source="upload")
+        for i in range(1000)
+    ]
+
+    class Row:
+        def __init__(self, identity_key: str) -> None:
+            self.id = uuid.uuid4()
+            self.identity_key = identity_key
+            self.created = True
+
+    class Session:
+        def __init__(self) -> None:
+            self.params: list[tuple[str, int]] = []
+
+        async def execute(self, stmt):
+            params = stmt.compile(dialect=asyncpg_dialect()).params
+            self.params.append((stmt.table.name, len(params)))
+            if stmt.table.name == "customers":
+                return [Row(value) for key, value in params.items() if key.startswith("identity_key")]
+            return None
+
+    session = Session()
+    result = asyncio.run(bulk_upsert_customers(session, rows))
+
+    assert result.created == 1000
+    assert all(count <= MAX_BIND_PARAMS for _, count in session.params)
+    type_map_batches = [count for table, count in session.params if table == "customer_type_maps"]
+    assert sum(type_map_batches) == 1000 * 8 * 5 and len(type_map_batches) == 2
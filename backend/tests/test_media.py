@@ -0,0 +1,66 @@
+import io
+import os
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import media
+from app.services.media_cache import DerivedImageCache
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    media_root = tmp_path / "media"
+    media_root.mkdir()
+    (media_root / "notes.txt").write_bytes(b"0123456789" * 100)
+    monkeypatch.setattr(media, "MEDIA_ROOT", media_root.resolve())
+    monkeypatch.setattr(media, "derived_image_cache", DerivedImageCache(tmp_path / "cache", max_bytes=10_000))
+
+    app = FastAPI()
+    app.include_router(media.router)
+    return TestClient(app)
+
+
+def test_etag_and_range(client: TestClient) -> None:
+    full = client.get("/media/notes.txt")
+    assert full.status_code == 200
+    etag = full.headers["etag"]
+
+    assert client.get("/media/notes.txt", headers={"If-None-Match": etag}).status_code == 304
+
+    partial = client.get("/media/notes.txt", headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == b"0123456789"
+    assert partial.headers["content-range"] == "bytes 10-19/1000"
+
+
+def test_path_traversal_is_not_found(client: TestClient) -> None:
+    assert client.get("/media/..%2F..%2Fetc%2Fpasswd").status_code == 404
+    assert client.get("/media/missing.png").status_code == 404
+
+
+def test_thumbnail_is_cached_and_bounded(client: TestClient) -> None:
+    image = pytest.importorskip("PIL.Image")
+    image.new("RGB", (800, 400), "red").save(media.MEDIA_ROOT / "photo.jpg")
+
+    assert client.get("/media/photo.jpg?w=100").status_code == 400
+    thumb = client.get("/media/photo.jpg?w=128")
+    assert thumb.status_code == 200
+    assert thumb.headers["content-type"] == "image/jpeg"
+
+    assert image.open(io.BytesIO(thumb.content)).size == (128, 64)
+    assert client.get("/media/photo.jpg?w=128", headers={"If-None-Match": thumb.headers["etag"]}).status_code == 304
+    assert client.get("/media/notes.txt?w=128").status_code == 400
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = DerivedImageCache(tmp_path, max_bytes=2500)
+    paths = [cache._store(cache.key(i), b"x" * 1000, "png") for i in range(2)]
+    os.utime(paths[0], (0, 0))  # oldest
+    cache._store(cache.key(2), b"x" * 1000, "png")
+
+    assert not paths[0].exists()
+    assert paths[1].exists()
+    assert cache._lookup(cache.key(2)) is not None
@@ -0,0 +1,29 @@
+import pytest
+
+from app.db.session import derive_pool_limits
+
+
+def test_without_a_budget_the_configured_pool_is_used() -> None:
+    assert derive_pool_limits(None, 8, pool_size=5, max_overflow=10) == (5, 10)
+
+
+@pytest.mark.parametrize("budget,workers", [(80, 4), (100, 3), (7, 7), (40, 1)])
+def test_budget_is_shared_by_all_workers_of_one_server(budget: int, workers: int) -> None:
+    pool_size, max_overflow = derive_pool_limits(budget, workers, pool_size=5, max_overflow=10)
+    assert pool_size >= 1
+    assert workers * (pool_size + max_overflow) <= budget
+    assert max_overflow <= pool_size
+
+
+def test_overflow_share_is_capped_by_max_overflow() -> None:
+    assert derive_pool_limits(80, 4, pool_size=5, max_overflow=10) == (15, 5)
+    assert derive_pool_limits(400, 2, pool_size=5, max_overflow=10) == (190, 10)
+
+
+def test_budget_below_one_per_worker_rounds_up() -> None:
+    assert derive_pool_limits(2, 4, pool_size=5, max_overflow=10) == (1, 0)
+
+
+def test_reserved_connections_come_out_of_each_workers_share() -> None:
+    assert derive_pool_limits(80, 4, pool_size=5, max_overflow=10, reserved_per_worker=1) == (15, 4)
+    assert derive_pool_limits(8, 4, pool_size=5, max_overflow=10, reserved_per_worker=1) == (1, 0)
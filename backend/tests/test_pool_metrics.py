@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import QueuePool
+from starlette.types import Message, Receive, Scope, Send
+
+from app.db.pool_metrics import PoolHoldMetrics, PoolHoldMiddleware
+
+
+def build_app(tmp_path: Path, metrics: PoolHoldMetrics) -> tuple[FastAPI, list[int]]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1)
+    metrics.watch(engine.pool)
+    checked_out_at_start: list[int] = []
+
+    def get_connection() -> Iterator[Connection]:
+        with engine.connect() as conn:
+            yield conn
+
+    app = FastAPI()
+
+    @app.get("/lazy")
+    async def lazy(conn: Connection = Depends(get_connection, scope="function")) -> dict:
+        conn.execute(text("SELECT 1"))
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    @app.get("/no-db")
+    async def no_db() -> dict:
+        return {"ok": True}
+
+    class RecordPool:
+        def __init__(self, app: FastAPI) -> None:
+            self.app = app
+
+        async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+            async def wrapped(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    checked_out_at_start.append(engine.pool.checkedout())
+                await send(message)
+
+            await self.app(scope, receive, wrapped)
+
+    app.add_middleware(RecordPool)
+    app.add_middleware(PoolHoldMiddleware, metrics=metrics)
+    return app, checked_out_at_start
+
+
+def test_function_scoped_session_is_released_before_response(tmp_path: Path) -> None:
+    metrics = PoolHoldMetrics(sample_size=16)
+    app, checked_out_at_start = build_app(tmp_path, metrics)
+    client = TestClient(app)
+
+    response = client.get("/lazy")
+    assert response.status_code == 200
+    assert checked_out_at_start == [0]
+    hold_ms = float(response.headers["server-timing"].split("dur=")[1])
+    assert hold_ms >= 10
+
+    assert "server-timing" not in client.get("/no-db").headers
+    stats = metrics.stats()
+    assert stats["checkouts"] == 1
+    assert stats["requests"] == 2
+    assert stats["requests_with_db"] == 1
+    assert stats["request_hold_ms"]["p50"] >= 10
+    assert 0 < stats["hold_ratio"] <= 1
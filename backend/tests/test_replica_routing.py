@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api import deps
+from app.core.security import create_access_token
+from app.db import session as db_session
+from app.db.session import ReplicaRouter
+
+
+def _replica(healthy: bool) -> SimpleNamespace:
+    return SimpleNamespace(healthy=healthy, sessionmaker=object())
+
+
+def test_reads_round_robin_over_healthy_replicas_and_fall_back_to_primary() -> None:
+    router = ReplicaRouter(["a", "b", "c"])
+    first, lagging, second = _replica(True), _replica(False), _replica(True)
+    router.replicas = [first, lagging, second]
+
+    picked = [router.read_sessionmaker() for _ in range(4)]
+    assert picked == [first.sessionmaker, second.sessionmaker, first.sessionmaker, second.sessionmaker]
+
+    first.healthy = second.healthy = False
+    assert router.read_sessionmaker() is db_session.AsyncSessionLocal
+
+
+def test_safe_methods_use_the_read_session(monkeypatch) -> None:
+    async def read_db():
+        yield "replica"
+
+    async def primary_db():
+        yield "primary"
+
+    monkeypatch.setattr(deps, "get_read_db", read_db)
+    monkeypatch.setattr(deps, "get_db", primary_db)
+
+    async def session_for(method: str) -> str:
+        async for session in deps.get_db_session(SimpleNamespace(method=method)):
+            return session
+
+    assert [asyncio.run(session_for(method)) for method in ("GET", "HEAD", "POST", "PATCH")] == [
+        "replica", "replica", "primary", "primary"
+    ]
+
+
+def test_user_missing_on_a_replica_is_looked_up_on_the_primary(monkeypatch) -> None:
+    primary_engine = create_async_engine("postgresql+asyncpg://primary/db")
+    replica_engine = create_async_engine("postgresql+asyncpg://replica/db")
+    monkeypatch.setattr(db_session, "engine", primary_engine)
+    user = SimpleNamespace(id=uuid.uuid4())
+
+    class PrimarySession:
+        bind = primary_engine
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+    async def get_user_by_id(session, user_id):
+        return user if session.bind is primary_engine else None
+
+    monkeypatch.setattr(deps, "AsyncSessionLocal", PrimarySession)
+    monkeypatch.setattr(deps, "get_user_by_id", get_user_by_id)
+
+    token = create_access_token(str(user.id))
+    replica = SimpleNamespace(bind=replica_engine)
+    assert asyncio.run(deps.get_current_user(token, replica)) is user
+    assert db_session.is_replica_session(replica)
+    assert not db_session.is_replica_session(SimpleNamespace(bind=primary_engine))
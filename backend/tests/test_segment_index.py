@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+from app.core.bitmap import RoaringBitmap
+from app.services import segment_index as segment_index_module
+from app.services.segment_index import CustomerSegmentIndex, _Snapshot
+
+
+SALES, SUPPORT = uuid.uuid4(), uuid.uuid4()
+
+
+class Session:
+    """Stands in for AsyncSessionLocal(); fails while ``failures`` is positive, then returns ``rows``."""
+
+    def __init__(self, state: dict) -> None:
+        self.state = state
+
+    async def __aenter__(self) -> "Session":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def execute(self, stmt, params):
+        self.state["reads"].append(sorted(params["ids"]))
+        if self.state["failures"]:
+            self.state["failures"] -= 1
+            raise ConnectionError("database unavailable")
+        rows = [(customer_id, types) for customer_id, types in self.state["rows"] if customer_id in params["ids"]]
+        return type("Result", (), {"all": lambda self: rows})()
+
+
+def _index(*customers: uuid.UUID) -> CustomerSegmentIndex:
+    index = CustomerSegmentIndex()
+    base = sorted(customer.bytes for customer in customers)
+    index._snapshot = _Snapshot(bytearray(b"".join(base)), {SALES: RoaringBitmap.from_sorted(range(len(base)))})
+    return index
+
+
+def test_packed_snapshot_finds_base_and_appended_customers() -> None:
+    base = sorted((uuid.uuid4() for _ in range(5)), key=lambda customer: customer.bytes)
+    snapshot = _Snapshot(bytearray(b"".join(customer.bytes for customer in base)), {})
+    assert [snapshot.ordinal(customer) for customer in base] == [0, 1, 2, 3, 4]
+    assert [snapshot.customer_id(ordinal) for ordinal in range(5)] == base
+
+    created = uuid.uuid4()
+    assert snapshot.ordinal(created) is None
+    assert snapshot.add(created) == 5 and snapshot.add(base[2]) == 2
+    assert snapshot.customer_id(5) == created
+    assert len(snapshot.universe) == 6
+
+
+def test_reload_replaces_mappings_and_drops_merged_customers(monkeypatch) -> None:
+    survivor, duplicate = sorted([uuid.uuid4(), uuid.uuid4()], key=lambda customer: customer.bytes)
+    index = _index(survivor, duplicate)
+    state = {"reads": [], "failures": 0, "rows": [(survivor, [SUPPORT])]}
+    monkeypatch.setattr(segment_index_module, "AsyncSessionLocal", lambda: Session(state))
+
+    async def scenario() -> None:
+        index.evict([str(survivor), str(duplicate)])
+        await index._reload
+
+    asyncio.run(scenario())
+    assert index.customer_ids([SUPPORT], [], []) == (1, [survivor])
+    assert index.count([SALES], [], []) == 0
+    assert index.count([], [], []) == 1
+
+
+def test_failed_reload_is_retried(monkeypatch) -> None:
+    customer = uuid.uuid4()
+    index = _index(customer)
+    state = {"reads": [], "failures": 2, "rows": [(customer, [SUPPORT])]}
+    monkeypatch.setattr(segment_index_module, "AsyncSessionLocal", lambda: Session(state))
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(segment_index_module.asyncio, "sleep", sleep)
+
+    async def scenario() -> None:
+        index.evict([str(customer)])
+        await index._reload
+
+    asyncio.run(scenario())
+    assert state["reads"] == [[customer]] * 3
+    assert delays == [1.0, 2.0]
+    assert index.customer_ids([SUPPORT], [], []) == (1, [customer])
@@ -0,0 +1,42 @@
+import runpy
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.serving import ProductionWorker, connection_plan, log_connection_plan
+
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def test_launcher_uses_production_worker_and_drains_within_graceful_timeout() -> None:
+    config = runpy.run_path(str(BACKEND / "gunicorn.conf.py"))
+
+    assert config["worker_class"] == "app.core.serving.ProductionWorker"
+    assert config["workers"] == max(1, settings.WEB_CONCURRENCY)
+    assert ProductionWorker.CONFIG_KWARGS["loop"] == settings.SERVER_LOOP
+    assert ProductionWorker.CONFIG_KWARGS["http"] == settings.SERVER_HTTP
+    assert ProductionWorker.CONFIG_KWARGS["timeout_graceful_shutdown"] < config["graceful_timeout"]
+
+
+def test_connection_plan_splits_budget_across_workers(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 80)
+    plan = connection_plan(4)
+
+    # Each worker's LISTEN connection comes out of its share of the primary's budget.
+    assert plan.pool_size + plan.max_overflow == 19
+    assert plan.primary_connections == 80
+    # Replicas have no listener, so their pools get the whole share.
+    assert plan.replica_pool_size + plan.replica_max_overflow == 20
+
+
+def test_connection_plan_warns_when_the_budget_is_exceeded(monkeypatch) -> None:
+    messages = []
+    log = type("Log", (), {"info": lambda self, *args: None, "warning": lambda self, *args: messages.append(args)})()
+
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 80)
+    log_connection_plan(4, log)
+    assert messages == []
+
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 6)
+    plan = log_connection_plan(4, log)
+    assert plan.primary_connections == 8 and len(messages) == 1
@@ -0,0 +1,37 @@
+"""
+Cold-start regression checks; run without a live server.
+
+Usage:
+  IMPORT_TIME_BUDGET_MS=2500 pytest -q backend/tests/test_startup_imports.py
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.commands.import_profile import LAZY_MODULES, profile_imports, total_ms
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "3000"))
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as mp:
+        yield mp
+
+
+@pytest.fixture(scope="module")
+def timings(tmp_path_factory: pytest.TempPathFactory, monkeypatch_module):
+    monkeypatch_module.setenv("MEDIA_ROOT", str(tmp_path_factory.mktemp("media")))
+    return profile_imports("app.main")
+
+
+def test_heavy_dependencies_are_lazy(timings):
+    loaded = {timing.module.split(".", 1)[0] for timing in timings}
+    assert not loaded.intersection(LAZY_MODULES)
+
+
+def test_import_time_within_budget(timings):
+    assert total_ms(timings) < IMPORT_TIME_BUDGET_MS
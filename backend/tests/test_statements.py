@@ -0,0 +1,33 @@
+import uuid
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.util import LRUCache
+
+from app.crud.statements import HOT_STATEMENTS, user_by_email, user_by_id
+
+
+DIALECT = asyncpg_dialect()
+
+
+def _compile(stmt, cache: LRUCache):
+    compiled, extracted, _, _ = stmt._compile_w_cache(
+        DIALECT, compiled_cache=cache, column_keys=[], for_executemany=False, schema_translate_map=None
+    )
+    return compiled, compiled.construct_params(extracted_parameters=extracted, escape_names=False)
+
+
+def test_precompiled_statements_reuse_sql_and_bind_new_values() -> None:
+    cache = LRUCache(50)
+    first_id, second_id = uuid.uuid4(), uuid.uuid4()
+    first, first_params = _compile(user_by_id(first_id), cache)
+    second, second_params = _compile(user_by_id(second_id), cache)
+
+    assert first is second
+    assert list(first_params.values()) == [first_id]
+    assert list(second_params.values()) == [second_id]
+
+    by_email, params = _compile(user_by_email("a@example.com"), cache)
+    assert by_email is not first
+    assert "users.email" in str(by_email)
+    assert list(params.values()) == ["a@example.com"]
+    assert {"user_by_id", "user_by_email", "customer_by_identity_key", "assignment_by_id"} <= set(HOT_STATEMENTS)
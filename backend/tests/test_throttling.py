@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.core import throttling
+from app.core.throttling import ConcurrencyGate, InMemoryBucketStore, LoginThrottle, PostgresBucketStore
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(throttling.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_allows_the_burst_then_refills_over_time(clock: Clock) -> None:
+    store = InMemoryBucketStore()
+
+    async def take() -> float:
+        return await store.take("k", capacity=3, refill_per_second=0.5)
+
+    assert [asyncio.run(take()) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert asyncio.run(take()) == pytest.approx(2.0)
+
+    clock.now += 1.0  # half a token
+    assert asyncio.run(take()) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert asyncio.run(take()) == 0.0
+
+    clock.now += 3600  # refill stops at capacity
+    assert [asyncio.run(take()) for _ in range(4)][-1] > 0
+
+
+def test_bucket_store_evicts_least_recently_used_keys(clock: Clock) -> None:
+    store = InMemoryBucketStore(max_keys=2)
+
+    async def drain(key: str) -> None:
+        await store.take(key, capacity=1, refill_per_second=0.001)
+
+    for key in ("a", "b", "a", "c"):
+        asyncio.run(drain(key))
+    assert list(store._buckets) == ["a", "c"]
+
+
+def test_postgres_bucket_only_takes_a_token_when_one_is_available(monkeypatch) -> None:
+    statements: list[str] = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def execute(self, stmt):
+            statements.append(str(stmt.compile(dialect=asyncpg_dialect())))
+            return type("Result", (), {"first": lambda self: None})()
+
+        async def commit(self) -> None:
+            return None
+
+    monkeypatch.setattr(throttling, "AsyncSessionLocal", Session)
+    retry_after = asyncio.run(PostgresBucketStore().take("login:ip:1.2.3.4", 20, 0.5))
+
+    assert retry_after == 2.0
+    assert "ON CONFLICT (key) DO UPDATE" in statements[0]
+    assert "WHERE least(" in statements[0] and ">= $" in statements[0]
+
+
+def test_gate_rejects_instead_of_queueing() -> None:
+    gate = ConcurrencyGate(2)
+    assert gate.try_acquire() and gate.try_acquire()
+    assert not gate.try_acquire()
+    assert gate.rejected == 1
+    gate.release()
+    assert gate.try_acquire()
+
+
+def test_verification_cap_covers_only_the_hash_check(monkeypatch, clock: Clock) -> None:
+    release = asyncio.Event()
+
+    async def slow_verify(plain_password: str, hashed_password: str) -> bool:
+        await release.wait()
+        return plain_password == hashed_password
+
+    monkeypatch.setattr(throttling, "verify_password_async", slow_verify)
+    monkeypatch.setattr(throttling.settings, "LOGIN_MAX_CONCURRENT_VERIFICATIONS", 1)
+
+    async def scenario() -> None:
+        login = LoginThrottle(InMemoryBucketStore())
+        first = asyncio.create_task(login.verify_password("secret", "secret"))
+        await asyncio.sleep(0)
+        assert await login.verify_password("secret", "secret") is None
+        release.set()
+        assert await first is True
+        assert login.verifications.active == 0
+        assert await login.verify_password("wrong", "secret") is False
+
+    asyncio.run(scenario())
+
+
+def test_ip_limit_is_checked_before_the_account_limit(monkeypatch, clock: Clock) -> None:
+    monkeypatch.setattr(throttling.settings, "LOGIN_IP_BURST", 1)
+    monkeypatch.setattr(throttling.settings, "LOGIN_IP_PER_MINUTE", 6.0)
+    monkeypatch.setattr(throttling.settings, "LOGIN_ACCOUNT_BURST", 5)
+    login = LoginThrottle(InMemoryBucketStore())
+
+    assert asyncio.run(login.check("10.0.0.1", "A@example.com")) == 0
+    assert asyncio.run(login.check("10.0.0.1", "b@example.com")) == 10
+    assert asyncio.run(login.check("10.0.0.2", " a@example.com ")) == 0
+    assert set(login.store._buckets) == {"login:ip:10.0.0.1", "login:ip:10.0.0.2", "login:account:a@example.com"}
+
+
+def test_unknown_accounts_pay_for_a_hash_check_under_the_cap(monkeypatch) -> None:
+    checked: list[str] = []
+
+    async def verify(plain_password: str, hashed_password: str) -> bool:
+        checked.append(hashed_password)
+        return True
+
+    monkeypatch.setattr(throttling, "verify_password_async", verify)
+    monkeypatch.setattr(throttling, "dummy_password_hash", lambda: "dummy-hash")
+    login = LoginThrottle(InMemoryBucketStore())
+
+    assert asyncio.run(login.verify_password("secret", None)) is False
+    assert checked == ["dummy-hash"]
+
+    login.verifications.active = login.verifications.limit
+    assert asyncio.run(login.verify_password("secret", None)) is None